@@ -3,40 +3,116 @@
 Analysis functions for Planetary Health course data.
 Includes yearly trends, departmental breakdown, taxonomy coverage, and enrollment analysis.
 """
+import os
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-
-def plot_yearly_trends(df, label_col="PH_Label"):
-    """Plot stacked bar chart of course counts by year and label."""
-    df["Year"] = df["Term"].str.extract(r'(\d{4})')
-    yearly = df.groupby(["Year", label_col]).size().unstack(fill_value=0)
-    ax = yearly.plot(kind="bar", stacked=True, figsize=(12,6), title="Planetary Health Course Trends by Year")
-    plt.xlabel("Year")
-    plt.ylabel("Number of Courses")
-    plt.tight_layout()
-    plt.show()
-
-def plot_departmental_breakdown(df, label_col="PH_Label"):
-    """Plot horizontal stacked bar chart of course counts by department and label."""
-    dept = df.groupby(["Department", label_col]).size().unstack(fill_value=0)
-    dept = dept[dept.sum(axis=1) > 0]  # filter depts with at least one match
-    ax = dept.plot(kind="barh", stacked=True, figsize=(10,20), title="Departmental Distribution")
-    plt.xlabel("Number of Courses")
-    plt.ylabel("Department")
-    plt.tight_layout()
-    plt.show()
-
-def taxonomy_coverage(df, taxonomy_keywords):
-    """Return a Series with counts of courses covering each taxonomy category."""
-    coverage = {}
-    for cat, kws in taxonomy_keywords.items():
-        coverage[cat] = df["full_text"].apply(lambda x: any(kw in str(x).lower() for kw in kws)).sum()
-    return pd.Series(coverage)
+
+try:
+    from Scripts.charts import (DEFAULT_TOP, department_breakdown_data, department_breakdown_figure,
+                                yearly_trends_data, yearly_trends_figure)
+    from Scripts.cubes import build_label_cube, dimension_frame, rollup
+    from Scripts.coverage import CoverageMatrix
+    from Scripts.keyword_matcher import get_matcher
+    from Scripts.tracing import traced
+except ImportError:  # running from inside the Scripts folder
+    from charts import (DEFAULT_TOP, department_breakdown_data, department_breakdown_figure,
+                        yearly_trends_data, yearly_trends_figure)
+    from cubes import build_label_cube, dimension_frame, rollup
+    from coverage import CoverageMatrix
+    from keyword_matcher import get_matcher
+    from tracing import traced
+
+@traced(rows_arg=None)
+def plot_yearly_trends(df=None, label_col="PH_Label", cube=None):
+    """Stacked bar chart of course counts by year and label (from a label cube, built from df if not given), as a Figure."""
+    if cube is None:
+        cube = build_label_cube(df, label_col)
+    return yearly_trends_figure(yearly_trends_data(cube, label_col))
+
+@traced(rows_arg=None)
+def plot_departmental_breakdown(df=None, label_col="PH_Label", cube=None, top=DEFAULT_TOP, page=0):
+    """
+    Horizontal stacked bar chart of course counts by department and label (from a label cube), as a Figure.
+    - top, page: show one page of `top` departments, largest first (None for all of them in one
+      tall figure, capped at 30 inches)
+    """
+    if cube is None:
+        cube = build_label_cube(df, label_col)
+    dept, _ = department_breakdown_data(cube, label_col, top=top, page=page)
+    return department_breakdown_figure(dept)
+
+@traced()
+def taxonomy_coverage(df, taxonomy_keywords, cube=None):
+    """Return a Series with counts of courses covering each taxonomy category (from a taxonomy cube if given)."""
+    if cube is None:
+        return CoverageMatrix.from_taxonomy(df["full_text"], taxonomy_keywords).coverage(taxonomy_keywords)["n_courses"]
+    coverage = rollup(cube, "category") if len(cube) else pd.Series(dtype=int)
+    return coverage.reindex(list(taxonomy_keywords), fill_value=0).astype(int)
+
+@traced()
+def taxonomy_cooccurrence(df, taxonomy_keywords):
+    """Return a category x category DataFrame counting courses that cover both categories."""
+    return CoverageMatrix.from_taxonomy(df["full_text"], taxonomy_keywords).cooccurrence(taxonomy_keywords)
+
+@traced()
+def taxonomy_coverage_by(df, taxonomy_keywords, by="Department", cube=None):
+    """Return a DataFrame of course counts per value of `by` (e.g. Department or Year) and taxonomy category
+    (from a taxonomy cube if given)."""
+    if cube is not None:
+        counts = rollup(cube, [by, "category"]).unstack(fill_value=0) if len(cube) else pd.DataFrame()
+        return counts.reindex(columns=list(taxonomy_keywords), fill_value=0).astype(int).rename_axis(columns=None)
+    groups = df[by] if by in df.columns else dimension_frame(df)[by]
+    return CoverageMatrix.from_taxonomy(df["full_text"], taxonomy_keywords).coverage_by(taxonomy_keywords, groups)
+
+@traced()
+def keyword_analysis(df, env_keywords, health_keywords, results_cache=None, hit_cache=None):
+    """Label courses into the dashboard's keyword-analysis categories (sets df["PH_Label"])."""
+    groups = {
+        "ph": ["planetary health"],
+        "systems": ["systems"],
+        "env": [k.lower() for k in env_keywords],
+        "health": [k.lower() for k in health_keywords],
+    }
+
+    def label_texts(texts):
+        if hit_cache is not None:
+            hits = hit_cache.hit_matrix(texts, groups)
+        else:
+            hits = get_matcher(groups).hit_matrix(texts)
+        return np.select(
+            [
+                hits['ph'],
+                hits['systems'] & hits['env'] & hits['health'],
+                hits['env'] | hits['health'],
+            ],
+            [
+                'Category 1: Explicitly Planetary Health',
+                'Category 2: Planetary Health Concept',
+                'Category 3: Related Concept',
+            ],
+            default='Not Related',
+        )
+
+    if 'full_text' in df.columns:
+        texts = df['full_text']
+    else:
+        name = df['Course Name'].astype(object).map(str) if 'Course Name' in df.columns else pd.Series('', index=df.index)
+        desc = df['Course Description'].astype(object).map(str) if 'Course Description' in df.columns else pd.Series('', index=df.index)
+        texts = name + ' ' + desc
+    if results_cache is not None:
+        config = {"method": "keyword-analysis", **groups}
+        terms = df['Semester'] if 'Semester' in df.columns else None
+        df['PH_Label'] = results_cache.get_or_compute(texts, config, label_texts, terms=terms)
+    else:
+        df['PH_Label'] = label_texts(texts)
+    return df
 
 def enrollment_analysis(df):
     """Placeholder for enrollment analysis (implement if enrollment data is available)."""
     if 'Enrollment' in df.columns:
-        return df.groupby('Year')['Enrollment'].sum()
+        years = df['Year'] if 'Year' in df.columns else dimension_frame(df)['Year']
+        return df.groupby(years, observed=True)['Enrollment'].sum()
     else:
         print("No enrollment data available.")
         return None
@@ -50,5 +126,8 @@ if __name__ == "__main__":
         'full_text': ['planetary health and climate change', 'biodiversity and sustainability']
     }
     df = pd.DataFrame(data)
-    plot_yearly_trends(df)
-    plot_departmental_breakdown(df) 
\ No newline at end of file
+    # The figures are not attached to pyplot (see charts.py), so they are saved instead of shown
+    for name, fig in [("yearly_trends.png", plot_yearly_trends(df)),
+                      ("departmental_breakdown.png", plot_departmental_breakdown(df))]:
+        fig.savefig(name)
+        print(f"Saved {os.path.abspath(name)}")
\ No newline at end of file
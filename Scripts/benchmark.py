@@ -0,0 +1,360 @@
+# benchmark.py
+"""
+Benchmark harness for the course pipeline.
+
+Generates synthetic course catalogs shaped like data/*.csv (same columns,
+~15% distinct course texts, planetary health keywords sprinkled in), times
+each stage and records its peak Python memory, and writes the results as JSON
+so runs can be compared. Everything runs offline on CPU: scraping hits a local
+stub of the catalog search API and embeddings use a hashing stub unless a real
+model is requested.
+
+Usage (from the project root):
+    python Scripts/benchmark.py --rows 10000 100000 --out benchmarks/latest.json
+    python Scripts/benchmark.py --rows 10000 --stages label_series taxonomy_coverage
+    python Scripts/benchmark.py --compare benchmarks/before.json benchmarks/latest.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, ".."))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Scripts import classification, course_store
+from Scripts.analysis import keyword_analysis, taxonomy_coverage
+from Scripts.classification import tier1, tier2, tier3
+from Scripts.extract_all_terms import PER_PAGE, generate_terms, scrape_all_pages
+from Scripts.model_registry import registry
+from Scripts.search_index import SearchIndex
+
+STUB_MODEL = "stub-hashing-embedder"
+
+ENV_KEYWORDS = ["environmental change", "air pollution", "biodiversity loss", "climate change", "land use change"]
+HEALTH_KEYWORDS = ["human health", "infectious diseases", "mental health", "nutritional diseases", "mortality"]
+TAXONOMY = {
+    "Environmental change": ENV_KEYWORDS,
+    "Human health": HEALTH_KEYWORDS,
+    "Systems": ["systems thinking", "one health", "ecosystem"],
+}
+FILLER_WORDS = (
+    "introduction advanced seminar study methods analysis theory practice research design data policy "
+    "history culture society economics biology chemistry physics writing students will learn explore "
+    "topics including principles applications laboratory project field current issues global local"
+).split()
+SCHOOLS = [
+    "Krieger School of Arts and Sciences", "Whiting School of Engineering", "Bloomberg School of Public Health",
+    "School of Medicine", "School of Nursing", "Carey Business School", "School of Education",
+    "Peabody Institute", "School of Advanced International Studies", "Advanced Academic Programs",
+]
+
+
+# === Synthetic data ===
+def synthetic_catalog(n_rows, distinct_share=0.15, n_departments=500, seed=0):
+    """
+    A DataFrame with the columns of data/*.csv and n_rows sections.
+    - distinct_share: fraction of rows with a distinct course (the real catalog is ~14%)
+    """
+    rng = np.random.default_rng(seed)
+    n_courses = max(1, int(n_rows * distinct_share))
+    keywords = tier1 + tier2 + tier3 + ENV_KEYWORDS + HEALTH_KEYWORDS
+    names, descriptions = [], []
+    for i in range(n_courses):
+        words = list(rng.choice(FILLER_WORDS, size=rng.integers(30, 120)))
+        # About a third of the courses mention one or two keywords, like the real catalog
+        for kw in rng.choice(keywords, size=rng.choice([0, 0, 1, 2])):
+            words.insert(int(rng.integers(0, len(words))), kw)
+        names.append(" ".join(rng.choice(FILLER_WORDS, size=3)).title() + f" {i}")
+        descriptions.append(" ".join(words).capitalize() + ".")
+    course = rng.integers(0, n_courses, size=n_rows)
+    terms = generate_terms(2019, 2025)
+    semester = np.array(terms)[rng.integers(0, len(terms), size=n_rows)]
+    department = rng.integers(0, n_departments, size=n_rows)
+    return pd.DataFrame({
+        "Semester": semester,
+        "Academic Year": "",
+        "Location": rng.choice(["Homewood Campus", "Online", "East Baltimore", "Washington DC"], size=n_rows),
+        "Course Number (Section)": [f"AS.{c % 1000:03d}.{c % 900 + 100} ({s:02d})"
+                                    for c, s in zip(course, rng.integers(1, 20, size=n_rows))],
+        "Course Name": np.array(names, dtype=object)[course],
+        "Course Description": np.array(descriptions, dtype=object)[course],
+        "Department": [f"['Department {d}']" for d in department],
+        "School": np.array(SCHOOLS)[department % len(SCHOOLS)],
+        "Credits": rng.choice(["1.00", "3.00", "4.00", "0.5 - 3.00"], size=n_rows),
+        "Status": rng.choice(["Open", "Closed", "Waitlist Only"], size=n_rows),
+    })
+
+def write_term_files(df, data_dir):
+    """Write df as per-term CSVs (and store partitions when pyarrow is available); returns the terms."""
+    os.makedirs(data_dir, exist_ok=True)
+    terms = sorted(df["Semester"].unique())
+    for term, part in df.groupby("Semester"):
+        part.to_csv(os.path.join(data_dir, f"{term.replace(' ', '_')}.csv"), index=False)
+    if course_store.HAVE_PYARROW:
+        course_store.migrate_csvs(data_dir, os.path.join(data_dir, "course_store"), overwrite=True)
+    return terms
+
+
+# === Offline stand-ins ===
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder with the SentenceTransformer encode() interface."""
+
+    def __init__(self, dim=384):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.vectorizer = HashingVectorizer(n_features=dim, alternate_sign=False, norm="l2")
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        return self.vectorizer.transform(list(texts)).toarray().astype(np.float32)
+
+def use_stub_embedder():
+    """Preload the hashing embedder into the model registry under STUB_MODEL."""
+    registry.get(STUB_MODEL, "sentence-embedding", loader=lambda name: HashingEmbedder())
+    return STUB_MODEL
+
+class StubCatalogServer:
+    """
+    Local HTTP server answering multi_search requests with pages of a DataFrame.
+    - failures: dict mapping page number -> how many requests for that page get a 503 first
+    - report_found: include the total number of results in each response, like the real API
+    Every request is recorded in .requests as a (term, page) tuple.
+    """
+
+    def __init__(self, df, failures=None, report_found=True):
+        self.df = df
+        self.failures = dict(failures or {})
+        self.report_found = report_found
+        self.requests = []
+        self.lock = threading.Lock()
+        handler = self._handler()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/multi_search"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _handler(self):
+        by_term = {term: part for term, part in self.df.groupby("Semester")}
+        empty = self.df.iloc[:0]
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                search = body["searches"][0]
+                term = search["filter_by"].split("`")[1]
+                part = by_term.get(term, empty)
+                page = search["page"]
+                with stub.lock:
+                    stub.requests.append((term, page))
+                    fail = stub.failures.get(page, 0) > 0
+                    if fail:
+                        stub.failures[page] -= 1
+                if fail:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                rows = part.iloc[(page - 1) * PER_PAGE:page * PER_PAGE]
+                rows = rows.astype(object).where(rows.notna(), None)  # missing fields come back as null
+                hits = [{"document": {
+                    "LocationDelimited": r["Location"], "SectionName": r["Course Number (Section)"],
+                    "Title": r["Course Name"], "Description": r["Course Description"],
+                    "AllDepartments": r["Department"], "SchoolName": r["School"],
+                    "Credits": r["Credits"], "Status": r["Status"],
+                }} for r in rows.to_dict("records")]
+                result = {"found": len(part), "hits": hits} if stub.report_found else {"hits": hits}
+                payload = json.dumps({"results": [result]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# === Measuring ===
+def measure(fn, repeat=1):
+    """Run fn() `repeat` times; returns (result, best seconds, peak traced MB of one extra traced run)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    # Peak memory comes from a separate run so tracing overhead does not skew the timing
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, best, peak / 1024 ** 2
+
+def stage_functions(df, workdir, model_name):
+    """Map stage name -> zero-argument callable running that stage on df."""
+    full_text = df["Course Name"].astype(str) + " " + df["Course Description"].astype(str)
+    with_text = df.assign(full_text=full_text)
+    data_dir = os.path.join(workdir, "data")
+    terms = write_term_files(df, data_dir)
+    scrape_term = df["Semester"].value_counts().index[0]
+    examples = [f"{kw} and its effects" for kw in tier1[:5]]
+
+    search_index = SearchIndex.build(df)
+
+    def scrape():
+        with StubCatalogServer(df[df["Semester"] == scrape_term]) as server:
+            return scrape_all_pages(scrape_term, url=server.url)
+
+    return {
+        "label_course": lambda: full_text.map(classification.label_course),
+        "label_series": lambda: classification.label_series(full_text),
+        "keyword_analysis": lambda: keyword_analysis(df.copy(), ENV_KEYWORDS, HEALTH_KEYWORDS),
+        "taxonomy_coverage": lambda: taxonomy_coverage(with_text, TAXONOMY),
+        "load_semester_data_csv": lambda: course_store.load_semester_data(data_dir, terms, use_store=False),
+        "load_semester_data_store": lambda: course_store.load_semester_data(data_dir, terms, use_store=True),
+        "load_semester_data_compact": lambda: course_store.load_semester_data(data_dir, terms, use_store=False,
+                                                                              compact=True),
+        "scrape_all_pages": scrape,
+        "search_index_build": lambda: SearchIndex.build(df),
+        "search_query": lambda: [search_index.search(f'"{kw}"', k=20) for kw in ENV_KEYWORDS + HEALTH_KEYWORDS],
+        "encode_texts": lambda: classification.encode_texts(full_text, model_name, cache_dir=None),
+        "semantic_similarity": lambda: classification.semantic_similarity_classify(
+            with_text.copy(), examples, model_name, cache_dir=None),
+        "cluster_courses_streaming": lambda: classification.cluster_courses(
+            with_text.copy(), model_name, cache_dir=None, streaming=True),
+    }
+
+# Modules the dashboard imports at startup; none of them should pull in an ML backend
+IMPORT_TARGETS = [
+    "Scripts.classification", "Scripts.analysis", "Scripts.extract_all_terms", "Scripts.course_store",
+    "Scripts.classification, Scripts.analysis, Scripts.extract_all_terms, Scripts.course_store, "
+    "Scripts.coverage, Scripts.canonical, Scripts.results_cache, Scripts.model_registry",
+]
+HEAVY_MODULES = ["torch", "sentence_transformers", "transformers", "sklearn"]
+
+def measure_imports(targets=IMPORT_TARGETS, repeat=1):
+    """
+    Cold import time of each target in a fresh interpreter (best of `repeat`), and which
+    heavy ML packages it pulled in. Returns result rows like the stage benchmarks.
+    """
+    code = ("import json, sys, time; start = time.perf_counter(); import {target}; "
+            "print(json.dumps([time.perf_counter() - start, [m for m in {heavy!r} if m in sys.modules]]))")
+    results = []
+    for target in targets:
+        runs = [
+            json.loads(subprocess.run(
+                [sys.executable, "-c", code.format(target=target, heavy=HEAVY_MODULES)],
+                cwd=project_root, capture_output=True, text=True, check=True,
+            ).stdout.strip().splitlines()[-1])
+            for _ in range(repeat)
+        ]
+        seconds, heavy = min(runs)
+        name = "import dashboard modules" if "," in target else f"import {target}"
+        results.append({"stage": name, "rows": 0, "catalog_rows": 0, "seconds": round(seconds, 4),
+                        "heavy_modules": heavy})
+        warning = f"  (loads {', '.join(heavy)})" if heavy else ""
+        print(f"{name:40s} {seconds:9.3f} s{warning}")
+    return results
+
+STAGES = [
+    "label_course", "label_series", "keyword_analysis", "taxonomy_coverage", "load_semester_data_csv",
+    "load_semester_data_store", "load_semester_data_compact", "scrape_all_pages",
+    "search_index_build", "search_query", "encode_texts", "semantic_similarity",
+    "cluster_courses_streaming",
+]
+
+def run_benchmarks(row_counts, stages=None, model_name=None, repeat=1, seed=0, imports=True):
+    """Benchmark every stage at every catalog size (and the import times); returns the JSON-ready report."""
+    stages = stages or STAGES
+    results = measure_imports(repeat=repeat) if imports else []
+    model_name = model_name or use_stub_embedder()
+    for n_rows in row_counts:
+        df = synthetic_catalog(n_rows, seed=seed)
+        with tempfile.TemporaryDirectory() as workdir:
+            functions = stage_functions(df, workdir, model_name)
+            for stage in stages:
+                if stage == "load_semester_data_store" and not course_store.HAVE_PYARROW:
+                    continue
+                output, seconds, peak_mb = measure(functions[stage], repeat)
+                rows = n_rows if stage != "scrape_all_pages" else len(output)
+                results.append({
+                    "stage": stage, "rows": rows, "catalog_rows": n_rows, "seconds": round(seconds, 4),
+                    "rows_per_second": round(rows / seconds, 1) if seconds else None,
+                    "peak_traced_mb": round(peak_mb, 2),
+                })
+                print(f"{stage:28s} {n_rows:>9,d} rows  {seconds:9.3f} s  {peak_mb:9.1f} MB")
+    return {"meta": run_metadata(model_name, repeat, seed), "results": results}
+
+def run_metadata(model_name, repeat, seed):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "embedding_model": model_name,
+        "repeat": repeat,
+        "seed": seed,
+    }
+
+def compare(before_path, after_path):
+    """Table of seconds and peak memory per (stage, catalog_rows) for two result files, with speedups."""
+    def load(path):
+        with open(path) as f:
+            return pd.DataFrame(json.load(f)["results"]).set_index(["stage", "catalog_rows"])
+    before, after = load(before_path), load(after_path)
+    table = before[["seconds", "peak_traced_mb"]].join(after[["seconds", "peak_traced_mb"]],
+                                                        lsuffix="_before", rsuffix="_after", how="outer")
+    table["speedup"] = (table["seconds_before"] / table["seconds_after"]).round(2)
+    return table
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the course pipeline on synthetic catalogs.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000], help="catalog sizes (10k-1M)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, help="stages to run (default: all)")
+    parser.add_argument("--model", help="real SentenceTransformer model (default: offline hashing stub)")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per stage (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-imports", action="store_true", help="do not measure module import times")
+    parser.add_argument("--out", help="JSON file to write the results to")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files")
+    args = parser.parse_args()
+    if args.compare:
+        print(compare(*args.compare).to_string())
+    else:
+        report = run_benchmarks(args.rows, args.stages, args.model, args.repeat, args.seed,
+                                not args.skip_imports)
+        if args.out:
+            os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=1)
+            print(f"Results written to {args.out}")
@@ -0,0 +1,158 @@
+# canonical.py
+"""
+Canonical course catalog: one row per distinct course across all terms and sections.
+
+The same offering appears in every term and in many sections with the same
+Course Name and Course Description. Each distinct (normalized title,
+description) pair gets a stable course_id (a hash, so it does not change as
+terms are added). Term/section details go to a separate occurrences table.
+
+Classifiers and embedders can run once per course with per_course(), and the
+results are broadcast back to every section.
+
+write_canonical_catalog_from_files builds the same tables from the per-term
+CSVs one file at a time, so memory follows the number of distinct courses
+rather than the length of the history.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    from Scripts.course_frame import read_text_csv
+except ImportError:  # running from inside the Scripts folder
+    from course_frame import read_text_csv
+
+TITLE_COL = "Course Name"
+DESCRIPTION_COL = "Course Description"
+
+
+def normalize_field(values):
+    """Lowercase and collapse whitespace; missing values become ''."""
+    values = pd.Series(values, dtype=object).where(pd.notna(values), "")
+    return values.astype(str).str.lower().str.split().str.join(" ")
+
+def course_ids(df, title_col=TITLE_COL, description_col=DESCRIPTION_COL):
+    """Stable course_id for every row (12 hex characters), aligned with df.index."""
+    key = normalize_field(df[title_col].to_numpy()) + "\x1f" + normalize_field(df[description_col].to_numpy())
+    codes, uniques = pd.factorize(key)
+    ids = np.array([hashlib.sha1(k.encode("utf-8")).hexdigest()[:12] for k in uniques], dtype=object)
+    return pd.Series(ids[codes], index=df.index, name="course_id")
+
+def canonicalize(df, title_col=TITLE_COL, description_col=DESCRIPTION_COL):
+    """
+    Split a section-level frame into (courses, occurrences).
+    - courses: one row per course_id with the title, description, full_text,
+      n_sections and n_terms
+    - occurrences: every original row with course_id in place of title/description
+    """
+    ids = course_ids(df, title_col, description_col)
+    first = ~ids.duplicated().to_numpy()
+    courses = pd.DataFrame({
+        "course_id": ids[first].to_numpy(),
+        title_col: df[title_col].to_numpy()[first],
+        description_col: df[description_col].to_numpy()[first],
+    })
+    courses["full_text"] = courses[title_col].fillna("").astype(str) + " " + courses[description_col].fillna("").astype(str)
+    counts = ids.value_counts()
+    courses["n_sections"] = counts.reindex(courses["course_id"]).to_numpy()
+    if "Semester" in df.columns:
+        n_terms = df["Semester"].groupby(ids.to_numpy()).nunique()
+        courses["n_terms"] = n_terms.reindex(courses["course_id"]).to_numpy()
+    occurrences = df.drop(columns=[title_col, description_col])
+    occurrences.insert(0, "course_id", ids.to_numpy())
+    return courses, occurrences.reset_index(drop=True)
+
+def per_course(df, fn, columns=None, title_col=TITLE_COL, description_col=DESCRIPTION_COL):
+    """
+    Run fn once per distinct course and broadcast its output columns back to every row of df.
+    - fn: callable(courses DataFrame) -> DataFrame with the same rows plus result columns
+      (courses holds the first row of each course, with a full_text column if df lacks one)
+    - columns: result columns to copy back (default: every column fn added or changed, so results
+      left in df by an earlier classifier are overwritten)
+    Returns: df with the result columns set (modified in place)
+    """
+    ids = course_ids(df, title_col, description_col)
+    first = ~ids.duplicated().to_numpy()
+    courses = df.loc[first].copy()
+    courses.index = ids[first].to_numpy()
+    if "full_text" not in courses.columns:
+        courses["full_text"] = courses[title_col].fillna("").astype(str) + " " + courses[description_col].fillna("").astype(str)
+    before = courses.copy()
+    result = fn(courses)
+    if columns is None:
+        columns = [
+            c for c in result.columns
+            if c not in before.columns or not result[c].reindex(before.index).equals(before[c])
+        ]
+    for col in columns:
+        df[col] = result[col].reindex(ids.to_numpy()).to_numpy()
+    return df
+
+def write_canonical_catalog(df, outdir):
+    """Write courses.csv and course_occurrences.csv for a section-level frame into outdir."""
+    os.makedirs(outdir, exist_ok=True)
+    courses, occurrences = canonicalize(df)
+    courses.to_csv(os.path.join(outdir, "courses.csv"), index=False)
+    occurrences.to_csv(os.path.join(outdir, "course_occurrences.csv"), index=False)
+    return courses, occurrences
+
+def write_canonical_catalog_from_files(paths, outdir, facet_columns=("Semester", "Department", "School")):
+    """
+    Same tables as write_canonical_catalog for the concatenation of the CSVs in paths, read one file
+    at a time: occurrences are appended to course_occurrences.csv as each file is read, and only
+    the distinct courses are kept in memory.
+    - facet_columns: section columns whose distinct (course_id, value...) rows are also returned
+    Returns: (courses, facets, n_sections); facets can stand in for the occurrences when building
+    a SearchIndex.
+    """
+    os.makedirs(outdir, exist_ok=True)
+    occurrences_path = os.path.join(outdir, "course_occurrences.csv")
+    firsts, sections, term_pairs, facets = [], [], [], []
+    seen = set()
+    n_sections = 0
+    header = None
+    with open(occurrences_path + ".tmp", "w", encoding="utf-8", newline="") as out:
+        for path in paths:
+            df = read_text_csv(path)
+            if df.empty:
+                continue
+            ids = course_ids(df)
+            new = ~ids.duplicated().to_numpy() & ~ids.isin(seen).to_numpy()
+            seen.update(ids[new])
+            firsts.append(pd.DataFrame({
+                "course_id": ids[new].to_numpy(),
+                TITLE_COL: df[TITLE_COL].to_numpy()[new],
+                DESCRIPTION_COL: df[DESCRIPTION_COL].to_numpy()[new],
+            }))
+            sections.append(ids.value_counts())
+            if "Semester" in df.columns:
+                term_pairs.append(pd.DataFrame({"course_id": ids.to_numpy(), "Semester": df["Semester"].to_numpy()})
+                                  .drop_duplicates())
+            present = [c for c in facet_columns if c in df.columns]
+            facets.append(df[present].assign(course_id=ids.to_numpy())[["course_id"] + present].drop_duplicates())
+            occurrences = df.drop(columns=[TITLE_COL, DESCRIPTION_COL])
+            occurrences.insert(0, "course_id", ids.to_numpy())
+            if header is None:
+                header = list(occurrences.columns)
+            elif list(occurrences.columns) != header:
+                raise ValueError(f"Columns of {path} do not match the other files.")
+            occurrences.to_csv(out, header=n_sections == 0, index=False)
+            n_sections += len(df)
+    os.replace(occurrences_path + ".tmp", occurrences_path)
+    if not firsts:
+        courses = pd.DataFrame(columns=["course_id", TITLE_COL, DESCRIPTION_COL, "full_text", "n_sections"])
+        courses.to_csv(os.path.join(outdir, "courses.csv"), index=False)
+        return courses, pd.DataFrame(columns=["course_id", *facet_columns]), 0
+    courses = pd.concat(firsts, ignore_index=True)
+    courses["full_text"] = courses[TITLE_COL].fillna("").astype(str) + " " + courses[DESCRIPTION_COL].fillna("").astype(str)
+    counts = pd.concat(sections).groupby(level=0).sum()
+    courses["n_sections"] = counts.reindex(courses["course_id"]).to_numpy()
+    if term_pairs:
+        n_terms = pd.concat(term_pairs).drop_duplicates().groupby("course_id")["Semester"].nunique()
+        courses["n_terms"] = n_terms.reindex(courses["course_id"]).to_numpy()
+    courses.to_csv(os.path.join(outdir, "courses.csv"), index=False)
+    return courses, pd.concat(facets, ignore_index=True).drop_duplicates(), n_sections
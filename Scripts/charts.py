@@ -0,0 +1,159 @@
+# charts.py
+"""
+Chart layer for the dashboard: figures built from count cubes, never shown.
+
+Each chart has a data step (a small aggregated frame rolled up from a cube)
+and a drawing step that returns a matplotlib Figure. Figures are built
+with the object-oriented API (no pyplot state), so no window is opened and
+the Streamlit script thread is never blocked.
+
+ChartCache memoizes the rendered PNG per hash of the aggregated data and
+the chart options. A dashboard rerun after an unrelated widget change
+re-aggregates a cube of a few thousand rows and returns the stored image,
+without drawing anything.
+
+The department breakdown is paged: by default the departments with the
+most labelled courses come first, `top` per page.
+
+Usage:
+    from Scripts.charts import chart_cache
+    png = chart_cache.render("yearly_trends", cube)
+    png = chart_cache.render("department_breakdown", cube, top=25, page=1)
+"""
+
+import hashlib
+import io
+import json
+from collections import OrderedDict
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+try:
+    from Scripts.cubes import rollup
+    from Scripts.tracing import annotate, traced
+except ImportError:  # running from inside the Scripts folder
+    from cubes import rollup
+    from tracing import annotate, traced
+
+DEFAULT_TOP = 25
+BAR_HEIGHT = 0.3  # inches per department in the breakdown
+MAX_LABEL_CHARS = 40
+
+
+# === Aggregated data ===
+def yearly_trends_data(cube, label_col="PH_Label"):
+    """Course counts per Year (rows) and label (columns)."""
+    return rollup(cube, ["Year", label_col]).unstack(fill_value=0)
+
+def department_breakdown_data(cube, label_col="PH_Label", top=DEFAULT_TOP, page=0):
+    """
+    Course counts per Department and label for one page of departments, plus the page count.
+    - top: departments per page (None for all of them on one page)
+    - page: 0-based page; departments are ordered by total count, largest first
+    Departments without any course are left out.
+    """
+    dept = rollup(cube, ["Department", label_col]).unstack(fill_value=0)
+    totals = dept.sum(axis=1)
+    dept = dept.loc[totals[totals > 0].sort_values(ascending=False, kind="stable").index]
+    if not top:
+        return dept, 1
+    n_pages = max(1, -(-len(dept) // top))
+    page = min(max(page, 0), n_pages - 1)
+    return dept.iloc[page * top:(page + 1) * top], n_pages
+
+
+# === Figures ===
+def _stacked_bars(data, kind, title, xlabel, ylabel, figsize):
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    if len(data):
+        data.plot(kind=kind, stacked=True, ax=ax, title=title)
+    else:
+        ax.set_title(title)
+        ax.text(0.5, 0.5, "No data", ha="center", va="center", transform=ax.transAxes)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    fig.tight_layout()
+    return fig
+
+def yearly_trends_figure(data):
+    """Stacked bar chart of yearly_trends_data."""
+    return _stacked_bars(data, "bar", "Planetary Health Course Trends by Year", "Year", "Number of Courses", (12, 6))
+
+def department_breakdown_figure(data):
+    """Horizontal stacked bar chart of department_breakdown_data, sized to its number of departments."""
+    height = min(max(4, BAR_HEIGHT * len(data) + 1.5), 30)
+    labels = [v if len(v) <= MAX_LABEL_CHARS else v[:MAX_LABEL_CHARS - 1] + "…" for v in map(str, data.index)]
+    # Largest department on top
+    return _stacked_bars(data.set_axis(labels).iloc[::-1], "barh", "Departmental Distribution",
+                         "Number of Courses", "Department", (10, height))
+
+def to_png(fig, dpi=100):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    return buffer.getvalue()
+
+
+CHARTS = {
+    # kind -> (data function, figure function)
+    "yearly_trends": (yearly_trends_data, yearly_trends_figure),
+    "department_breakdown": (department_breakdown_data, department_breakdown_figure),
+}
+
+def data_hash(data):
+    """Content hash of an aggregated frame (values, index and columns)."""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    digest.update(json.dumps([list(map(str, data.columns)), data.index.names], default=str).encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+class ChartCache:
+    """
+    Rendered charts (PNG bytes) per (chart kind, aggregated data hash, dpi).
+    Options such as top/page only matter through the data they select.
+    - max_charts: number of images to keep (least recently used are dropped)
+    """
+
+    def __init__(self, max_charts=64):
+        self.max_charts = max_charts
+        self._images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._images)
+
+    def data(self, kind, cube, **options):
+        """The aggregated frame of a chart (and the page count for paged charts)."""
+        return CHARTS[kind][0](cube, **options)
+
+    @traced("charts.render", rows_arg=None)
+    def render(self, kind, cube, dpi=100, **options):
+        """
+        PNG of a chart of a cube, drawn only if this data and these options were not drawn before.
+        - kind: "yearly_trends" or "department_breakdown"
+        - options: passed to the chart's data function (label_col, top, page)
+        """
+        data = self.data(kind, cube, **options)
+        if isinstance(data, tuple):
+            data = data[0]
+        key = (kind, data_hash(data), dpi)
+        if key in self._images:
+            self.hits += 1
+            self._images.move_to_end(key)
+            annotate(cache_hits=1)
+            return self._images[key]
+        self.misses += 1
+        annotate(cache_misses=1)
+        image = to_png(CHARTS[kind][1](data), dpi=dpi)
+        self._images[key] = image
+        while len(self._images) > self.max_charts:
+            self._images.popitem(last=False)
+        return image
+
+    def clear(self):
+        self._images.clear()
+        self.hits = self.misses = 0
+
+chart_cache = ChartCache()
@@ -11,11 +11,26 @@ Categories:
 Edit the keyword lists below to match your taxonomy.
 """
 
+import importlib
+import os
+import sys
+import threading
+
 import numpy as np
 import pandas as pd
-# For semantic similarity
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+
+try:
+    from Scripts.keyword_matcher import get_matcher
+    from Scripts.embedding_cache import DEFAULT_CACHE_DIR, EmbeddingCache
+    from Scripts.model_registry import get_model, registry
+    from Scripts.vector_index import DEFAULT_INDEX_DIR, VectorIndex
+    from Scripts.tracing import traced
+except ImportError:  # running from inside the Scripts folder
+    from keyword_matcher import get_matcher
+    from embedding_cache import DEFAULT_CACHE_DIR, EmbeddingCache
+    from model_registry import get_model, registry
+    from vector_index import DEFAULT_INDEX_DIR, VectorIndex
+    from tracing import traced
 
 # === Detailed Keyword Lists by Tiers ===
 tier1 = ["planetary health"]
@@ -29,6 +44,17 @@ tier3 = [
     "mental health", "public health", "disaster preparedness", "adaptation", "mitigation"
 ]
 
+# Default taxonomy for coverage views (the dashboard's starting keyword lists)
+ENV_KEYWORDS = [
+    "environmental change", "air pollution", "biodiversity loss", "climate change", "resource scarcity",
+    "land use change", "nutrient cycling", "ocean degradation", "environment", "eco-systems"
+]
+HEALTH_KEYWORDS = [
+    "human health", "infectious diseases", "injuries", "reproductive health", "mental health",
+    "noncommunicable diseases", "nutritional diseases", "displacement", "conflict", "mortality"
+]
+DEFAULT_TAXONOMY = {"Environmental change": ENV_KEYWORDS, "Human health": HEALTH_KEYWORDS}
+
 CATEGORY_LABELS = [
     "About Planetary Health",           # tier1
     "Planetary Health Core Concept",    # tier2
@@ -36,82 +62,450 @@ CATEGORY_LABELS = [
     "Not Related"                      # none
 ]
 
+def tier_groups():
+    return {"tier1": tier1, "tier2": tier2, "tier3": tier3}
+
+def tier_matcher():
+    """Compiled matcher for the current tier keyword lists (recompiled only when they change)."""
+    return get_matcher(tier_groups())
+
+def labels_from_tier_hits(hits):
+    """Map a tier hit matrix (columns tier1/tier2/tier3) to category labels."""
+    return np.select(
+        [hits["tier1"].to_numpy(), hits["tier2"].to_numpy(), hits["tier3"].to_numpy()],
+        CATEGORY_LABELS[:3],
+        default=CATEGORY_LABELS[3],
+    )
+
+_tier_keywords = {"lists": None, "tiers": ()}  # copies of the tier lists -> their lowercased keywords
+
+def tier_keywords():
+    """Lowercased keywords of each tier, rebuilt only when a tier list changes (also in place)."""
+    lists = (tier1, tier2, tier3)
+    if _tier_keywords["lists"] != lists:
+        _tier_keywords["tiers"] = tuple(tuple(str(kw).lower() for kw in tier if kw) for tier in lists)
+        _tier_keywords["lists"] = tuple(list(tier) for tier in lists)
+    return _tier_keywords["tiers"]
+
 def label_course(text):
-    """Rule-based classification into four groups based on keywords."""
+    """
+    Rule-based classification into four groups based on keywords.
+    A single text is checked with plain substring tests, which beat one regex scan at this size;
+    label_series is the faster choice for many texts.
+    """
     text = text.lower() if isinstance(text, str) else ""
-    if any(kw in text for kw in tier1):
-        return CATEGORY_LABELS[0]
-    elif any(kw in text for kw in tier2):
-        return CATEGORY_LABELS[1]
-    elif any(kw in text for kw in tier3):
-        return CATEGORY_LABELS[2]
-    else:
-        return CATEGORY_LABELS[3]
+    for label, keywords in zip(CATEGORY_LABELS, tier_keywords()):
+        if any(kw in text for kw in keywords):
+            return label
+    return CATEGORY_LABELS[3]
+
+@traced()
+def label_series(texts, results_cache=None, terms=None):
+    """
+    Vectorized rule-based classification of a whole Series; returns a Series of labels.
+    - results_cache: optional ResultsCache; only rows not labeled with the current tier lists are relabeled
+    - terms: optional Series of terms (e.g. df["Semester"]) used in the cache key
+    """
+    texts = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+    if results_cache is not None:
+        config = {"method": "rule-based", **tier_groups()}
+        return results_cache.get_or_compute(texts, config, label_series, terms=terms)
+    hits = tier_matcher().hit_matrix(texts)
+    return pd.Series(labels_from_tier_hits(hits), index=texts.index)
 
 def batch_label_courses(texts):
     """Apply rule-based classification to a pandas Series or list of texts."""
-    return [label_course(t) for t in texts]
+    return label_series(texts).tolist()
+
+# --- Embeddings (cached on disk) ---
+@traced()
+def encode_texts(texts, model_name="all-MiniLM-L6-v2", cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Embed texts with a SentenceTransformer model, returning a float32 array (one row per text).
+    Vectors are reused from the on-disk cache in cache_dir; pass cache_dir=None to disable it.
+    The model is only fetched from the model registry if at least one text is not cached yet.
+    """
+    if cache_dir is None:
+        codes, uniques = pd.factorize(pd.Series(list(texts), dtype=object), use_na_sentinel=False)
+        return np.asarray(_encoder(model_name)(list(uniques)), dtype=np.float32)[codes]
+    return EmbeddingCache(cache_dir, model_name).get_or_encode(texts, _encoder(model_name))
+
+def iter_embedding_chunks(texts, model_name="all-MiniLM-L6-v2", cache_dir=DEFAULT_CACHE_DIR, chunk_size=4096):
+    """Yield (start, float32 embeddings) for consecutive chunks of texts, one chunk in memory at a time."""
+    texts = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+    for start in range(0, len(texts), chunk_size):
+        yield start, encode_texts(texts.iloc[start:start + chunk_size].tolist(), model_name, cache_dir)
+
+@traced()
+def encode_streaming(texts, model_name="all-MiniLM-L6-v2", cache_dir=DEFAULT_CACHE_DIR, chunk_size=4096,
+                     dtype=np.float32, out_path=None):
+    """
+    Embed texts chunk by chunk into one preallocated array, so peak memory is the result plus one chunk.
+    - dtype: np.float32, or np.float16 to halve the size of the result
+    - out_path: optional .npy file to write the result to as a memory map instead of RAM
+    Returns: array (or memmap) of shape (len(texts), dim)
+    """
+    buffer = None
+    for start, chunk in iter_embedding_chunks(texts, model_name, cache_dir, chunk_size):
+        if buffer is None:
+            shape = (len(texts), chunk.shape[1])
+            if out_path:
+                buffer = np.lib.format.open_memmap(out_path, mode="w+", dtype=dtype, shape=shape)
+            else:
+                buffer = np.empty(shape, dtype=dtype)
+        buffer[start:start + len(chunk)] = chunk
+    return buffer if buffer is not None else np.empty((0, 0), dtype=dtype)
+
+def _encoder(model_name):
+    return lambda batch: get_model(model_name, "sentence-embedding").encode(batch, convert_to_numpy=True)
+
+_course_indexes = {}
+
+def course_index(model_name="all-MiniLM-L6-v2", cache_dir=DEFAULT_CACHE_DIR, index_dir=DEFAULT_INDEX_DIR):
+    """
+    Vector index over every cached embedding of model_name, kept in sync with the cache.
+    Returns (index, cache). The index is loaded from disk once per process.
+    """
+    cache = EmbeddingCache(cache_dir, model_name)
+    path = os.path.join(index_dir, os.path.basename(cache.path))
+    if path not in _course_indexes:
+        _course_indexes[path] = VectorIndex.load(path)
+    return _course_indexes[path].sync(cache), cache
+
+@traced()
+def similar_courses(df, queries, k=10, model_name="all-MiniLM-L6-v2", text_col="full_text",
+                    cache_dir=DEFAULT_CACHE_DIR, index_dir=DEFAULT_INDEX_DIR, n_probe=8):
+    """
+    Courses in df most similar to one or more query texts (a course description or example set).
+    Uses the approximate nearest-neighbor index; rows with the same text as a query are skipped.
+    Queries are embedded without being added to the embedding cache or the index.
+    Returns: the top-k rows of df (one per distinct text) with a 'similarity' column, best first.
+    """
+    queries = [queries] if isinstance(queries, str) else list(queries)
+    cache = EmbeddingCache(cache_dir, model_name)
+    row_keys = cache.ensure(df[text_col].tolist(), _encoder(model_name))
+    query_vectors = cache.lookup(queries, _encoder(model_name))
+    index, cache = course_index(model_name, cache_dir, index_dir)
+    first_row = {}
+    for pos, key in enumerate(row_keys):
+        first_row.setdefault(key, pos)
+    # The index also holds texts from outside df, so ask for extra candidates before filtering
+    scores, keys = index.search(query_vectors, k=k * 5 + len(queries), n_probe=n_probe)
+    best = {}
+    skip = {cache.text_key(q) for q in queries}
+    for query_scores, query_result in zip(scores, keys):
+        for score, key in zip(query_scores, query_result):
+            if key in first_row and key not in skip and score > best.get(key, -np.inf):
+                best[key] = score
+    top = sorted(best, key=best.get, reverse=True)[:k]
+    result = df.iloc[[first_row[key] for key in top]].copy()
+    result['similarity'] = [best[key] for key in top]
+    return result
+
+def _max_similarity(vector_chunks, example_vectors):
+    """Exact best cosine similarity of each vector to any example, from (start, vectors) chunks."""
+    unit = lambda v: v / np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-12)
+    examples = unit(np.atleast_2d(np.asarray(example_vectors, dtype=np.float32)))
+    maxima = [(unit(np.asarray(chunk, dtype=np.float32)) @ examples.T).max(axis=1) for _, chunk in vector_chunks]
+    return np.concatenate(maxima) if maxima else np.empty(0, dtype=np.float32)
 
 # --- Semantic Similarity Classification ---
-def semantic_similarity_classify(df, known_examples, model_name="all-MiniLM-L6-v2", text_col="full_text"):
+@traced()
+def semantic_similarity_classify(df, known_examples, model_name="all-MiniLM-L6-v2", text_col="full_text",
+                                 cache_dir=DEFAULT_CACHE_DIR, results_cache=None, term_col="Semester",
+                                 chunk_size=4096):
     """
     Classify courses by semantic similarity to known planetary health examples.
     - df: DataFrame with a column text_col
     - known_examples: list of prototypical planetary health course descriptions
     - model_name: SentenceTransformer model name
     - text_col: column to use for course text
+    - cache_dir: embedding cache folder (None to always re-encode)
+    - results_cache: optional ResultsCache; only rows without a score for these examples are scored
+    - chunk_size: rows encoded and compared at a time (peak memory stays flat as the catalog grows)
+    Each course gets its exact best cosine similarity to any example, computed a chunk of vectors
+    at a time (the approximate index search is only used for similar_courses).
+    The examples are embedded without being added to the embedding cache or the index.
     Returns: DataFrame with a new column 'semantic_score'
     """
-    model = SentenceTransformer(model_name)
-    known_embeddings = model.encode(known_examples, convert_to_tensor=True)
-    catalog_embeddings = model.encode(df[text_col].tolist(), convert_to_tensor=True)
-    similarities = cosine_similarity(catalog_embeddings.cpu().numpy(), known_embeddings.cpu().numpy())
-    df['semantic_score'] = similarities.max(axis=1)
+    if cache_dir is None:
+        known_embeddings = encode_texts(known_examples, model_name, None)
+    else:
+        known_embeddings = EmbeddingCache(cache_dir, model_name).lookup(known_examples, _encoder(model_name))
+
+    def score(texts):
+        if cache_dir is None:
+            return _max_similarity(iter_embedding_chunks(texts, model_name, None, chunk_size), known_embeddings)
+        cache = EmbeddingCache(cache_dir, model_name)
+        rows = cache.rows(cache.ensure(texts.tolist(), _encoder(model_name), chunk_size))
+        matrix = cache.matrix()
+        chunks = ((start, matrix[rows[start:start + chunk_size]]) for start in range(0, len(rows), chunk_size))
+        return _max_similarity(chunks, known_embeddings)
+
+    if results_cache is None:
+        df['semantic_score'] = score(df[text_col])
+    else:
+        config = {"method": "semantic", "model_name": model_name, "examples": list(known_examples)}
+        terms = df[term_col] if term_col in df.columns else None
+        df['semantic_score'] = results_cache.get_or_compute(df[text_col], config, score, terms=terms)
     return df
 
 # --- Zero-shot Classification (HuggingFace Transformers) ---
-def zero_shot_classify(texts, candidate_labels=None, model_name="facebook/bart-large-mnli"):
+def zero_shot_classify(texts, candidate_labels=None, model_name="facebook/bart-large-mnli",
+                       results_cache=None, terms=None):
     """
     Classify texts using zero-shot classification. Requires transformers library.
     - texts: list of strings
     - candidate_labels: list of category names or descriptions
+    - results_cache: optional ResultsCache; only texts not yet classified with these labels are run
+    - terms: optional list of terms used in the cache key
     Returns: list of predicted labels
     """
-    try:
-        from transformers import pipeline
-    except ImportError:
-        raise ImportError("transformers library is required for zero-shot classification.")
     if candidate_labels is None:
         candidate_labels = CATEGORY_LABELS
-    classifier = pipeline("zero-shot-classification", model=model_name)
+    if results_cache is not None:
+        config = {"method": "zero-shot", "model_name": model_name, "labels": list(candidate_labels)}
+        return results_cache.get_or_compute(
+            texts, config, lambda t: zero_shot_classify(t.tolist(), candidate_labels, model_name), terms=terms
+        ).tolist()
+    classifier = get_model(model_name, "zero-shot-classification")
     results = classifier(texts, candidate_labels)
     # Return the label with the highest score for each text
     return [r['labels'][0] for r in results]
 
+def _truncate_by_tokens(tokenizer, texts, max_tokens):
+    """Token length of each text, and the texts cut to their first max_tokens tokens."""
+    if tokenizer is not None and getattr(tokenizer, "is_fast", False):
+        enc = tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True)
+        lengths, cut = [], []
+        for text, offsets in zip(texts, enc["offset_mapping"]):
+            lengths.append(min(len(offsets), max_tokens))
+            cut.append(text[:offsets[max_tokens - 1][1]] if len(offsets) > max_tokens else text)
+        return lengths, cut
+    # No fast tokenizer: approximate tokens by whitespace-separated words
+    words = [t.split() for t in texts]
+    return ([min(len(w), max_tokens) for w in words],
+            [" ".join(w[:max_tokens]) if len(w) > max_tokens else t for w, t in zip(words, texts)])
+
+def iter_zero_shot_scores(texts, candidate_labels=None, model_name="facebook/bart-large-mnli",
+                          batch_size=16, max_tokens=400):
+    """
+    Batched zero-shot classification that yields results as batches finish.
+    Texts are sorted by token length so each batch holds similar lengths (little padding),
+    cut to max_tokens tokens, and passed to the model batch_size at a time.
+    Batches run one after the other on the calling thread: the pipeline is not thread-safe
+    and torch already spreads each batch over the CPU cores. A batch is only run when the
+    previous result has been consumed, so an abandoned generator stops the work.
+    Yields (positions, DataFrame of scores with one column per candidate label).
+    """
+    if candidate_labels is None:
+        candidate_labels = CATEGORY_LABELS
+    texts = [t if isinstance(t, str) else "" for t in texts]
+    classifier = get_model(model_name, "zero-shot-classification")
+    lengths, texts = _truncate_by_tokens(getattr(classifier, "tokenizer", None), texts, max_tokens)
+    order = np.argsort(lengths, kind="stable")
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        results = classifier([texts[i] for i in batch], candidate_labels, batch_size=batch_size)
+        if isinstance(results, dict):
+            results = [results]
+        scores = [dict(zip(r["labels"], r["scores"])) for r in results]
+        yield batch, pd.DataFrame(scores, index=batch, columns=list(candidate_labels))
+
+@traced()
+def zero_shot_scores(texts, candidate_labels=None, model_name="facebook/bart-large-mnli", batch_size=16,
+                     max_tokens=400, progress_callback=None, results_cache=None, terms=None):
+    """
+    Full label-score matrix from zero-shot classification (see iter_zero_shot_scores).
+    - progress_callback: optional callable(done, total) called after each batch
+    - results_cache: optional ResultsCache; only texts without cached scores are run
+    Returns: DataFrame (one row per text, in input order; one column per candidate label)
+    """
+    if candidate_labels is None:
+        candidate_labels = CATEGORY_LABELS
+    texts = list(texts)
+    if results_cache is not None:
+        config = {"method": "zero-shot-scores", "model_name": model_name,
+                  "labels": list(candidate_labels), "max_tokens": max_tokens}
+        rows = results_cache.get_or_compute(
+            texts, config,
+            lambda t: [tuple(r) for r in zero_shot_scores(
+                t.tolist(), candidate_labels, model_name, batch_size, max_tokens,
+                progress_callback).to_numpy()],
+            terms=terms,
+        )
+        return pd.DataFrame(rows.tolist(), columns=list(candidate_labels))
+    # Each distinct text goes through the model once; duplicates get a copy of its scores
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object), use_na_sentinel=False)
+    scores = pd.DataFrame(np.nan, index=range(len(uniques)), columns=list(candidate_labels))
+    done = 0
+    for positions, batch_scores in iter_zero_shot_scores(list(uniques), candidate_labels, model_name,
+                                                         batch_size, max_tokens):
+        scores.iloc[positions] = batch_scores.to_numpy()
+        done += len(positions)
+        if progress_callback is not None:
+            progress_callback(done, len(uniques))
+    return scores.iloc[codes].reset_index(drop=True)
+
+# --- Cascade: cheap stages first, zero-shot only for the ambiguous middle band ---
+CASCADE_STAGES = ["rules", "similarity", "zero-shot", "unresolved"]
+
+def tfidf_similarity(texts, reference_texts):
+    """
+    Cheap similarity score: max TF-IDF cosine between each text and the reference texts.
+    The vocabulary is fitted on the distinct texts only. Returns a numpy array aligned with texts.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    texts = pd.Series(list(texts), dtype=object).fillna("").astype(str)
+    codes, uniques = pd.factorize(texts)
+    vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), sublinear_tf=True)
+    doc_matrix = vectorizer.fit_transform(uniques)
+    ref_matrix = vectorizer.transform(list(reference_texts))
+    # Rows are L2-normalized, so the sparse dot product is the cosine similarity
+    unique_scores = (doc_matrix @ ref_matrix.T).max(axis=1).toarray().ravel()
+    return unique_scores[codes]
+
+@traced()
+def cascade_classify(df, text_col="full_text", reference_texts=None, low=0.05, high=0.10,
+                     use_zero_shot=True, model_name="facebook/bart-large-mnli", **zero_shot_kwargs):
+    """
+    Tiered classification that only sends ambiguous courses to the zero-shot model.
+    1. rules: tier1/tier2 keyword hits (label_course) are accepted as-is.
+    2. similarity: TF-IDF score against reference_texts (default: the tier keywords).
+       No keyword hit and score < low -> Not Related; tier3 hit and score >= high -> Adjacent.
+    3. zero-shot: everything else is scored with zero_shot_scores (extra kwargs are passed on).
+       With use_zero_shot=False these rows keep their rule label and are marked 'unresolved'.
+    Returns: DataFrame with new columns 'PH_Label', 'cascade_stage' and 'cascade_score'
+    """
+    if reference_texts is None:
+        reference_texts = [" ".join(tier1 + tier2), " ".join(tier3)] + tier1 + tier2 + tier3
+    texts = df[text_col]
+    labels = label_series(texts).to_numpy(dtype=object)
+    scores = tfidf_similarity(texts, reference_texts)
+    rule_hit = np.isin(labels, CATEGORY_LABELS[:2])
+    not_related = (labels == CATEGORY_LABELS[3]) & (scores < low)
+    adjacent = (labels == CATEGORY_LABELS[2]) & (scores >= high)
+    stage = np.select([rule_hit, not_related | adjacent], CASCADE_STAGES[:2], default=CASCADE_STAGES[3])
+    ambiguous = np.flatnonzero(stage == CASCADE_STAGES[3])
+    if use_zero_shot and len(ambiguous):
+        zs = zero_shot_scores(texts.iloc[ambiguous].tolist(), CATEGORY_LABELS, model_name, **zero_shot_kwargs)
+        labels[ambiguous] = zs.idxmax(axis=1).to_numpy()
+        stage[ambiguous] = CASCADE_STAGES[2]
+    df['PH_Label'] = labels
+    df['cascade_stage'] = stage
+    df['cascade_score'] = scores
+    return df
+
+def cascade_summary(df):
+    """Number and fraction of rows resolved by each cascade stage."""
+    counts = df['cascade_stage'].value_counts().reindex(CASCADE_STAGES, fill_value=0)
+    return pd.DataFrame({"rows": counts, "fraction": counts / max(len(df), 1)})
+
 # --- Clustering-based Classification (Exploratory) ---
-def cluster_courses(df, model_name="all-MiniLM-L6-v2", text_col="full_text", n_clusters=4):
+@traced()
+def cluster_courses(df, model_name="all-MiniLM-L6-v2", text_col="full_text", n_clusters=4,
+                    cache_dir=DEFAULT_CACHE_DIR, streaming=False, chunk_size=4096, dtype=np.float32,
+                    out_path=None, n_epochs=3):
     """
     Cluster courses using embeddings and KMeans. Returns cluster labels.
     - df: DataFrame with a column text_col
     - model_name: SentenceTransformer model name
     - n_clusters: number of clusters
+    - cache_dir: embedding cache folder (None to always re-encode)
+    - streaming: encode in chunks into one preallocated buffer (dtype, optionally memmapped to
+      out_path) and fit MiniBatchKMeans chunk by chunk over n_epochs passes; for the full catalog
     Returns: DataFrame with a new column 'cluster_label'
     """
+    if streaming:
+        from sklearn.cluster import MiniBatchKMeans
+        embeddings = encode_streaming(df[text_col], model_name, cache_dir, chunk_size, dtype, out_path)
+        chunks = range(0, len(embeddings), chunk_size)
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, batch_size=chunk_size, n_init=3)
+        for _ in range(n_epochs):
+            for start in chunks:
+                kmeans.partial_fit(np.asarray(embeddings[start:start + chunk_size], dtype=np.float32))
+        cluster_labels = np.empty(len(embeddings), dtype=np.int32)
+        for start in chunks:
+            cluster_labels[start:start + chunk_size] = kmeans.predict(
+                np.asarray(embeddings[start:start + chunk_size], dtype=np.float32))
+        df['cluster_label'] = cluster_labels
+        return df
     from sklearn.cluster import KMeans
-    model = SentenceTransformer(model_name)
-    embeddings = model.encode(df[text_col].tolist(), convert_to_tensor=True)
+    embeddings = encode_texts(df[text_col].tolist(), model_name, cache_dir)
     kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    cluster_labels = kmeans.fit_predict(embeddings.cpu().numpy())
+    cluster_labels = kmeans.fit_predict(embeddings)
     df['cluster_label'] = cluster_labels
     return df
 
+# --- Background warm-up of the ML backends ---
+# Nothing heavy is imported with this module: each model-based method imports its
+# backend (sklearn, sentence-transformers/torch, transformers) on first use.
+# warm_up() does that ahead of time in a background thread.
+WARM_UP_BACKENDS = {
+    # method: (modules to import, (task, default model) to load)
+    "semantic": ([], ("sentence-embedding", "all-MiniLM-L6-v2")),
+    "similar": ([], ("sentence-embedding", "all-MiniLM-L6-v2")),
+    "zero-shot": ([], ("zero-shot-classification", "facebook/bart-large-mnli")),
+    "cascade": (["sklearn.feature_extraction.text"], ("zero-shot-classification", "facebook/bart-large-mnli")),
+    "clustering": (["sklearn.cluster"], ("sentence-embedding", "all-MiniLM-L6-v2")),
+}
+_warm_ups = {}        # (modules, (task, model) or None) -> thread
+_warm_up_errors = {}  # same key -> message of the last failed warm-up
+
+def _warm_up_key(method, model_name=None, use_model=True):
+    modules, (task, default_model) = WARM_UP_BACKENDS[method]
+    return tuple(modules), ((task, model_name or default_model) if use_model else None)
+
+def warm_up(method, model_name=None, use_model=True):
+    """
+    Import a method's backends and load its model in a background thread.
+    - method: a key of WARM_UP_BACKENDS
+    - model_name: model to load instead of the method's default
+    - use_model: False to only import the backends (e.g. a cascade that never calls zero-shot)
+    Returns the thread. A running or finished warm-up of the same backends and model is reused;
+    it is started again if it failed or the model has since been evicted from the registry.
+    """
+    key = _warm_up_key(method, model_name, use_model)
+    modules, model = key
+    thread = _warm_ups.get(key)
+    if thread is not None and (thread.is_alive() or model is None or registry.is_loaded(model[1], model[0])):
+        return thread
+
+    def run():
+        try:
+            for module in modules:
+                importlib.import_module(module)
+            if model is not None:
+                get_model(model[1], model[0])
+            _warm_up_errors.pop(key, None)
+        except Exception as e:
+            _warm_up_errors[key] = str(e)
+            if _warm_ups.get(key) is threading.current_thread():
+                del _warm_ups[key]
+            print(f"Background warm-up for {method} ({model_name or 'default model'}) failed: {e}")
+
+    _warm_ups[key] = threading.Thread(target=run, name=f"warm-up {method}", daemon=True)
+    _warm_ups[key].start()
+    return _warm_ups[key]
+
+def is_warm(method, model_name=None, use_model=True):
+    """Whether the backends and (with use_model) the model of a method are loaded and ready."""
+    modules, model = _warm_up_key(method, model_name, use_model)
+    if model is not None:
+        return registry.is_loaded(model[1], model[0])
+    return all(module in sys.modules for module in modules)
+
+def warm_up_error(method, model_name=None, use_model=True):
+    """Message of the last failed warm-up of a method and model, or None."""
+    return _warm_up_errors.get(_warm_up_key(method, model_name, use_model))
+
 if __name__ == "__main__":
     # Example usage
     # Load your data
     # df = pd.read_json("fa25.json")
     # df["full_text"] = df["Course Name"] + " " + df["Course Description"]
     # Rule-based
-    # df["PH_Label"] = df["full_text"].apply(label_course)
+    # df["PH_Label"] = label_series(df["full_text"])
     # print(df["PH_Label"].value_counts())
     # Semantic similarity
     # known_examples = [ ... ]  # List of planetary health course descriptions
@@ -0,0 +1,135 @@
+# course_frame.py
+"""
+Typed, compact course frames.
+
+The catalog repeats a few values over tens of thousands of sections: a dozen
+terms and schools, a few hundred departments, a few thousand distinct courses.
+compact_frame() stores those columns as categoricals and parses each distinct
+value only once:
+
+- Location lists ("['Homewood Campus', 'Online']") become a readable Campus column
+- Credits ("1.00 - 3.00") get numeric Credits Min / Credits Max columns
+- full_text is built once per distinct course (title + description; a missing
+  description counts as empty) and shared by every section of it
+
+The original columns keep their values, so results still export to the same
+CSVs (export_frame drops the derived columns), and the analysis and
+classification functions take the compact frame as is.
+
+Run `python Scripts/course_frame.py` for a memory report on the saved CSVs.
+"""
+
+import ast
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = [
+    "Semester", "Academic Year", "Location", "Course Number (Section)", "Course Name",
+    "Course Description", "Department", "School", "Credits", "Status",
+]
+DERIVED_COLUMNS = ["Campus", "Credits Min", "Credits Max", "full_text"]
+
+
+def parse_list(value):
+    """A stringified list such as "['Homewood Campus']" as a tuple of strings (a plain string becomes a 1-tuple)."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ()
+    text = str(value).strip()
+    if text.startswith("["):
+        try:
+            return tuple(str(v) for v in ast.literal_eval(text))
+        except (ValueError, SyntaxError):
+            pass
+    return (text,) if text else ()
+
+def _as_category(values):
+    return values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category")
+
+def _per_category(values, fn, missing=None):
+    """fn applied once per category of a categorical Series, broadcast to its rows as a numpy array."""
+    mapped = np.empty(len(values.cat.categories) + 1, dtype=object)  # 1-D even when fn returns tuples
+    mapped[:] = [fn(c) for c in values.cat.categories] + [missing]
+    return mapped[values.cat.codes.to_numpy()]  # code -1 (missing) picks the trailing `missing`
+
+def _credit_bounds(value):
+    try:
+        bounds = [float(part) for part in str(value).split("-")]
+    except ValueError:
+        return (np.nan, np.nan)
+    return (min(bounds), max(bounds))
+
+def _full_text(name, description):
+    """Title + " " + description per row, concatenated once per distinct (title, description) pair."""
+    name_codes = name.cat.codes.to_numpy().astype(np.int64)
+    desc_codes = description.cat.codes.to_numpy().astype(np.int64)
+    codes, pairs = pd.factorize(name_codes * (len(description.cat.categories) + 1) + desc_codes + 1)
+    names = np.append(name.cat.categories.to_numpy(dtype=object), "")
+    descriptions = np.append(description.cat.categories.to_numpy(dtype=object), "")
+    pair_name = pairs // (len(description.cat.categories) + 1)
+    pair_desc = pairs % (len(description.cat.categories) + 1) - 1
+    text_codes, uniques = pd.factorize(pd.Series(
+        [f"{names[n]} {descriptions[d]}" for n, d in zip(pair_name, pair_desc)], dtype=object))
+    return pd.Series(pd.Categorical.from_codes(text_codes[codes], uniques), index=name.index)
+
+def compact_frame(df):
+    """
+    Typed copy of a course frame: categorical columns plus Campus, Credits Min/Max and full_text.
+    Columns that are already categorical (e.g. from the course store) are kept as they are.
+    """
+    out = pd.DataFrame(index=df.index)
+    for col in df.columns:
+        out[col] = _as_category(df[col]) if col in CATEGORY_COLUMNS else df[col]
+    if "Location" in out.columns and "Campus" not in out.columns:
+        campus = _per_category(out["Location"], lambda v: "; ".join(parse_list(v)))
+        out["Campus"] = pd.Series(campus, index=out.index).astype("category")
+    if "Credits" in out.columns and "Credits Min" not in out.columns:
+        bounds = np.array(list(_per_category(out["Credits"], _credit_bounds, missing=(np.nan, np.nan))),
+                          dtype=np.float32).reshape(-1, 2)
+        out["Credits Min"], out["Credits Max"] = bounds[:, 0], bounds[:, 1]
+    if "full_text" not in out.columns and "Course Name" in out.columns and "Course Description" in out.columns:
+        out["full_text"] = _full_text(out["Course Name"], out["Course Description"])
+    return out
+
+def export_frame(df):
+    """
+    df with only the columns a results CSV had before compact_frame: the Campus and Credits
+    Min/Max columns derived for the dashboard are dropped (full_text stays, as classification adds it).
+    """
+    return df.drop(columns=[c for c in DERIVED_COLUMNS if c != "full_text"], errors="ignore")
+
+def read_text_csv(path, columns=None):
+    """
+    A course CSV with every column read as text, the way the course store keeps it
+    ("3.00" stays "3.00" instead of becoming a float in terms where every value is numeric).
+    Empty cells are missing values.
+    """
+    return pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False, na_values=[""])
+
+def read_compact_csv(paths, columns=None):
+    """Read one or more course CSVs into a single compact frame (columns are encoded once, after the concat)."""
+    paths = [paths] if isinstance(paths, (str, os.PathLike)) else list(paths)
+    if not paths:
+        return pd.DataFrame()
+    return compact_frame(pd.concat([read_text_csv(path, columns) for path in paths], ignore_index=True))
+
+def memory_report(frames):
+    """
+    Deep memory use per column, in MB, for each of a {name: DataFrame} dict (plus a total row).
+    Columns missing from a frame are left empty.
+    """
+    report = pd.DataFrame({
+        name: df.memory_usage(deep=True, index=False) / 1024 ** 2 for name, df in frames.items()
+    })
+    report.loc["total"] = report.sum()
+    return report.round(2)
+
+if __name__ == "__main__":
+    data_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+    paths = sorted(p for p in glob.glob(os.path.join(data_dir, "*.csv")) if not p.endswith("all_courses.csv"))
+    default = pd.concat([pd.read_csv(p) for p in paths], ignore_index=True)
+    default["full_text"] = default["Course Name"].astype(str) + " " + default["Course Description"].astype(str)
+    print(f"{len(default)} rows from {len(paths)} term files")
+    print(memory_report({"read_csv": default, "compact": read_compact_csv(paths)}))
@@ -0,0 +1,211 @@
+# course_store.py
+"""
+Columnar course store: one Parquet partition per term.
+
+Layout: data/course_store/term=<Season_Year>/part-0.parquet
+
+Low-cardinality columns (Semester, Department, School, Location, ...) are
+dictionary-encoded and come back as pandas categoricals. Writing a term only
+touches that term's partition, and readers load just the selected terms and
+columns. Requires pyarrow; the per-term CSVs stay the source for the
+migration and a fallback when pyarrow is not installed.
+
+Run `python Scripts/course_store.py` to migrate the existing CSVs.
+"""
+
+import os
+from itertools import groupby
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+try:
+    from Scripts.course_frame import compact_frame, read_compact_csv, read_text_csv
+except ImportError:  # running from inside the Scripts folder
+    from course_frame import compact_frame, read_compact_csv, read_text_csv
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+STORE_DIR = os.path.join(DATA_DIR, "course_store")
+
+COURSE_COLUMNS = [
+    "Semester", "Academic Year", "Location", "Course Number (Section)", "Course Name",
+    "Course Description", "Department", "School", "Credits", "Status",
+]
+DICTIONARY_COLUMNS = ["Semester", "Academic Year", "Location", "Department", "School", "Credits", "Status"]
+
+
+def _require_pyarrow():
+    if not HAVE_PYARROW:
+        raise ImportError("pyarrow is required for the Parquet course store (pip install pyarrow).")
+
+def _schema():
+    return pa.schema([
+        (col, pa.dictionary(pa.int32(), pa.string()) if col in DICTIONARY_COLUMNS else pa.string())
+        for col in COURSE_COLUMNS
+    ])
+
+def _as_text(value):
+    # Lists (Location, Department) are stored the way the CSVs show them: "['Homewood Campus']"
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return str(value)
+
+def store_dtypes(df):
+    """Dictionary columns as categoricals, like read_courses returns them (the other columns are left as text)."""
+    for col in DICTIONARY_COLUMNS:
+        if col in df.columns:
+            values = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype("category")
+            # Text categories even for a column that is empty in every loaded term
+            df[col] = values.cat.set_categories(values.cat.categories.astype(str))
+    return df
+
+def partition_path(term, root=STORE_DIR):
+    return os.path.join(root, f"term={term.replace(' ', '_')}", "part-0.parquet")
+
+def _partition_is_current(term, root, csv_path):
+    """Whether the term has a partition at least as new as its CSV (if it has one)."""
+    part = partition_path(term, root)
+    return os.path.exists(part) and (not os.path.exists(csv_path) or os.path.getmtime(part) >= os.path.getmtime(csv_path))
+
+def available_terms(root=STORE_DIR):
+    """Terms that have a partition in the store, e.g. ['Summer 2024', ...]."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        d[len("term="):].replace("_", " ")
+        for d in os.listdir(root)
+        if d.startswith("term=") and os.path.exists(os.path.join(root, d, "part-0.parquet"))
+    )
+
+def _table(df):
+    columns = {
+        col: [_as_text(v) for v in df[col]] if col in df.columns else [None] * len(df)
+        for col in COURSE_COLUMNS
+    }
+    return pa.Table.from_pydict(columns).cast(_schema())
+
+def write_term(df, term, root=STORE_DIR):
+    """Write (or replace) the partition for one term. Other partitions are not touched."""
+    _require_pyarrow()
+    path = partition_path(term, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(_table(df), path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+class TermWriter:
+    """
+    Write one term's partition incrementally (e.g. page by page while scraping).
+    Rows are buffered into row groups of row_group_size, so memory stays bounded.
+    The new partition only replaces the old one on close(); abort() discards it.
+    """
+
+    def __init__(self, term, root=STORE_DIR, row_group_size=10000):
+        _require_pyarrow()
+        self.path = partition_path(term, root)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.row_group_size = row_group_size
+        self._pending = []
+        self._pending_rows = 0
+        self._writer = pq.ParquetWriter(self.path + ".tmp", _schema())
+
+    def write(self, df):
+        self._pending.append(df)
+        self._pending_rows += len(df)
+        if self._pending_rows >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._writer.write_table(_table(pd.concat(self._pending, ignore_index=True)))
+            self._pending, self._pending_rows = [], 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        os.replace(self.path + ".tmp", self.path)
+        return self.path
+
+    def abort(self):
+        self._writer.close()
+        if os.path.exists(self.path + ".tmp"):
+            os.remove(self.path + ".tmp")
+
+def read_courses(semesters=None, columns=None, root=STORE_DIR):
+    """
+    Load courses from the store.
+    - semesters: list of terms to load (None = all); other partitions are never opened
+    - columns: list of columns to load (None = all)
+    Returns: DataFrame with dictionary columns as categoricals
+    """
+    _require_pyarrow()
+    terms = available_terms(root) if semesters is None else [t for t in semesters if t in set(available_terms(root))]
+    if not terms:
+        return pd.DataFrame(columns=columns or COURSE_COLUMNS)
+    dataset = ds.dataset([partition_path(t, root) for t in terms], format="parquet", schema=_schema())
+    return store_dtypes(dataset.to_table(columns=columns).to_pandas())
+
+def migrate_csvs(data_dir=DATA_DIR, root=STORE_DIR, overwrite=False):
+    """
+    Copy the per-term CSVs in data_dir into the store. Terms already in the store are
+    skipped unless their CSV is newer than the partition (or overwrite=True).
+    Returns the list of terms written.
+    """
+    _require_pyarrow()
+    written = []
+    for fname in sorted(os.listdir(data_dir)):
+        if not fname.endswith(".csv") or fname == "all_courses.csv":
+            continue
+        term = fname[:-len(".csv")].replace("_", " ")
+        csv_path = os.path.join(data_dir, fname)
+        if not overwrite and _partition_is_current(term, root, csv_path):
+            continue
+        write_term(read_text_csv(csv_path), term, root)
+        written.append(term)
+    return written
+
+def load_semester_data(data_dir, selected, columns=None, use_store=None, compact=False):
+    """
+    Load the selected terms: from the store in data_dir/course_store when pyarrow is
+    available (or use_store=True), otherwise from the per-term CSVs. Both return the
+    same dtypes: text columns, with the dictionary columns as categoricals.
+    With the store, terms whose partition is missing or older than their CSV (not migrated
+    yet) are read from the CSV; nothing is written.
+    - compact: return a typed compact frame (see course_frame.compact_frame)
+    Returns an empty DataFrame if none exist.
+    """
+    csv_paths = {sem: os.path.join(data_dir, sem.replace(' ', '_') + '.csv') for sem in selected}
+    if HAVE_PYARROW if use_store is None else use_store:
+        root = os.path.join(data_dir, "course_store")
+        in_store = {sem for sem in selected if _partition_is_current(sem, root, csv_paths[sem])}
+        frames = []
+        # Consecutive terms from the same source are read together, so the terms keep their order
+        for from_store, run in groupby(selected, key=in_store.__contains__):
+            run = list(run)
+            if from_store:
+                frames.append(read_courses(run, columns=columns, root=root))
+            else:
+                frames.extend(read_text_csv(csv_paths[sem], columns) for sem in run if os.path.exists(csv_paths[sem]))
+        if not frames:
+            return pd.DataFrame(columns=columns or COURSE_COLUMNS)
+        df = store_dtypes(pd.concat(frames, ignore_index=True)) if len(frames) > 1 else store_dtypes(frames[0])
+        return compact_frame(df) if compact else df
+    paths = [p for p in csv_paths.values() if os.path.exists(p)]
+    if compact:
+        return read_compact_csv(paths, columns=columns)
+    if paths:
+        return store_dtypes(pd.concat([read_text_csv(p, columns) for p in paths], ignore_index=True))
+    return pd.DataFrame(columns=columns or COURSE_COLUMNS)
+
+if __name__ == "__main__":
+    migrated = migrate_csvs()
+    print(f"Migrated semesters: {migrated}")
+    print(f"Course store: {STORE_DIR}")
@@ -0,0 +1,119 @@
+# coverage.py
+"""
+Taxonomy coverage from a sparse course × keyword occurrence matrix.
+
+The corpus is scanned once with the compiled keyword matcher (each distinct
+text only once). Coverage, co-occurrence between categories and per-group
+breakdowns (department, year, ...) are then sparse matrix products, so large
+taxonomies can be explored without rescanning the texts.
+
+Example:
+    cov = CoverageMatrix.from_taxonomy(df["full_text"], taxonomy)
+    cov.coverage(taxonomy)                       # courses per category
+    cov.cooccurrence(taxonomy)                   # courses per pair of categories
+    cov.coverage_by(taxonomy, df["Department"])  # courses per department and category
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+try:
+    from Scripts.keyword_matcher import get_matcher
+except ImportError:  # running from inside the Scripts folder
+    from keyword_matcher import get_matcher
+
+
+def _clean_keywords(keywords):
+    return list(dict.fromkeys(str(kw).lower() for kw in keywords if str(kw)))
+
+
+class CoverageMatrix:
+    """
+    Sparse occurrence matrix (one row per course text, one column per keyword).
+    - texts: list/Series of course texts
+    - keywords: every keyword that may be queried later
+    - word_boundaries: only match whole words/phrases (default: plain substring match, like `kw in text`)
+    """
+
+    def __init__(self, texts, keywords, word_boundaries=False):
+        self.keywords = _clean_keywords(keywords)
+        self.index = texts.index if isinstance(texts, pd.Series) else pd.RangeIndex(len(texts))
+        self._columns = {kw: i for i, kw in enumerate(self.keywords)}
+        matcher = get_matcher({"keywords": tuple(self.keywords)}, word_boundaries)
+        codes, uniques = pd.factorize(pd.Series(list(texts), dtype=object), use_na_sentinel=False)
+        indptr, indices = [0], []
+        for text in uniques:
+            indices.extend(sorted(self._columns[kw] for kw in matcher.match_keywords(text)))
+            indptr.append(len(indices))
+        unique_matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(uniques), len(self.keywords)),
+        )
+        self.matrix = unique_matrix[codes]
+
+    @classmethod
+    def from_taxonomy(cls, texts, taxonomy_keywords, word_boundaries=False):
+        """Build the matrix for every keyword of a {category: [keywords]} taxonomy."""
+        return cls(texts, [kw for kws in taxonomy_keywords.values() for kw in kws], word_boundaries)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def _keyword_category_matrix(self, taxonomy_keywords):
+        rows, cols = [], []
+        for j, kws in enumerate(taxonomy_keywords.values()):
+            for kw in _clean_keywords(kws):
+                if kw not in self._columns:
+                    raise KeyError(f"Keyword {kw!r} is not in this CoverageMatrix; rebuild it with the full taxonomy.")
+                rows.append(self._columns[kw])
+                cols.append(j)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(self.keywords), len(taxonomy_keywords)),
+        )
+
+    def category_matrix(self, taxonomy_keywords):
+        """Sparse 0/1 matrix (courses × categories): 1 where a course mentions any keyword of the category."""
+        hits = self.matrix @ self._keyword_category_matrix(taxonomy_keywords)
+        hits.data = np.ones_like(hits.data)
+        hits.eliminate_zeros()
+        return hits.tocsc()
+
+    def category_hits(self, taxonomy_keywords):
+        """category_matrix as a DataFrame of booleans aligned with the texts."""
+        return pd.DataFrame(self.category_matrix(taxonomy_keywords).toarray().astype(bool),
+                            index=self.index, columns=list(taxonomy_keywords))
+
+    def keyword_counts(self):
+        """Number of courses mentioning each keyword."""
+        counts = np.asarray((self.matrix > 0).sum(axis=0)).ravel()
+        return pd.Series(counts, index=self.keywords, name="n_courses")
+
+    def coverage(self, taxonomy_keywords):
+        """DataFrame (one row per category) with the number and share of courses covering it."""
+        counts = np.asarray(self.category_matrix(taxonomy_keywords).sum(axis=0)).ravel()
+        return pd.DataFrame({
+            "n_courses": counts,
+            "share": counts / max(len(self), 1),
+        }, index=pd.Index(list(taxonomy_keywords), name="category"))
+
+    def cooccurrence(self, taxonomy_keywords):
+        """Category × category DataFrame: number of courses covering both (the diagonal is the coverage)."""
+        hits = self.category_matrix(taxonomy_keywords)
+        names = list(taxonomy_keywords)
+        return pd.DataFrame((hits.T @ hits).toarray(), index=names, columns=names)
+
+    def coverage_by(self, taxonomy_keywords, groups):
+        """
+        Group × category DataFrame of course counts.
+        - groups: values aligned with the texts (e.g. df["Department"] or df["Semester"])
+        """
+        codes, uniques = pd.factorize(pd.Series(list(groups), dtype=object).fillna("Unknown").astype(str))
+        membership = sparse.csr_matrix(
+            (np.ones(len(codes), dtype=np.int32), (np.arange(len(codes)), codes)),
+            shape=(len(codes), len(uniques)),
+        )
+        counts = (membership.T @ self.category_matrix(taxonomy_keywords)).toarray()
+        return pd.DataFrame(counts, index=pd.Index(uniques, name=getattr(groups, "name", None)),
+                            columns=list(taxonomy_keywords)).sort_index()
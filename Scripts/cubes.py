@@ -0,0 +1,119 @@
+# cubes.py
+"""
+Precomputed count cubes for the analysis plots.
+
+A cube holds course counts grouped by (Year, Academic Year, Semester,
+Department, School) plus either a label column (label cube) or a taxonomy
+category (taxonomy cube). Cubes are tiny compared with the catalog (one row
+per non-empty combination), so plots and coverage tables roll them up in
+constant time however many sections there are. They are rebuilt per term:
+adding or reclassifying a term only replaces that term's rows.
+
+Saved cubes live in data/cubes/ as CSV files: rule_based_labels.csv and
+taxonomy_categories.csv (classification.DEFAULT_TAXONOMY) are materialized
+at ingest.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+try:
+    from Scripts.coverage import CoverageMatrix
+except ImportError:  # running from inside the Scripts folder
+    from coverage import CoverageMatrix
+
+DIMENSIONS = ["Year", "Academic Year", "Semester", "Department", "School"]
+SOURCE_COLUMNS = ["Term", "Semester", "Department", "School"]  # what dimension_frame reads
+CUBE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "cubes"))
+
+
+def dimension_frame(df, term_col=None):
+    """The cube dimensions for every row of df (term-derived fields are computed once per term)."""
+    # Imported here: extract_all_terms imports this module (and the scraping stack) at load time
+    try:
+        from Scripts.extract_all_terms import get_academic_year
+    except ImportError:  # running from inside the Scripts folder
+        from extract_all_terms import get_academic_year
+    if term_col is None:
+        term_col = "Term" if "Term" in df.columns else "Semester"
+    terms = df[term_col].astype(str) if term_col in df.columns else pd.Series("Unknown", index=df.index)
+    unique_terms = pd.Series(terms.unique())
+    years = dict(zip(unique_terms, unique_terms.str.extract(r"(\d{4})")[0].fillna("Unknown")))
+    academic = {t: get_academic_year(t) or "Unknown" for t in unique_terms}
+    dims = pd.DataFrame({
+        "Year": terms.map(years),
+        "Academic Year": terms.map(academic),
+        "Semester": terms,
+    }, index=df.index)
+    for col in ("Department", "School"):
+        dims[col] = df[col].astype(str).where(df[col].notna(), "Unknown") if col in df.columns else "Unknown"
+    return dims
+
+def frame_key(df, columns):
+    """Content hash of the given columns of df (those present), e.g. to memoize a cube built from them."""
+    columns = [c for c in columns if c in df.columns]
+    digest = hashlib.sha1(",".join(columns).encode("utf-8"))
+    if columns:
+        digest.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:20]
+
+def covers(cube, df, term_col="Semester"):
+    """Whether a saved cube has exactly the terms of df."""
+    return cube is not None and set(cube["Semester"]) == set(df[term_col].astype(str).unique())
+
+def build_label_cube(df, label_col="PH_Label", term_col=None):
+    """Counts by DIMENSIONS + label_col."""
+    dims = dimension_frame(df, term_col)
+    dims[label_col] = df[label_col].to_numpy()
+    return dims.groupby(DIMENSIONS + [label_col], observed=True).size().rename("count").reset_index()
+
+def build_taxonomy_cube(df, taxonomy_keywords, text_col="full_text", term_col=None, coverage_matrix=None):
+    """
+    Counts by DIMENSIONS + category: how many courses mention any keyword of each category.
+    - coverage_matrix: optional CoverageMatrix already built over df[text_col]
+    """
+    if coverage_matrix is None:
+        coverage_matrix = CoverageMatrix.from_taxonomy(df[text_col], taxonomy_keywords)
+    dims = dimension_frame(df, term_col)
+    codes, cells = pd.MultiIndex.from_frame(dims[DIMENSIONS]).factorize()
+    membership = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.int32), (np.arange(len(codes)), codes)), shape=(len(codes), len(cells))
+    )
+    counts = (membership.T @ coverage_matrix.category_matrix(taxonomy_keywords)).toarray()
+    wide = pd.DataFrame(counts, index=cells, columns=list(taxonomy_keywords))
+    cube = wide.rename_axis(DIMENSIONS).reset_index().melt(id_vars=DIMENSIONS, var_name="category", value_name="count")
+    return cube[cube["count"] > 0].reset_index(drop=True)
+
+def update_cube(cube, new_rows):
+    """Replace the rows of every Semester present in new_rows (e.g. a re-scraped or reclassified term)."""
+    if cube is None or cube.empty:
+        return new_rows.reset_index(drop=True)
+    kept = cube[~cube["Semester"].isin(set(new_rows["Semester"]))]
+    return pd.concat([kept, new_rows], ignore_index=True)
+
+def rollup(cube, by):
+    """Sum the counts of a cube over everything except the `by` columns."""
+    return cube.groupby(by, observed=True)["count"].sum()
+
+def save_cube(cube, name, cube_dir=CUBE_DIR):
+    os.makedirs(cube_dir, exist_ok=True)
+    path = os.path.join(cube_dir, f"{name}.csv")
+    cube.to_csv(path, index=False)
+    return path
+
+def refresh_cube(name, new_rows, cube_dir=CUBE_DIR):
+    """Merge a cube built from some terms into the saved cube `name` and persist it."""
+    cube = update_cube(load_cube(name, cube_dir), new_rows)
+    save_cube(cube, name, cube_dir)
+    return cube
+
+def load_cube(name, cube_dir=CUBE_DIR):
+    """Load a saved cube, or None if it has not been materialized yet."""
+    path = os.path.join(cube_dir, f"{name}.csv")
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, dtype={d: str for d in DIMENSIONS})
@@ -0,0 +1,305 @@
+# embedding_backends.py
+"""
+Pluggable CPU backends for sentence embeddings.
+
+An embedder is any object with the SentenceTransformer method
+encode(texts, convert_to_numpy=True) -> float32 array. The backend is picked
+with a suffix on the model name:
+
+    all-MiniLM-L6-v2              PyTorch (sentence-transformers), the default
+    all-MiniLM-L6-v2@onnx         ONNX Runtime, full precision
+    all-MiniLM-L6-v2@onnx-int8    ONNX Runtime, int8 dynamically quantized weights
+
+The suffix is part of the model name everywhere (model registry, embedding
+cache, vector index), so vectors from different backends are never mixed.
+
+The ONNX backends export the sentence-transformers model once to
+data/onnx_models/. Texts are then encoded in length-sorted batches, so there
+is little padding. Before an exported model is used, a parity check compares
+its embeddings with the PyTorch ones on a random sample of saved course texts
+(plus a few edge cases). If the cosine similarity of any pair is below the
+tolerance, the export is rejected.
+
+Threads and batch size: PH_EMBEDDING_THREADS / PH_EMBEDDING_BATCH_SIZE or
+set_backend_options(); a new thread count also applies to models already
+loaded (an ONNX session is recreated on its next encode). The ONNX backends
+require the optional onnxruntime package (plus torch and transformers for the
+one-time export); available_backends() leaves them out when it is missing.
+
+Run `python Scripts/embedding_backends.py --backend onnx-int8` to export,
+check parity and compare throughput with PyTorch.
+"""
+
+import glob
+import importlib.util
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+try:
+    from Scripts.course_frame import read_compact_csv
+    from Scripts.embedding_cache import DEFAULT_CACHE_DIR
+except ImportError:  # running from inside the Scripts folder
+    from course_frame import read_compact_csv
+    from embedding_cache import DEFAULT_CACHE_DIR
+
+HAVE_ONNXRUNTIME = importlib.util.find_spec("onnxruntime") is not None  # checked without importing it
+ONNX_MODEL_DIR = os.path.join(os.path.dirname(DEFAULT_CACHE_DIR), "onnx_models")
+PARITY_TOLERANCE = 0.99  # minimum cosine similarity to the PyTorch embedding of the same text
+PARITY_SAMPLE_SIZE = 500  # catalog texts checked at export time
+PARITY_TEXTS = [
+    "Planetary health: climate change, biodiversity loss and human health.",
+    "Introduction to financial accounting for managers.",
+    "This seminar examines air pollution, urbanization and respiratory disease in low-income countries.",
+    "Independent research under the supervision of a faculty member.",
+    "Data structures, algorithms and their analysis; programming projects in Java.",
+    "Public health responses to displacement, conflict and disaster preparedness.",
+    "",
+]
+
+options = {
+    "threads": int(os.environ.get("PH_EMBEDDING_THREADS", 0)),  # 0: the runtime's default
+    "batch_size": int(os.environ.get("PH_EMBEDDING_BATCH_SIZE", 64)),
+}
+
+
+def set_backend_options(threads=None, batch_size=None):
+    """
+    Change the intra-op threads and the encoding batch size. Both apply from the next encode(),
+    also for models already loaded (an ONNX session is recreated when the thread count changed).
+    """
+    if threads is not None:
+        options["threads"] = int(threads)
+    if batch_size is not None:
+        options["batch_size"] = int(batch_size)
+
+def split_model_name(model_name):
+    """'all-MiniLM-L6-v2@onnx-int8' -> ('all-MiniLM-L6-v2', 'onnx-int8'); no suffix means 'torch'."""
+    base, _, backend = model_name.partition("@")
+    return base, backend or "torch"
+
+def embedding_model_name(base_model, backend="torch"):
+    """The model name that selects `backend` for `base_model`."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'; choose one of {sorted(BACKENDS)}.")
+    return base_model if backend == "torch" else f"{base_model}@{backend}"
+
+
+class TorchEmbedder:
+    """sentence-transformers model with the configured threads and batch size."""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, convert_to_numpy=True, batch_size=None, **kwargs):
+        import torch
+        if options["threads"]:
+            torch.set_num_threads(options["threads"])
+        return self.model.encode(list(texts), batch_size=batch_size or options["batch_size"],
+                                 convert_to_numpy=True, **kwargs).astype(np.float32)
+
+    def memory_bytes(self):
+        return sum(p.numel() * p.element_size() for p in self.model.parameters())
+
+
+class OnnxEmbedder:
+    """
+    ONNX Runtime export of a sentence-transformers model (mean/CLS pooling and normalization
+    are applied in numpy, as in the original model).
+    - quantize: int8 dynamic quantization of the weights
+    - model_dir: where exported models are kept
+    """
+
+    def __init__(self, model_name, quantize=False, model_dir=ONNX_MODEL_DIR, tolerance=PARITY_TOLERANCE):
+        from transformers import AutoTokenizer
+        self.model_name = model_name
+        self.path = os.path.join(model_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        self.model_file = os.path.join(self.path, "model-int8.onnx" if quantize else "model.onnx")
+        if not os.path.exists(self.model_file):
+            export_onnx(model_name, self.path, quantize, tolerance)
+        with open(os.path.join(self.path, "config.json")) as f:
+            self.config = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.join(self.path, "tokenizer"))
+        self._open_session()
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def _open_session(self):
+        # intra_op_num_threads is fixed when a session is created
+        import onnxruntime as ort
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = options["threads"]
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(self.model_file, session_options, providers=["CPUExecutionProvider"])
+        self.threads = options["threads"]
+
+    def _encode_batch(self, texts):
+        tokens = self.tokenizer(texts, padding=True, truncation=True, max_length=self.config["max_seq_length"],
+                                return_tensors="np")
+        feed = {name: tokens[name].astype(np.int64) for name in self.input_names}
+        hidden = self.session.run(None, feed)[0]
+        if self.config["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        if self.config["normalize"]:
+            pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+
+    def encode(self, texts, convert_to_numpy=True, batch_size=None, **kwargs):
+        texts = [t if isinstance(t, str) else "" for t in texts]
+        if not texts:
+            return np.empty((0, self.config["dim"]), dtype=np.float32)
+        batch_size = batch_size or options["batch_size"]
+        if self.threads != options["threads"]:
+            self._open_session()
+        # Similar lengths in a batch keep padding (wasted compute) small
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        out = np.empty((len(texts), self.config["dim"]), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            out[rows] = self._encode_batch([texts[i] for i in rows])
+        return out
+
+    def memory_bytes(self):
+        return os.path.getsize(self.model_file)
+
+
+BACKENDS = {
+    "torch": TorchEmbedder,
+    "onnx": lambda model_name: OnnxEmbedder(model_name, quantize=False),
+    "onnx-int8": lambda model_name: OnnxEmbedder(model_name, quantize=True),
+}
+
+def available_backends():
+    """Backends whose runtime is installed: the ONNX ones need onnxruntime."""
+    return [b for b in BACKENDS if b == "torch" or HAVE_ONNXRUNTIME]
+
+def load_embedder(model_name):
+    """Embedder for a (possibly suffixed) model name; the loader the model registry uses for embeddings."""
+    base, backend = split_model_name(model_name)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'; choose one of {sorted(BACKENDS)}.")
+    return BACKENDS[backend](base)
+
+
+# === Export and parity ===
+def export_onnx(model_name, path, quantize=False, tolerance=PARITY_TOLERANCE, texts=None):
+    """
+    Export a sentence-transformers model to path/model.onnx (and model-int8.onnx when quantize),
+    then check parity with PyTorch. A model that fails the check is deleted and ValueError is raised.
+    - texts: texts for the parity check (default: parity_texts(), a sample of the saved catalog)
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(path, exist_ok=True)
+    fp32_file = os.path.join(path, "model.onnx")
+    reference = SentenceTransformer(model_name, device="cpu")
+    if not os.path.exists(fp32_file):
+        transformer = reference[0].auto_model.eval()
+        tokenizer = reference.tokenizer
+        pooling = next((m for m in reference if type(m).__name__ == "Pooling"), None)
+        config = {
+            "model_name": model_name,
+            "dim": reference.get_sentence_embedding_dimension(),
+            "max_seq_length": reference.max_seq_length,
+            "pooling": "cls" if pooling is not None and pooling.pooling_mode_cls_token else "mean",
+            "normalize": any(type(m).__name__ == "Normalize" for m in reference),
+        }
+        sample = tokenizer(["an example sentence"], return_tensors="pt")
+        names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+
+        class HiddenStates(torch.nn.Module):
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *tensors):
+                return self.model(**dict(zip(names, tensors))).last_hidden_state
+
+        with torch.no_grad():
+            torch.onnx.export(
+                HiddenStates(transformer), tuple(sample[n] for n in names), fp32_file,
+                input_names=names, output_names=["last_hidden_state"], opset_version=14,
+                dynamic_axes={n: {0: "batch", 1: "sequence"} for n in names + ["last_hidden_state"]},
+            )
+        tokenizer.save_pretrained(os.path.join(path, "tokenizer"))
+        with open(os.path.join(path, "config.json"), "w") as f:
+            json.dump(config, f, indent=1)
+    model_file = fp32_file
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        model_file = os.path.join(path, "model-int8.onnx")
+        quantize_dynamic(fp32_file, model_file, weight_type=QuantType.QInt8)
+    texts = parity_texts() if texts is None else texts
+    report = parity_check(OnnxEmbedder(model_name, quantize, os.path.dirname(path)), reference, texts)
+    if report["min_cosine"] < tolerance:
+        os.remove(model_file)
+        raise ValueError(
+            f"{os.path.basename(model_file)} for {model_name} fails the parity check "
+            f"(min cosine {report['min_cosine']:.4f} < {tolerance}); use the 'torch' or 'onnx' backend."
+        )
+    return report
+
+def parity_texts(data_dir=None, n=PARITY_SAMPLE_SIZE, seed=0):
+    """
+    PARITY_TEXTS plus a random sample of n distinct course texts from the term CSVs in data_dir
+    (default: the data folder holding ONNX_MODEL_DIR). Only PARITY_TEXTS when nothing is saved yet.
+    """
+    data_dir = data_dir or os.path.dirname(ONNX_MODEL_DIR)
+    paths = [p for p in sorted(glob.glob(os.path.join(data_dir, "*.csv"))) if not p.endswith("all_courses.csv")]
+    if not paths:
+        return list(PARITY_TEXTS)
+    texts = read_compact_csv(paths, columns=["Course Name", "Course Description"])["full_text"]
+    distinct = texts.drop_duplicates().astype(str)
+    return list(PARITY_TEXTS) + distinct.sample(min(n, len(distinct)), random_state=seed).tolist()
+
+def parity_check(embedder, reference, texts=PARITY_TEXTS):
+    """Cosine similarity between two embedders' vectors for the same texts (min and mean)."""
+    a = np.asarray(embedder.encode(texts), dtype=np.float32)
+    b = np.asarray(reference.encode(texts, convert_to_numpy=True), dtype=np.float32)
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    # Two zero vectors agree
+    cosine = np.where(norms > 1e-12, (a * b).sum(axis=1) / np.maximum(norms, 1e-12), 1.0)
+    return {"min_cosine": float(cosine.min()), "mean_cosine": float(cosine.mean()), "n_texts": len(texts)}
+
+def throughput(embedder, texts, repeat=1):
+    """Texts encoded per second (best of `repeat`)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embedder.encode(texts)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+if __name__ == "__main__":
+    import argparse
+
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Export an ONNX embedding backend, check parity and time it.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backend", default="onnx-int8", choices=[b for b in BACKENDS if b != "torch"])
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--n-texts", type=int, default=2000, help="distinct course texts to time")
+    args = parser.parse_args()
+    set_backend_options(args.threads, args.batch_size)
+
+    data_dir = os.path.dirname(ONNX_MODEL_DIR)
+    frames = [pd.read_csv(p) for p in sorted(glob.glob(os.path.join(data_dir, "*.csv")))]
+    texts = PARITY_TEXTS
+    if frames:
+        df = pd.concat(frames, ignore_index=True)
+        full_text = df["Course Name"].fillna("").astype(str) + " " + df["Course Description"].fillna("").astype(str)
+        texts = full_text.drop_duplicates().head(args.n_texts).tolist()
+    reference, candidate = TorchEmbedder(args.model), load_embedder(embedding_model_name(args.model, args.backend))
+    print("Parity on catalog texts:", parity_check(candidate, reference, texts))
+    torch_rate, candidate_rate = throughput(reference, texts), throughput(candidate, texts)
+    print(f"torch: {torch_rate:,.0f} texts/s   {args.backend}: {candidate_rate:,.0f} texts/s   "
+          f"speed-up: {candidate_rate / torch_rate:.1f}x")
@@ -0,0 +1,158 @@
+# embedding_cache.py
+"""
+Persistent, content-addressed cache of course text embeddings.
+
+Each text is keyed by a hash of the model name and the whitespace-normalized
+text. Vectors live in one memory-mapped float32 matrix per model
+(vectors.f32) next to a small JSON index of the row keys (index.json), so only
+new or changed descriptions ever reach the model.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    from Scripts.tracing import annotate
+except ImportError:  # running from inside the Scripts folder
+    from tracing import annotate
+
+DEFAULT_CACHE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "embedding_cache")
+)
+
+
+def normalize_text(text):
+    """Collapse whitespace so formatting-only changes map to the same cache entry."""
+    if not isinstance(text, str):
+        return ""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding store for one model.
+    - cache_dir: root folder for all cached models
+    - model_name: name of the embedding model (part of every key)
+    """
+
+    def __init__(self, cache_dir, model_name):
+        self.model_name = model_name
+        self.path = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        self.index_path = os.path.join(self.path, "index.json")
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self.dim = None
+        self.keys = []
+        self._rows = {}
+        self._matrix = None
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                index = json.load(f)
+            self.dim = index["dim"]
+            self.keys = index["keys"]
+            self._rows = {k: i for i, k in enumerate(self.keys)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def text_key(self, text):
+        """Content hash of (model name, normalized text)."""
+        return self._key(normalize_text(text))
+
+    def _key(self, normalized_text):
+        payload = self.model_name + "\n" + normalized_text
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def matrix(self):
+        """Read-only memmap of all cached vectors, shape (len(self), dim)."""
+        if not self.keys:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        if self._matrix is None or self._matrix.shape[0] != len(self.keys):
+            self._matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.keys), self.dim)
+            )
+        return self._matrix
+
+    def rows(self, keys):
+        """Row number of each key in the matrix, or -1 if it is not cached."""
+        return np.array([self._rows.get(k, -1) for k in keys], dtype=np.int64)
+
+    def add(self, keys, vectors):
+        """Append new vectors (one per key) to the store and persist the index."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(keys):
+            raise ValueError("Expected one embedding row per key.")
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding size {vectors.shape[1]} does not match cache size {self.dim}.")
+        os.makedirs(self.path, exist_ok=True)
+        self._matrix = None
+        with open(self.vectors_path, "ab") as f:
+            # Drop rows left over from an interrupted write that never reached the index
+            f.truncate(len(self.keys) * self.dim * 4)
+            f.write(vectors.tobytes())
+        for k in keys:
+            self._rows[k] = len(self.keys)
+            self.keys.append(k)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"model_name": self.model_name, "dim": self.dim, "keys": self.keys}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def ensure(self, texts, encode_fn, chunk_size=4096):
+        """
+        Make sure every text is cached, encoding only the missing ones. Returns the key of each text.
+        - texts: list/Series of strings
+        - encode_fn: callable taking a list of normalized strings, returning an array of vectors
+        - chunk_size: missing texts are encoded and appended to disk this many at a time
+        """
+        # Hash each distinct text once; catalogs repeat the same descriptions many times
+        codes, uniques = pd.factorize(pd.Series(list(texts), dtype=object), use_na_sentinel=False)
+        unique_texts = [normalize_text(t) for t in uniques]
+        unique_keys = [self._key(t) for t in unique_texts]
+        missing = {}
+        for key, text in zip(unique_keys, unique_texts):
+            if key not in self._rows and key not in missing:
+                missing[key] = text
+        missing_keys, missing_texts = list(missing), list(missing.values())
+        annotate(cache_hits=len(unique_keys) - len(missing_keys), cache_misses=len(missing_keys))
+        for start in range(0, len(missing_keys), chunk_size):
+            new_vectors = np.asarray(encode_fn(missing_texts[start:start + chunk_size]), dtype=np.float32)
+            self.add(missing_keys[start:start + chunk_size], new_vectors)
+        return [unique_keys[c] for c in codes]
+
+    def get_or_encode(self, texts, encode_fn):
+        """Return float32 embeddings for texts (one row each), encoding only the ones not cached yet."""
+        keys = self.ensure(texts, encode_fn)
+        if not keys:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(self.matrix()[self.rows(keys)])
+
+    def lookup(self, texts, encode_fn):
+        """
+        Embeddings for texts without adding anything to the store: cached vectors are read,
+        the others are encoded and thrown away. For queries and examples that are not courses.
+        """
+        codes, uniques = pd.factorize(pd.Series(list(texts), dtype=object), use_na_sentinel=False)
+        unique_texts = [normalize_text(t) for t in uniques]
+        rows = self.rows([self._key(t) for t in unique_texts])
+        missing = np.flatnonzero(rows < 0)
+        vectors = None
+        if len(missing):
+            encoded = np.asarray(encode_fn([unique_texts[i] for i in missing]), dtype=np.float32)
+            vectors = np.empty((len(unique_texts), encoded.shape[1]), dtype=np.float32)
+            vectors[missing] = encoded
+        if len(missing) < len(rows):
+            cached = np.flatnonzero(rows >= 0)
+            if vectors is None:
+                vectors = np.empty((len(unique_texts), self.dim), dtype=np.float32)
+            vectors[cached] = self.matrix()[rows[cached]]
+        annotate(cache_hits=len(rows) - len(missing), cache_misses=len(missing))
+        if vectors is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return vectors[codes]
@@ -1,8 +1,29 @@
 import requests
+import hashlib
+import io
 import json
+import math
 import pandas as pd
 import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from Scripts import canonical, course_store, cubes
+    from Scripts.classification import DEFAULT_TAXONOMY, label_series
+    from Scripts.search_index import INDEX_DIRNAME, SearchIndex
+    from Scripts.tracing import annotate, traced
+except ImportError:  # running from inside the Scripts folder
+    import canonical
+    import course_store
+    import cubes
+    from classification import DEFAULT_TAXONOMY, label_series
+    from search_index import INDEX_DIRNAME, SearchIndex
+    from tracing import annotate, traced
 
 # === User-friendly script to extract JHU course data for multiple terms ===
 # Output: CSV files in ../data/ for each term and a combined all_courses.csv
@@ -17,6 +38,11 @@ HEADERS = {
     'referer': 'https://courses.jhu.edu/',
     'user-agent': 'Mozilla/5.0',
 }
+PER_PAGE = 30
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+CHECKPOINT_FILE = ".extraction_checkpoint.json"
+FINGERPRINT_FILE = ".fingerprints.json"
+SEASON_ORDER = {"Intersession": 0, "Spring": 1, "Summer": 2, "Fall": 3}
 
 def generate_terms(start_year=2019, end_year=None):
     """Generate a list of terms from Fall 2019 to the current year."""
@@ -31,8 +57,8 @@ def generate_terms(start_year=2019, end_year=None):
     return terms
 
 def get_academic_year(term):
-    parts = term.split()
-    if len(parts) != 2:
+    parts = str(term).split()
+    if len(parts) != 2 or not parts[1].isdigit():
         return ''
     season, year = parts
     year = int(year)
@@ -43,13 +69,28 @@ def get_academic_year(term):
     else:
         return ''
 
-def get_all_courses(term, page=1):
+def make_session(pool_size=16, retries=5, backoff_factor=0.5):
+    """HTTP session with a connection pool that retries failed requests with exponential backoff."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,  # multi_search is a POST, retry it too
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def get_all_courses(term, page=1, session=None, url=URL):
     params = {"x-typesense-api-key": API_KEY}
     data = json.dumps({
         "searches": [{
             "query_by": "Title,OfferingName,OfferingVariations,SectionName,Description,InstructorsFullName",
             "infix": "always,off,off,off,off,off",
-            "per_page": 30,
+            "per_page": PER_PAGE,
             "num_typos": "2,0,0,0,0,2",
             "exhaustive_search": True,
             "sort_by": "_text_match:desc,OfferingName:asc,SectionName:asc",
@@ -64,68 +105,421 @@ def get_all_courses(term, page=1):
             "page": page
         }]
     })
-    response = requests.post(URL, params=params, headers=HEADERS, data=data)
+    response = (session or requests).post(url, params=params, headers=HEADERS, data=data)
     response.raise_for_status()
     return response.json()
 
-def scrape_all_pages(term, max_pages=1000):
+def section_records(res, term, academic_year):
+    """Turn one multi_search response page into a list of course section rows."""
+    records = []
+    for s in res.get("results", [{}])[0].get("hits", []):
+        doc = s.get("document", {})
+        records.append({
+            "Semester": term,
+            "Academic Year": academic_year,
+            "Location": doc.get("LocationDelimited"),
+            "Course Number (Section)": doc.get("SectionName"),
+            "Course Name": doc.get("Title"),
+            "Course Description": doc.get("Description"),
+            "Department": doc.get("AllDepartments"),
+            "School": doc.get("SchoolName"),
+            "Credits": doc.get("Credits"),
+            "Status": doc.get("Status"),
+        })
+    return records
+
+@traced(rows_arg=None)
+def scrape_all_pages(term, max_pages=1000, session=None, url=URL):
     all_courses = []
     academic_year = get_academic_year(term)
     for page in range(1, max_pages + 1):
         try:
-            res = get_all_courses(term, page=page)
+            res = get_all_courses(term, page=page, session=session, url=url)
         except Exception as e:
             print(f"Error fetching page {page} for {term}: {e}")
             break
-        sections = res.get("results", [{}])[0].get("hits", [])
-        if not sections:
+        records = section_records(res, term, academic_year)
+        if not records:
             break
-        for s in sections:
-            doc = s.get("document", {})
-            all_courses.append({
-                "Semester": term,
-                "Academic Year": academic_year,
-                "Location": doc.get("LocationDelimited"),
-                "Course Number (Section)": doc.get("SectionName"),
-                "Course Name": doc.get("Title"),
-                "Course Description": doc.get("Description"),
-                "Department": doc.get("AllDepartments"),
-                "School": doc.get("SchoolName"),
-                "Credits": doc.get("Credits"),
-                "Status": doc.get("Status"),
-            })
+        all_courses.extend(records)
+    annotate(rows=len(all_courses), term=term)
     return pd.DataFrame(all_courses)
 
-def initial_extraction(start_year=2019, end_year=None, max_pages=1000, outdir="./data"):
+# === Concurrent, resumable extraction ===
+@traced(rows_arg=None)
+def scrape_term_concurrent(term, session, max_pages=1000, page_workers=4, url=URL, first=None):
+    """
+    Fetch all pages of one term in parallel. Page 1 tells us how many results there are,
+    the remaining pages are fetched by a pool of page_workers threads.
+    Raises on any failed page (after the session's retries) so the term is not checkpointed.
+    - first: page-1 response if it was already fetched
+    """
+    academic_year = get_academic_year(term)
+    if first is None:
+        first = get_all_courses(term, page=1, session=session, url=url)
+    records = section_records(first, term, academic_year)
+    found = first.get("results", [{}])[0].get("found")
+    if not records:
+        return pd.DataFrame(records)
+    if found is None:
+        # Server did not report a total: walk pages until one comes back empty (errors still raise)
+        for page in range(2, max_pages + 1):
+            page_records = section_records(get_all_courses(term, page=page, session=session, url=url),
+                                           term, academic_year)
+            if not page_records:
+                break
+            records.extend(page_records)
+    else:
+        n_pages = min(max_pages, math.ceil(found / PER_PAGE))
+        with ThreadPoolExecutor(max_workers=page_workers) as pool:
+            pages = pool.map(
+                lambda page: section_records(get_all_courses(term, page=page, session=session, url=url),
+                                             term, academic_year),
+                range(2, n_pages + 1),
+            )
+            for page_records in pages:
+                records.extend(page_records)
+    annotate(rows=len(records), term=term)
+    return pd.DataFrame(records)
+
+@traced()
+def save_term(df, term, outdir):
+    """Write one term's CSV and, when pyarrow is available, its partition in the course store."""
+    df.to_csv(os.path.join(outdir, f"{term.replace(' ', '_')}.csv"), index=False)
+    if course_store.HAVE_PYARROW:
+        course_store.write_term(df, term, root=os.path.join(outdir, "course_store"))
+
+@traced(rows_arg=None)
+def update_canonical_catalog(outdir, df_all=None):
+    """
+    Rebuild the deduplicated course catalog (canonical/courses.csv + course_occurrences.csv) and its search index.
+    - df_all: all sections, when already in memory; otherwise the term CSVs in outdir are read
+      one at a time, so memory does not grow with the number of saved terms
+    """
+    canonical_dir = os.path.join(outdir, "canonical")
+    if df_all is not None:
+        courses, occurrences = canonical.write_canonical_catalog(df_all, canonical_dir)
+        index = SearchIndex.from_canonical(courses, occurrences)
+    else:
+        terms = existing_terms(outdir)
+        if not terms:
+            return
+        courses, facets, _ = canonical.write_canonical_catalog_from_files(
+            [os.path.join(outdir, f"{t.replace(' ', '_')}.csv") for t in terms], canonical_dir)
+        # The distinct (course, term, department, school) rows give the same filters (and fingerprint)
+        # as every section
+        index = SearchIndex.from_canonical(courses, facets)
+    index.save(os.path.join(outdir, INDEX_DIRNAME))
+
+@traced(rows_arg=1)
+def update_term_cubes(outdir, df_new):
+    """
+    Replace the rows of the terms in df_new in the saved cubes: rule-based labels
+    (cubes/rule_based_labels.csv) and default taxonomy categories (cubes/taxonomy_categories.csv).
+    """
+    full_text = df_new["Course Name"].fillna("").astype(str) + " " + df_new["Course Description"].fillna("").astype(str)
+    labeled = df_new.assign(PH_Label=label_series(full_text).to_numpy(), full_text=full_text)
+    cube_dir = os.path.join(outdir, "cubes")
+    cubes.refresh_cube("rule_based_labels", cubes.build_label_cube(labeled), cube_dir)
+    cubes.refresh_cube("taxonomy_categories", cubes.build_taxonomy_cube(labeled, DEFAULT_TAXONOMY), cube_dir)
+
+def load_checkpoint(outdir):
+    path = os.path.join(outdir, CHECKPOINT_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"completed": {}}
+
+def save_checkpoint(outdir, checkpoint):
+    path = os.path.join(outdir, CHECKPOINT_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(checkpoint, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+@traced(rows_arg=None)
+def concurrent_extraction(start_year=2019, end_year=None, max_pages=1000, outdir=None,
+                          term_workers=4, page_workers=4, resume=True, url=URL):
+    """
+    Parallel version of initial_extraction: downloads all semesters with term_workers terms
+    and page_workers pages per term in flight, over one pooled session with retries.
+    Each finished term is recorded in a checkpoint file, so an interrupted run started again
+    with resume=True only fetches the terms that were not finished. resume=False discards any
+    earlier checkpoint and fetches every term. The checkpoint is removed once every term has been fetched.
+    Returns a list of semesters added (with >10 classes).
+    """
+    outdir = outdir or DATA_DIR
+    os.makedirs(outdir, exist_ok=True)
+    terms = generate_terms(start_year, end_year)
+    checkpoint_path = os.path.join(outdir, CHECKPOINT_FILE)
+    if not resume and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = load_checkpoint(outdir)
+    lock = threading.Lock()
+    session = make_session(pool_size=term_workers * page_workers)
+
+    def run_term(term):
+        if term in checkpoint["completed"]:
+            return
+        print(f"Scraping {term}...")
+        try:
+            df = scrape_term_concurrent(term, session, max_pages=max_pages, page_workers=page_workers, url=url)
+        except Exception as e:
+            print(f"Error fetching {term}, it will be retried on the next run: {e}")
+            return
+        if not df.empty and len(df) > 10:
+            save_term(df, term, outdir)
+        with lock:
+            checkpoint["completed"][term] = len(df)
+            save_checkpoint(outdir, checkpoint)
+
+    with ThreadPoolExecutor(max_workers=term_workers) as pool:
+        list(pool.map(run_term, terms))
+
+    added_terms = [
+        t for t in terms
+        if checkpoint["completed"].get(t, 0) > 10
+        and os.path.exists(os.path.join(outdir, f"{t.replace(' ', '_')}.csv"))
+    ]
+    if added_terms:
+        concat_term_csvs(outdir, added_terms)
+        refresh_term_catalogs(outdir, added_terms)
+    if all(t in checkpoint["completed"] for t in terms) and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return added_terms
+
+# === Streaming extraction: one page in memory at a time ===
+@traced(rows_arg=None)
+def stream_term(term, outdir, session=None, max_pages=1000, url=URL, min_rows=11):
+    """
+    Fetch a term page by page, appending each page to its CSV (and store partition) as it arrives.
+    The files are written under temporary names and only replace the old ones once the term is
+    complete with at least min_rows sections; otherwise, or if anything fails, they are discarded.
+    Returns the number of sections written.
+    """
+    academic_year = get_academic_year(term)
+    csv_path = os.path.join(outdir, f"{term.replace(' ', '_')}.csv")
+    store = course_store.TermWriter(term, os.path.join(outdir, "course_store")) if course_store.HAVE_PYARROW else None
+    n_rows = 0
+    complete = False
+    try:
+        with open(csv_path + ".part", "w", encoding="utf-8", newline="") as f:
+            for page in range(1, max_pages + 1):
+                try:
+                    res = get_all_courses(term, page=page, session=session, url=url)
+                except Exception as e:
+                    print(f"Error fetching page {page} for {term}: {e}")
+                    break
+                records = section_records(res, term, academic_year)
+                if not records:
+                    break
+                # object dtype: values are written as they arrive, like a frame built from the whole term
+                page_df = pd.DataFrame(records, dtype=object)
+                page_df.to_csv(f, header=n_rows == 0, index=False)
+                if store is not None:
+                    store.write(page_df)
+                n_rows += len(records)
+        if n_rows >= min_rows:
+            os.replace(csv_path + ".part", csv_path)
+            if store is not None:
+                store.close()
+            complete = True
+    finally:
+        # Short term or any error (parsing, disk, store): leave no partial files behind
+        if not complete:
+            if os.path.exists(csv_path + ".part"):
+                os.remove(csv_path + ".part")
+            if store is not None:
+                store.abort()
+    annotate(rows=n_rows, term=term)
+    return n_rows
+
+def concat_term_csvs(outdir, terms, out_name="all_courses.csv"):
+    """Build the combined CSV by copying the term CSVs one after another (header once, nothing parsed)."""
+    out_path = os.path.join(outdir, out_name)
+    header = None
+    with open(out_path + ".tmp", "wb") as out:
+        for term in terms:
+            with open(os.path.join(outdir, f"{term.replace(' ', '_')}.csv"), "rb") as f:
+                first = f.readline()
+                if header is None:
+                    header = first
+                    out.write(header)
+                elif first != header:
+                    raise ValueError(f"Columns of {term} do not match the other terms.")
+                shutil.copyfileobj(f, out)
+    os.replace(out_path + ".tmp", out_path)
+    return out_path
+
+def refresh_term_catalogs(outdir, terms):
+    """Rebuild the canonical catalog from the term CSVs and refresh the cubes one term at a time."""
+    update_canonical_catalog(outdir)
+    for term in terms:
+        update_term_cubes(outdir, pd.read_csv(os.path.join(outdir, f"{term.replace(' ', '_')}.csv")))
+
+@traced(rows_arg=None)
+def streaming_extraction(start_year=2019, end_year=None, max_pages=1000, outdir=None, term_workers=1, url=URL):
+    """
+    Download all semesters with bounded memory: each term is streamed to disk page by page and
+    all_courses.csv is built by concatenating the term files. Produces the same files as
+    initial_extraction. Returns a list of semesters added (with >10 classes).
+    """
+    outdir = outdir or DATA_DIR
+    os.makedirs(outdir, exist_ok=True)
+    terms = generate_terms(start_year, end_year)
+    session = make_session(pool_size=term_workers)
+
+    def run_term(term):
+        print(f"Scraping {term}...")
+        return stream_term(term, outdir, session=session, max_pages=max_pages, url=url) > 10
+
+    with ThreadPoolExecutor(max_workers=term_workers) as pool:
+        added_terms = [t for t, added in zip(terms, pool.map(run_term, terms)) if added]
+    if added_terms:
+        concat_term_csvs(outdir, added_terms)
+        refresh_term_catalogs(outdir, added_terms)
+    return added_terms
+
+# === Delta refresh: re-fetch only the terms whose results changed ===
+def term_fingerprint(res):
+    """Fingerprint of a term's result set from its page-1 response: the hit count and every facet count."""
+    result = res.get("results", [{}])[0]
+    facets = sorted(
+        [facet.get("field_name"), sorted([str(c.get("value")), c.get("count")] for c in facet.get("counts", []))]
+        for facet in result.get("facet_counts", [])
+    )
+    payload = json.dumps({"found": result.get("found"), "facets": facets}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def load_fingerprints(outdir):
+    path = os.path.join(outdir, FINGERPRINT_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def save_fingerprints(outdir, fingerprints):
+    path = os.path.join(outdir, FINGERPRINT_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(fingerprints, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+def existing_terms(outdir):
+    """Terms with a CSV in outdir, oldest first."""
+    terms = [f[:-len(".csv")].replace("_", " ") for f in os.listdir(outdir)
+             if f.endswith(".csv") and f != "all_courses.csv"]
+    return sorted(terms, key=lambda t: (t.split()[-1], SEASON_ORDER.get(t.split()[0], 4)))
+
+def section_changes(old, new):
+    """Number of sections added, removed and unchanged between two versions of a term (rows compared by content)."""
+    def row_hashes(df):
+        if df is None or df.empty:
+            return pd.Series([], dtype="uint64")
+        # Compare both versions the way they are stored: as CSV text
+        as_text = pd.read_csv(io.StringIO(df.to_csv(index=False)), dtype=str, keep_default_na=False)
+        return pd.util.hash_pandas_object(as_text, index=False)
+    old_counts = row_hashes(old).value_counts()
+    new_counts = row_hashes(new).value_counts()
+    unchanged = int(old_counts.reindex(new_counts.index, fill_value=0).clip(upper=new_counts).sum())
+    return {"added": int(new_counts.sum()) - unchanged, "removed": int(old_counts.sum()) - unchanged,
+            "unchanged": unchanged}
+
+@traced(rows_arg=None)
+def delta_refresh(start_year=2019, end_year=None, terms=None, max_pages=1000, outdir=None, page_workers=4,
+                  url=URL):
+    """
+    Keep saved terms current with one page-1 request per term. Each term's result set is
+    fingerprinted (found count + facet counts); only terms that are new or whose fingerprint
+    changed are re-fetched, and their sections replace the old ones in the term CSV, the store,
+    the cubes and all_courses.csv. A saved term without a fingerprint yet is adopted as
+    unchanged if its row count matches `found`. Terms skipped for having 10 sections or fewer
+    keep their fingerprint as well, so they are only fetched again once they change.
+    - terms: terms to check (default: every term from start_year to end_year)
+    Returns a DataFrame with one row per term: status, found, added/removed/unchanged sections.
+    """
+    outdir = outdir or DATA_DIR
+    os.makedirs(outdir, exist_ok=True)
+    terms = terms or generate_terms(start_year, end_year)
+    fingerprints = load_fingerprints(outdir)
+    session = make_session(pool_size=page_workers)
+    report, refreshed = [], []
+    for term in terms:
+        csv_path = os.path.join(outdir, f"{term.replace(' ', '_')}.csv")
+        try:
+            first = get_all_courses(term, page=1, session=session, url=url)
+        except Exception as e:
+            print(f"Error checking {term}: {e}")
+            report.append({"term": term, "status": "failed"})
+            continue
+        fingerprint = term_fingerprint(first)
+        found = first.get("results", [{}])[0].get("found")
+        old = pd.read_csv(csv_path, dtype=str, keep_default_na=False) if os.path.exists(csv_path) else None
+        if old is not None and term not in fingerprints and found == len(old):
+            fingerprints[term] = {"fingerprint": fingerprint, "found": found}
+        known = fingerprints.get(term, {})
+        if (old is not None or known.get("skipped")) and known.get("fingerprint") == fingerprint:
+            report.append({"term": term, "status": "unchanged", "found": found,
+                           "unchanged": 0 if old is None else len(old)})
+            continue
+        print(f"Refreshing {term}...")
+        try:
+            df = scrape_term_concurrent(term, session, max_pages=max_pages, page_workers=page_workers, url=url,
+                                        first=first)
+        except Exception as e:
+            print(f"Error fetching {term}, it will be retried on the next run: {e}")
+            report.append({"term": term, "status": "failed", "found": found})
+            continue
+        if len(df) <= 10:
+            # Remember the too-small (or empty) result set too, so it is not fetched again until it changes
+            fingerprints[term] = {"fingerprint": fingerprint, "found": found, "skipped": True}
+            report.append({"term": term, "status": "skipped", "found": found})
+            continue
+        changes = section_changes(old, df)
+        save_term(df, term, outdir)
+        update_term_cubes(outdir, df)
+        fingerprints[term] = {"fingerprint": fingerprint, "found": found,
+                              "refreshed": datetime.now().isoformat(timespec="seconds")}
+        save_fingerprints(outdir, fingerprints)
+        refreshed.append(term)
+        report.append({"term": term, "status": "new" if old is None else "changed", "found": found, **changes})
+    save_fingerprints(outdir, fingerprints)
+    if refreshed:
+        concat_term_csvs(outdir, existing_terms(outdir))
+        update_canonical_catalog(outdir)
+    return pd.DataFrame(report, columns=["term", "status", "found", "added", "removed", "unchanged"])
+
+def initial_extraction(start_year=2019, end_year=None, max_pages=1000, outdir=None, streaming=False, url=URL):
     """
     Download and save ALL semesters (overwriting existing files), and only if they have >10 classes (for testing).
+    With streaming=True, pages are written to disk as they arrive (see streaming_extraction).
     Returns a list of semesters added.
     """
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    outdir = os.path.abspath(os.path.join(script_dir, '..', 'data'))
+    outdir = outdir or DATA_DIR
+    if streaming:
+        return streaming_extraction(start_year, end_year, max_pages, outdir, url=url)
     os.makedirs(outdir, exist_ok=True)
     terms = generate_terms(start_year, end_year)
     added_terms = []
     all_data = []
     for term in terms:
         print(f"Scraping {term}...")
-        df = scrape_all_pages(term, max_pages=max_pages)
+        df = scrape_all_pages(term, max_pages=max_pages, url=url)
         if not df.empty and len(df) > 10:
-            df.to_csv(os.path.join(outdir, f"{term.replace(' ', '_')}.csv"), index=False)
+            save_term(df, term, outdir)
             all_data.append(df)
             added_terms.append(term)
     if all_data:
         df_all = pd.concat(all_data, ignore_index=True)
         df_all.to_csv(os.path.join(outdir, "all_courses.csv"), index=False)
+        update_canonical_catalog(outdir, df_all)
+        update_term_cubes(outdir, df_all)
     return added_terms
 
-def incremental_scrape(start_year=2019, end_year=None, max_pages=1000, outdir="./data"):
+def incremental_scrape(start_year=2019, end_year=None, max_pages=1000, outdir=None, url=URL):
     """
     Only download and save semesters not already present in the data directory, and only if they have >10 classes (for testing).
     Returns a list of new semesters added.
     """
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    outdir = os.path.abspath(os.path.join(script_dir, '..', 'data'))
+    outdir = outdir or DATA_DIR
     os.makedirs(outdir, exist_ok=True)
     terms = generate_terms(start_year, end_year)
     existing = set(f.replace('.csv','').replace('_',' ') for f in os.listdir(outdir) if f.endswith('.csv') and f != 'all_courses.csv')
@@ -135,21 +529,29 @@ def incremental_scrape(start_year=2019, end_year=None, max_pages=1000, outdir=".
         if term.replace(' ', '_') in existing or term in existing:
             continue
         print(f"Scraping {term}...")
-        df = scrape_all_pages(term, max_pages=max_pages)
+        df = scrape_all_pages(term, max_pages=max_pages, url=url)
         if not df.empty and len(df) > 10:
-            df.to_csv(os.path.join(outdir, f"{term.replace(' ', '_')}.csv"), index=False)
+            save_term(df, term, outdir)
             new_data.append(df)
             new_terms.append(term)
-    # Update all_courses.csv
-    all_csvs = [os.path.join(outdir, f) for f in os.listdir(outdir) if f.endswith('.csv') and f != 'all_courses.csv']
-    if all_csvs:
-        df_all = pd.concat([pd.read_csv(f) for f in all_csvs], ignore_index=True)
-        df_all.to_csv(os.path.join(outdir, "all_courses.csv"), index=False)
+    # Update all_courses.csv: append only the new semesters when it already exists
+    all_courses_path = os.path.join(outdir, "all_courses.csv")
+    if os.path.exists(all_courses_path):
+        for df in new_data:
+            df.to_csv(all_courses_path, mode='a', header=False, index=False)
+    else:
+        all_csvs = [os.path.join(outdir, f) for f in os.listdir(outdir) if f.endswith('.csv') and f != 'all_courses.csv']
+        if all_csvs:
+            df_all = pd.concat([pd.read_csv(f) for f in all_csvs], ignore_index=True)
+            df_all.to_csv(all_courses_path, index=False)
+    if new_terms:
+        update_canonical_catalog(outdir)
+        update_term_cubes(outdir, pd.concat(new_data, ignore_index=True))
     return new_terms
 
 if __name__ == "__main__":
     print("Starting initial extraction from Fall 2019...")
-    added = initial_extraction()
+    added = concurrent_extraction()
     print(f"Added semesters: {added}")
     print("Now running incremental scrape...")
     added2 = incremental_scrape()
@@ -0,0 +1,164 @@
+# keyword_matcher.py
+"""
+Compiled multi-pattern keyword matching for course texts.
+
+All keywords from every group (e.g. tier1/tier2/tier3 or env/health) are
+compiled into one regular expression, so each document is scanned once no
+matter how many keywords or groups there are. Matching follows the same
+substring rule as `kw in text.lower()`, so labels are identical to the
+original `any(...)` loops.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+class KeywordMatcher:
+    """
+    Match named groups of keywords against texts in a single scan.
+    - groups: dict mapping group name -> list of keywords
+    - word_boundaries: only match whole words/phrases, i.e. not inside a longer word
+      (default: plain substring match)
+    """
+
+    def __init__(self, groups, word_boundaries=False):
+        self.group_names = list(groups)
+        if len(self.group_names) > 63:
+            raise ValueError("KeywordMatcher supports at most 63 keyword groups.")
+        self.word_boundaries = word_boundaries
+        keyword_groups = {}
+        for i, name in enumerate(self.group_names):
+            for kw in groups[name]:
+                kw = str(kw).lower()
+                if kw:
+                    keyword_groups.setdefault(kw, 0)
+                    keyword_groups[kw] |= 1 << i
+        self.keywords = sorted(keyword_groups, key=lambda k: (-len(k), k))
+        # The regex reports only the longest keyword starting at each position, so
+        # fold in the groups of every keyword that is a prefix of it (those match too).
+        self._masks = {}
+        self._implied = {}
+        for kw in self.keywords:
+            mask = keyword_groups[kw]
+            implied = {kw}
+            for other, other_mask in keyword_groups.items():
+                if other != kw and kw.startswith(other) and self._prefix_matches(kw, other):
+                    mask |= other_mask
+                    implied.add(other)
+            self._masks[kw] = mask
+            self._implied[kw] = frozenset(implied)
+        self.pattern = self._compile() if self.keywords else None
+
+    def _prefix_matches(self, kw, prefix):
+        """Whether `prefix` also matches wherever `kw` matches."""
+        if not self.word_boundaries:
+            return True
+        return not _is_word_char(kw[len(prefix)])
+
+    def _compile(self):
+        # Keywords are merged into a trie-shaped pattern so the regex engine walks
+        # shared prefixes once instead of trying every keyword at every position.
+        body = _trie_pattern(self.keywords)
+        if self.word_boundaries:
+            # Lookarounds rather than \b, so keywords with non-word edges ("c++", "u.s.") can match
+            body = r"(?<!\w)(?:%s)(?!\w)" % body
+        first_chars = "".join(sorted({kw[0] for kw in self.keywords}))
+        # Zero-width lookahead so overlapping keywords are all visited
+        return re.compile(r"(?=[%s])(?=(%s))" % (re.escape(first_chars), body))
+
+    def match_mask(self, text):
+        """Return an int bitmask of the groups hit by one text (bit i = group i)."""
+        if self.pattern is None:
+            return 0
+        text = text.lower() if isinstance(text, str) else ""
+        return _fold_masks(self.pattern.findall(text), self._masks)
+
+    def match(self, text):
+        """Return the set of group names with at least one keyword in text."""
+        mask = self.match_mask(text)
+        return {name for i, name in enumerate(self.group_names) if mask & (1 << i)}
+
+    def match_masks(self, texts):
+        """Vectorized match_mask over a Series or list; returns an int64 numpy array."""
+        texts = pd.Series(texts, dtype=object) if not isinstance(texts, pd.Series) else texts
+        if self.pattern is None or len(texts) == 0:
+            return np.zeros(len(texts), dtype=np.int64)
+        # Course texts repeat heavily across terms and sections: scan each distinct text once
+        codes, uniques = pd.factorize(texts, use_na_sentinel=False)
+        pattern, masks = self.pattern, self._masks
+        unique_masks = np.fromiter(
+            (
+                _fold_masks(pattern.findall(t.lower()), masks) if isinstance(t, str) else 0
+                for t in uniques
+            ),
+            dtype=np.int64,
+            count=len(uniques),
+        )
+        return unique_masks[codes]
+
+    def match_keywords(self, text):
+        """Return the frozenset of (lowercased) keywords found in one text."""
+        if self.pattern is None or not isinstance(text, str):
+            return frozenset()
+        return frozenset().union(*(self._implied[kw] for kw in self.pattern.findall(text.lower())))
+
+    def keyword_sets(self, texts):
+        """match_keywords for every text in a list or Series; returns a list of frozensets."""
+        texts = list(texts)
+        codes, uniques = pd.factorize(pd.Series(texts, dtype=object), use_na_sentinel=False)
+        unique_sets = [self.match_keywords(t) for t in uniques]
+        return [unique_sets[c] for c in codes]
+
+    def hit_matrix(self, texts):
+        """Return a DataFrame of booleans, one column per group, aligned with texts."""
+        masks = self.match_masks(texts)
+        index = texts.index if isinstance(texts, pd.Series) else None
+        return pd.DataFrame(
+            {name: (masks & (1 << i)) != 0 for i, name in enumerate(self.group_names)},
+            index=index,
+        )
+
+
+def _trie_pattern(keywords):
+    """Build a regex matching the longest of `keywords` at a position, as a trie of literals."""
+    trie = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:%s)" % "|".join(branches)
+        # Greedy optional tail: prefer the longer keyword when this node ends one
+        return "(?:%s)?" % body if "" in node else body
+
+    return build(trie)
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+def _fold_masks(hits, masks):
+    mask = 0
+    for kw in hits:
+        mask |= masks[kw]
+    return mask
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(frozen_groups, word_boundaries):
+    return KeywordMatcher(dict(frozen_groups), word_boundaries=word_boundaries)
+
+
+def get_matcher(groups, word_boundaries=False):
+    """Return a compiled KeywordMatcher, reusing it while the keyword lists are unchanged."""
+    frozen = tuple((name, tuple(kws)) for name, kws in groups.items())
+    return _cached_matcher(frozen, word_boundaries)
@@ -0,0 +1,162 @@
+# model_registry.py
+"""
+Process-wide registry of loaded ML models.
+
+Models are loaded lazily on first use and the same instance is returned for
+every later request with the same (model_name, task). Streamlit keeps imported
+modules alive between reruns, so the dashboard pays each model load once.
+When the estimated size of the loaded models exceeds the memory budget, the
+least recently used ones are dropped. A model that is being loaded by another
+thread (e.g. a background warm-up) is waited for rather than loaded twice.
+
+Set the budget with the PH_MODEL_MEMORY_MB environment variable or
+registry.set_memory_budget(mb).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+try:
+    from Scripts.embedding_backends import load_embedder
+    from Scripts.tracing import span
+except ImportError:  # running from inside the Scripts folder
+    from embedding_backends import load_embedder
+    from tracing import span
+
+DEFAULT_MEMORY_BUDGET_MB = float(os.environ.get("PH_MODEL_MEMORY_MB", 4096))
+
+
+# === Loaders by task ===
+def _load_embedder(model_name):
+    # "name@onnx-int8" and other suffixes pick a backend (see embedding_backends)
+    return load_embedder(model_name)
+
+def _pipeline_loader(task):
+    def load(model_name):
+        try:
+            from transformers import pipeline
+        except ImportError:
+            raise ImportError(f"transformers library is required for {task.replace('-', ' ')}.")
+        return pipeline(task, model=model_name)
+    return load
+
+LOADERS = {
+    "sentence-embedding": _load_embedder,
+    "zero-shot-classification": _pipeline_loader("zero-shot-classification"),
+}
+
+def estimate_model_bytes(model):
+    """Approximate memory held by a torch model or transformers pipeline (parameters + buffers)."""
+    if hasattr(model, "memory_bytes"):
+        return model.memory_bytes()
+    module = getattr(model, "model", model)
+    total = 0
+    for attr in ("parameters", "buffers"):
+        tensors = getattr(module, attr, None)
+        if callable(tensors):
+            total += sum(t.numel() * t.element_size() for t in tensors())
+    return total
+
+
+class ModelRegistry:
+    """LRU cache of loaded models keyed by (model_name, task), with load statistics."""
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        self.memory_budget_bytes = memory_budget_mb * 1024 ** 2
+        self._models = OrderedDict()  # (model_name, task) -> (model, size_bytes)
+        self._stats = {}
+        self._loading = {}  # (model_name, task) -> Event set when the load finishes
+        self._lock = threading.RLock()
+
+    def set_memory_budget(self, memory_budget_mb):
+        with self._lock:
+            self.memory_budget_bytes = memory_budget_mb * 1024 ** 2
+            self._evict()
+
+    def get(self, model_name, task="sentence-embedding", loader=None):
+        """
+        Return the loaded model for (model_name, task), loading it on first use.
+        - loader: optional callable(model_name) overriding the default loader for the task
+        A model being loaded by another thread (e.g. a background warm-up) is waited for, not loaded twice.
+        """
+        key = (model_name, task)
+        while True:
+            with self._lock:
+                stats = self._stats.setdefault(
+                    key, {"hits": 0, "misses": 0, "load_seconds": 0.0, "evictions": 0}
+                )
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    stats["hits"] += 1
+                    return self._models[key][0]
+                pending = self._loading.get(key)
+                if pending is None:
+                    if loader is None:
+                        if task not in LOADERS:
+                            raise ValueError(f"No loader registered for task '{task}'.")
+                        loader = LOADERS[task]
+                    done = self._loading[key] = threading.Event()
+                    break
+            pending.wait()
+        # Load outside the lock so stats() and other models stay available meanwhile
+        try:
+            start = time.perf_counter()
+            with span("model_registry.load", model=model_name, task=task):
+                model = loader(model_name)
+            with self._lock:
+                stats["load_seconds"] += time.perf_counter() - start
+                stats["misses"] += 1
+                self._models[key] = (model, estimate_model_bytes(model))
+                self._evict()
+            return model
+        finally:
+            with self._lock:
+                del self._loading[key]
+            done.set()
+
+    def is_loading(self, model_name, task="sentence-embedding"):
+        return (model_name, task) in self._loading
+
+    def _evict(self):
+        # Never evict the most recently used model, even if it alone exceeds the budget
+        while len(self._models) > 1 and self.loaded_bytes() > self.memory_budget_bytes:
+            key, _ = self._models.popitem(last=False)
+            self._stats[key]["evictions"] += 1
+
+    def loaded_bytes(self):
+        return sum(size for _, size in self._models.values())
+
+    def is_loaded(self, model_name, task="sentence-embedding"):
+        return (model_name, task) in self._models
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def stats(self):
+        """Return a DataFrame with one row per (model_name, task) seen so far."""
+        with self._lock:
+            rows = [
+                {
+                    "model_name": name,
+                    "task": task,
+                    "loaded": (name, task) in self._models,
+                    "loading": (name, task) in self._loading,
+                    "size_mb": self._models[(name, task)][1] / 1024 ** 2 if (name, task) in self._models else 0.0,
+                    **stats,
+                }
+                for (name, task), stats in self._stats.items()
+            ]
+        return pd.DataFrame(rows, columns=["model_name", "task", "loaded", "loading", "size_mb", "hits",
+                                           "misses", "load_seconds", "evictions"])
+
+
+registry = ModelRegistry()
+
+def get_model(model_name, task="sentence-embedding"):
+    """Shortcut for registry.get on the process-wide registry."""
+    return registry.get(model_name, task)
@@ -0,0 +1,359 @@
+# pipeline.py
+"""
+Headless pipeline: scrape -> normalize -> classify -> aggregate, without the dashboard.
+
+The stages form a DAG:
+
+    scrape -> normalize -> classify_rule ------+
+                       -> classify_semantic ---+-> aggregate
+                       -> classify_zero_shot --+
+
+Every stage output is cached in data/pipeline/<stage>/ under a fingerprint
+of the stage's config and its upstream fingerprints. The scrape stage's
+fingerprint is a content hash of the term CSVs. A re-run therefore only
+recomputes stages whose inputs or settings changed: with no new data,
+a nightly run costs one scrape check and a few cache lookups. Stages whose
+inputs are ready run in parallel (e.g. the classifiers), and a failed stage
+only skips the stages that depend on it; aggregate still runs over the
+classifiers that succeeded.
+
+Usage (from the project root):
+    python Scripts/pipeline.py --scrape delta --classifiers rule semantic \\
+        --examples examples.txt
+    python Scripts/pipeline.py --config nightly.json --force classify_rule
+
+Aggregates are written as cubes (data/cubes/pipeline_<classifier>_labels.csv)
+plus data/pipeline/course_labels.csv (one row per distinct course). These files
+are published again from the cached output when the aggregate is not rerun,
+so they always match the latest run.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, ".."))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Scripts import classification, cubes, extract_all_terms
+from Scripts.canonical import canonicalize
+from Scripts.course_frame import read_compact_csv
+from Scripts.tracing import span
+
+PIPELINE_VERSION = 2  # bump to invalidate every cached stage output
+DEFAULT_CONFIG = {
+    "data_dir": extract_all_terms.DATA_DIR,
+    "scrape": "none",            # none | incremental | delta | full
+    "start_year": 2019,
+    "end_year": None,
+    "semesters": None,           # None: every saved term
+    "classifiers": ["rule"],     # any of: rule, semantic, zero-shot
+    "examples": [],              # known planetary health course texts (semantic)
+    "semantic_model": "all-MiniLM-L6-v2",
+    "semantic_threshold": 0.5,
+    "embedding_cache": True,
+    "zero_shot_model": "facebook/bart-large-mnli",
+    "zero_shot_labels": classification.CATEGORY_LABELS,
+    "zero_shot_batch_size": 16,
+    "workers": 3,                # stages run at the same time
+}
+CLASSIFIER_STAGES = {"rule": "classify_rule", "semantic": "classify_semantic", "zero-shot": "classify_zero_shot"}
+
+
+def _hash(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+def term_paths(data_dir, semesters=None):
+    terms = semesters or extract_all_terms.existing_terms(data_dir)
+    paths = [os.path.join(data_dir, f"{t.replace(' ', '_')}.csv") for t in terms]
+    return [p for p in paths if os.path.exists(p)]
+
+def source_fingerprint(paths):
+    """Content hash of the term CSVs a run reads."""
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+# === Stages ===
+class Stage:
+    """
+    One step of the pipeline.
+    - run: callable(config, inputs) -> output, where inputs maps each dependency to its output
+    - deps: names of the stages whose outputs it needs
+    - config_keys: settings that change its output (part of its fingerprint)
+    - volatile: always run; its fingerprint is computed from the output instead (see fingerprint)
+    - optional: deps it can do without; it runs on the ones that succeeded (skipped only if all fail)
+    - publish: callable(config, output) writing the stage's files outside the cache; called after
+      every run and cache hit, so the files follow the latest run
+    """
+
+    def __init__(self, name, run, deps=(), config_keys=(), volatile=False, fingerprint=None, optional=(),
+                 publish=None):
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.config_keys = list(config_keys)
+        self.volatile = volatile
+        self.fingerprint = fingerprint
+        self.optional = list(optional)
+        self.publish = publish
+
+def run_scrape(config, inputs):
+    mode, data_dir = config["scrape"], config["data_dir"]
+    years = {"start_year": config["start_year"], "end_year": config["end_year"]}
+    if mode == "incremental":
+        changed = extract_all_terms.incremental_scrape(outdir=data_dir, **years)
+    elif mode == "delta":
+        report = extract_all_terms.delta_refresh(outdir=data_dir, **years)
+        changed = report.loc[report["status"].isin(["new", "changed"]), "term"].tolist()
+    elif mode == "full":
+        changed = extract_all_terms.concurrent_extraction(outdir=data_dir, **years)
+    elif mode == "none":
+        changed = []
+    else:
+        raise ValueError(f"Unknown scrape mode '{mode}'; use none, incremental, delta or full.")
+    return {"changed": changed, "paths": term_paths(data_dir, config["semesters"])}
+
+def run_normalize(config, inputs):
+    paths = inputs["scrape"]["paths"]
+    if not paths:
+        raise FileNotFoundError(f"No term CSVs found in {config['data_dir']}; run with --scrape full first.")
+    courses, occurrences = canonicalize(read_compact_csv(paths))
+    return {"courses": courses, "occurrences": occurrences}
+
+def run_classify_rule(config, inputs):
+    courses = inputs["normalize"]["courses"]
+    return pd.DataFrame({"course_id": courses["course_id"],
+                         "label": classification.label_series(courses["full_text"]).to_numpy()})
+
+def run_classify_semantic(config, inputs):
+    if not config["examples"]:
+        raise ValueError("The semantic classifier needs known examples (--examples).")
+    courses = inputs["normalize"]["courses"][["course_id", "full_text"]].copy()
+    cache_dir = classification.DEFAULT_CACHE_DIR if config["embedding_cache"] else None
+    scored = classification.semantic_similarity_classify(courses, config["examples"], config["semantic_model"],
+                                                         cache_dir=cache_dir)
+    return pd.DataFrame({
+        "course_id": scored["course_id"],
+        "score": scored["semantic_score"].to_numpy(),
+        "label": scored["semantic_score"].ge(config["semantic_threshold"]).map(
+            {True: "Similar to Examples", False: "Not Related"}).to_numpy(),
+    })
+
+def run_classify_zero_shot(config, inputs):
+    courses = inputs["normalize"]["courses"]
+    scores = classification.zero_shot_scores(courses["full_text"].tolist(), config["zero_shot_labels"],
+                                             config["zero_shot_model"], config["zero_shot_batch_size"])
+    return pd.DataFrame({"course_id": courses["course_id"], "score": scores.max(axis=1).to_numpy(),
+                         "label": scores.idxmax(axis=1).to_numpy()})
+
+def run_aggregate(config, inputs):
+    occurrences = inputs["normalize"]["occurrences"]
+    course_labels = inputs["normalize"]["courses"][["course_id", "Course Name", "n_sections"]].copy()
+    label_cubes = {}
+    for classifier, stage in CLASSIFIER_STAGES.items():
+        if stage not in inputs:
+            continue
+        labels = inputs[stage].set_index("course_id")["label"]
+        sections = occurrences.assign(label=labels.reindex(occurrences["course_id"]).to_numpy())
+        label_cubes[f"pipeline_{classifier.replace('-', '_')}_labels"] = cubes.build_label_cube(sections, label_col="label")
+        course_labels[f"{classifier}_label"] = labels.reindex(course_labels["course_id"]).to_numpy()
+    return {"cubes": label_cubes, "course_labels": course_labels}
+
+def publish_aggregate(config, output):
+    cube_dir = os.path.join(config["data_dir"], "cubes")
+    for name, cube in output["cubes"].items():
+        cubes.save_cube(cube, name, cube_dir)
+    os.makedirs(os.path.join(config["data_dir"], "pipeline"), exist_ok=True)
+    output["course_labels"].to_csv(os.path.join(config["data_dir"], "pipeline", "course_labels.csv"), index=False)
+
+def build_stages(classifiers):
+    """The DAG for a list of classifiers (rule, semantic, zero-shot)."""
+    unknown = set(classifiers) - set(CLASSIFIER_STAGES)
+    if unknown:
+        raise ValueError(f"Unknown classifiers {sorted(unknown)}; choose from {sorted(CLASSIFIER_STAGES)}.")
+    stages = [
+        Stage("scrape", run_scrape, config_keys=["scrape", "start_year", "end_year", "semesters"], volatile=True,
+              fingerprint=lambda output: source_fingerprint(output["paths"])),
+        Stage("normalize", run_normalize, ["scrape"]),
+    ]
+    classifier_stages = {
+        "rule": Stage("classify_rule", run_classify_rule, ["normalize"]),
+        "semantic": Stage("classify_semantic", run_classify_semantic, ["normalize"],
+                          ["examples", "semantic_model", "semantic_threshold"]),
+        "zero-shot": Stage("classify_zero_shot", run_classify_zero_shot, ["normalize"],
+                           ["zero_shot_model", "zero_shot_labels"]),
+    }
+    stages += [classifier_stages[c] for c in classifiers]
+    classifier_names = [CLASSIFIER_STAGES[c] for c in classifiers]
+    stages.append(Stage("aggregate", run_aggregate, ["normalize"] + classifier_names, optional=classifier_names,
+                        publish=publish_aggregate))
+    return stages
+
+def stage_settings(stage, config):
+    """Everything besides the upstream outputs that a stage's result depends on."""
+    settings = {key: config[key] for key in stage.config_keys}
+    if stage.name == "classify_rule":
+        settings["tiers"] = classification.tier_groups()
+    return settings
+
+
+# === Running ===
+class Pipeline:
+    """
+    Runs a list of stages in dependency order with cached outputs.
+    - cache_dir: folder for stage outputs (default data_dir/pipeline)
+    - keep: cached outputs kept per stage (the most recent ones)
+    """
+
+    def __init__(self, stages, config, cache_dir=None, keep=3):
+        self.stages = {s.name: s for s in stages}
+        self.config = config
+        self.cache_dir = cache_dir or os.path.join(config["data_dir"], "pipeline")
+        self.keep = keep
+        self.fingerprints = {}
+        self._outputs = {}
+
+    def _cache_path(self, name, fingerprint):
+        return os.path.join(self.cache_dir, name, f"{fingerprint}.pkl")
+
+    def output(self, name):
+        """A finished stage's output (loaded from its cache file when it was not run this time)."""
+        if name not in self._outputs:
+            self._outputs[name] = pd.read_pickle(self._cache_path(name, self.fingerprints[name]))
+        return self._outputs[name]
+
+    def _save(self, name, fingerprint, output):
+        path = self._cache_path(name, fingerprint)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pd.to_pickle(output, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        older = sorted((os.path.join(os.path.dirname(path), f) for f in os.listdir(os.path.dirname(path))
+                        if f.endswith(".pkl")), key=os.path.getmtime, reverse=True)
+        for stale in older[self.keep:]:
+            os.remove(stale)
+
+    def _run_stage(self, stage, force):
+        start = time.perf_counter()
+        settings = stage_settings(stage, self.config)
+        deps = [d for d in stage.deps if d in self.fingerprints]  # optional deps that failed are left out
+        fingerprint = _hash({"stage": stage.name, "version": PIPELINE_VERSION, "settings": settings,
+                             "upstream": {d: self.fingerprints[d] for d in deps}})
+        cached = os.path.exists(self._cache_path(stage.name, fingerprint))
+        if stage.volatile or force or not cached:
+            with span(f"pipeline.{stage.name}"):
+                output = stage.run(self.config, {d: self.output(d) for d in deps})
+            if stage.fingerprint is not None:
+                fingerprint = _hash({"stage": stage.name, "output": stage.fingerprint(output)})
+            self._outputs[stage.name] = output
+            self._save(stage.name, fingerprint, output)
+            status = "ran"
+        else:
+            status = "cached"
+        self.fingerprints[stage.name] = fingerprint
+        if stage.publish is not None:
+            stage.publish(self.config, self.output(stage.name))
+        missing = [d for d in stage.deps if d not in self.fingerprints]
+        return {"stage": stage.name, "status": status, "seconds": round(time.perf_counter() - start, 3),
+                "fingerprint": fingerprint,
+                "error": f"without {', '.join(missing)} (failed)" if missing else None}
+
+    def run(self, force=(), workers=None):
+        """
+        Run every stage whose fingerprint has no cached output (or is in force), in parallel where the
+        DAG allows. Returns a DataFrame with one row per stage: status (ran/cached/failed/skipped), seconds.
+        - force: names of stages to recompute (a ValueError names any that is not a stage)
+        """
+        unknown = set(force) - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages {sorted(unknown)} in force; choose from {list(self.stages)}.")
+        report, pending, failed = [], dict(self.stages), set()
+        running = {}
+        with ThreadPoolExecutor(max_workers=workers or self.config["workers"]) as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    required = [d for d in stage.deps if d not in stage.optional]
+                    if any(d in failed for d in required) or (
+                            stage.optional and all(d in failed for d in stage.optional)):
+                        failed.add(name)
+                        report.append({"stage": name, "status": "skipped", "error": "an upstream stage failed"})
+                        del pending[name]
+                    elif all(d in self.fingerprints or d in failed for d in stage.deps):
+                        running[pool.submit(self._run_stage, stage, name in force)] = name
+                        del pending[name]
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        report.append(future.result())
+                    except Exception as e:
+                        failed.add(name)
+                        report.append({"stage": name, "status": "failed", "error": f"{type(e).__name__}: {e}"})
+        report = pd.DataFrame(report, columns=["stage", "status", "seconds", "fingerprint", "error"])
+        self._write_manifest(report)
+        return report
+
+    def _write_manifest(self, report):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        manifest = {"finished": datetime.now().isoformat(timespec="seconds"),
+                    "config": self.config, "stages": report.to_dict("records")}
+        with open(os.path.join(self.cache_dir, "last_run.json"), "w") as f:
+            json.dump(manifest, f, indent=1, default=str)
+
+def run_pipeline(config=None, force=()):
+    """Run the pipeline with DEFAULT_CONFIG updated by config; returns (report, pipeline)."""
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    pipeline = Pipeline(build_stages(config["classifiers"]), config)
+    return pipeline.run(force), pipeline
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run scrape -> normalize -> classify -> aggregate headlessly.")
+    parser.add_argument("--config", help="JSON file with settings (see DEFAULT_CONFIG); flags override it")
+    parser.add_argument("--data-dir")
+    parser.add_argument("--scrape", choices=["none", "incremental", "delta", "full"])
+    parser.add_argument("--semesters", nargs="+")
+    parser.add_argument("--classifiers", nargs="+", choices=list(CLASSIFIER_STAGES))
+    parser.add_argument("--examples", help="text file with one known planetary health course per line")
+    parser.add_argument("--semantic-model")
+    parser.add_argument("--zero-shot-model")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--force", nargs="+", default=[],
+                        help="stages to recompute even if cached (scrape, normalize, classify_<name>, aggregate)")
+    args = parser.parse_args(argv)
+
+    config = {}
+    if args.config:
+        with open(args.config) as f:
+            config.update(json.load(f))
+    if args.examples:
+        with open(args.examples) as f:
+            config["examples"] = [line.strip() for line in f if line.strip()]
+    flags = {"data_dir": args.data_dir, "scrape": args.scrape, "semesters": args.semesters,
+             "classifiers": args.classifiers, "semantic_model": args.semantic_model,
+             "zero_shot_model": args.zero_shot_model, "workers": args.workers}
+    config.update({k: v for k, v in flags.items() if v is not None})
+    try:
+        report, _ = run_pipeline(config, force=args.force)
+    except ValueError as e:  # unknown classifier or --force stage
+        parser.error(str(e))
+    print(report.drop(columns="fingerprint").to_string(index=False))
+    return 1 if report["status"].isin(["failed", "skipped"]).any() else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# results_cache.py
+"""
+Incremental caches for classification results.
+
+- ResultsCache keeps one result (label or score) per (term, row text hash,
+  classifier config hash). Re-running a classifier only computes rows that
+  are new or whose text changed.
+- KeywordHitCache remembers which keywords were found in each text. When a
+  keyword list changes, only the added keywords are searched for, so editing
+  one keyword costs one keyword's worth of scanning.
+
+Both are plain in-memory objects; the dashboard keeps them alive across reruns
+with st.cache_resource.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+import pandas as pd
+
+try:
+    from Scripts.keyword_matcher import KeywordMatcher
+    from Scripts.tracing import annotate
+except ImportError:  # running from inside the Scripts folder
+    from keyword_matcher import KeywordMatcher
+    from tracing import annotate
+
+
+def row_hashes(texts):
+    """Content hash of each text (non-strings hash like ""), as a list of hex strings."""
+    if isinstance(getattr(texts, "dtype", None), pd.CategoricalDtype):
+        # Compact frames: hash each category once; code -1 (missing) picks the trailing None
+        codes, uniques = texts.cat.codes.to_numpy(), list(texts.cat.categories) + [None]
+    else:
+        codes, uniques = pd.factorize(pd.Series(list(texts), dtype=object), use_na_sentinel=False)
+    unique_hashes = [
+        hashlib.sha1((t if isinstance(t, str) else "").encode("utf-8")).hexdigest()[:20] for t in uniques
+    ]
+    return [unique_hashes[c] for c in codes]
+
+def config_hash(config):
+    """Stable hash of a classifier configuration (any JSON-serializable dict)."""
+    payload = json.dumps(config, sort_keys=True, default=list)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+
+
+class ResultsCache:
+    """
+    Results per (term, row hash, config hash).
+    - max_configs: number of classifier configurations to keep (least recently used are dropped)
+    """
+
+    def __init__(self, max_configs=8):
+        self.max_configs = max_configs
+        self._results = OrderedDict()  # config hash -> {(term, row hash): result}
+        self.last_reused = 0
+        self.last_computed = 0
+
+    def __len__(self):
+        return sum(len(r) for r in self._results.values())
+
+    def get_or_compute(self, texts, config, compute_fn, terms=None):
+        """
+        Return a Series of results aligned with texts, computing only the uncached rows.
+        - texts: Series of course texts
+        - config: dict describing the classifier settings (keywords, model, examples, ...)
+        - compute_fn: callable(Series of texts) -> sequence of results, one per text
+        - terms: Series/list of terms (e.g. df['Semester']), or None
+        """
+        texts = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+        terms = [""] * len(texts) if terms is None else list(terms)
+        key = config_hash(config)
+        results = self._results.setdefault(key, {})
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_configs:
+            self._results.popitem(last=False)
+
+        row_keys = list(zip(terms, row_hashes(texts)))
+        new_rows = [pos for pos, row_key in enumerate(row_keys) if row_key not in results]
+        missing = {}  # row hash -> position of the first uncached row with that text
+        for pos in new_rows:
+            missing.setdefault(row_keys[pos][1], pos)
+        if missing:
+            computed = dict(zip(missing, compute_fn(texts.iloc[list(missing.values())])))
+            for pos in new_rows:
+                results[row_keys[pos]] = computed[row_keys[pos][1]]
+        self.last_computed = len(missing)
+        self.last_reused = len(row_keys) - len(new_rows)
+        annotate(cache_hits=self.last_reused, cache_misses=len(new_rows))
+        return pd.Series([results[k] for k in row_keys], index=texts.index)
+
+
+class KeywordHitCache:
+    """Keywords found per text (by row hash), extended incrementally as keywords are added."""
+
+    def __init__(self):
+        self._entries = {}  # row hash -> (keywords checked, keywords found)
+        self.last_scanned = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keyword_sets(self, texts, keywords, hashes=None):
+        """Return, for each text, the frozenset of `keywords` it contains."""
+        keywords = frozenset(str(k).lower() for k in keywords if str(k))
+        texts = list(texts)
+        hashes = row_hashes(texts) if hashes is None else list(hashes)
+        unique = dict(zip(hashes, texts))
+        # Rows that were checked against the same keywords are searched together,
+        # using a matcher built only from the keywords they have not been checked for.
+        pending = {}
+        for h in unique:
+            checked = self._entries[h][0] if h in self._entries else frozenset()
+            todo = keywords - checked
+            if todo:
+                pending.setdefault((checked, todo), []).append(h)
+        self.last_scanned = 0
+        for (checked, todo), group in pending.items():
+            matcher = KeywordMatcher({"keywords": sorted(todo)})
+            now_checked = checked | todo
+            for h, found in zip(group, matcher.keyword_sets([unique[h] for h in group])):
+                previous = self._entries[h][1] if h in self._entries else frozenset()
+                self._entries[h] = (now_checked, previous | found)
+            self.last_scanned += len(group)
+        found = {h: self._entries[h][1] & keywords for h in unique}
+        return [found[h] for h in hashes]
+
+    def hit_matrix(self, texts, groups, hashes=None):
+        """
+        Same output as KeywordMatcher(groups).hit_matrix(texts): one boolean column per group.
+        """
+        texts = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+        groups = {name: frozenset(str(k).lower() for k in kws if str(k)) for name, kws in groups.items()}
+        sets = self.keyword_sets(texts, frozenset().union(*groups.values()), hashes=hashes)
+        return pd.DataFrame(
+            {name: [not kws.isdisjoint(s) for s in sets] for name, kws in groups.items()},
+            index=texts.index,
+            dtype=bool,
+        )
@@ -0,0 +1,291 @@
+# search_index.py
+"""
+Local full-text search over the course catalog (inverted index, BM25 ranking).
+
+Documents are the distinct courses of the canonical catalog, so a course
+offered in every term and section is indexed once. Titles and descriptions
+are split into lowercase word tokens. The postings keep each token's
+positions, so "quoted phrases" match exactly. Results are ranked with BM25 and
+can be filtered on Semester, Department and School through the course
+occurrences. A course matches a filter if any of its sections does. No
+network is needed: the index is built from the scraped data.
+
+Query syntax: words must all appear (match="any" for either), "quoted text"
+must appear as a phrase, e.g.  "climate change" health
+
+Stored in data/search_index/: postings.npz (CSR arrays), documents.csv and
+meta.json. The index is rebuilt whenever the canonical catalog is. meta.json
+keeps a fingerprint of the indexed content (source_fingerprint), so a saved
+index can be checked against the current catalog, e.g. after a delta refresh
+changed descriptions without changing the number of sections.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    from Scripts.canonical import canonicalize
+    from Scripts.course_frame import parse_list
+except ImportError:  # running from inside the Scripts folder
+    from canonical import canonicalize
+    from course_frame import parse_list
+
+TOKEN_RE = re.compile(r"\w+")
+PHRASE_RE = re.compile(r'"([^"]*)"')
+FILTER_FIELDS = ["Semester", "Department", "School"]
+DOCUMENT_COLUMNS = ["course_id", "Course Name", "Course Description", "n_sections", "n_terms"]
+INDEX_DIRNAME = "search_index"
+
+
+def tokenize(text):
+    """Lowercase word tokens of a text (non-strings have none)."""
+    return TOKEN_RE.findall(text.lower()) if isinstance(text, str) else []
+
+def parse_query(query):
+    """Split a query into clauses: a list of tokens per "quoted phrase" or bare word."""
+    phrases = [tokenize(p) for p in PHRASE_RE.findall(query)]
+    words = [[t] for t in tokenize(PHRASE_RE.sub(" ", query))]
+    return [clause for clause in phrases + words if clause]
+
+
+def source_fingerprint(courses, occurrences):
+    """
+    Content hash of what an index is built from: each course's id and text, and the distinct
+    (course_id, Semester, Department, School) rows of its sections. Row order and repeated
+    sections do not change it, so the full occurrences and their distinct rows give the same hash.
+    """
+    texts = courses["full_text"] if "full_text" in courses.columns else (
+        courses["Course Name"].fillna("").astype(str) + " " + courses["Course Description"].fillna("").astype(str))
+    docs = pd.DataFrame({"course_id": courses["course_id"].astype(str).to_numpy(),
+                         "text": texts.astype(str).to_numpy()}).sort_values(["course_id", "text"])
+    facets = occurrences.reindex(columns=["course_id"] + FILTER_FIELDS).astype(object)
+    facets = facets.where(facets.notna(), "").astype(str).drop_duplicates()
+    facets = facets.sort_values(list(facets.columns))
+    digest = hashlib.sha1()
+    for frame in (docs, facets):
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:20]
+
+
+class SearchIndex:
+    """
+    Positional inverted index of course texts.
+    - k1, b: BM25 parameters
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1, self.b = k1, b
+        self.vocabulary = {}
+        self.documents = pd.DataFrame(columns=DOCUMENT_COLUMNS)
+        self.doc_len = np.zeros(0, dtype=np.int32)
+        self.post_ptr = np.zeros(1, dtype=np.int64)   # postings of term t: post_ptr[t]:post_ptr[t + 1]
+        self.post_doc = np.zeros(0, dtype=np.int32)
+        self.post_tf = np.zeros(0, dtype=np.int32)
+        self.pos_ptr = np.zeros(1, dtype=np.int64)    # positions of posting p: pos_ptr[p]:pos_ptr[p + 1]
+        self.positions = np.zeros(0, dtype=np.int32)
+        self.facets = {}                              # field -> list of values
+        self.occ_doc = np.zeros(0, dtype=np.int32)    # one row per (section, department)
+        self.occ_codes = {}                           # field -> value code of each occurrence row
+        self.fingerprint = None                       # source_fingerprint of the indexed catalog
+
+    def __len__(self):
+        return len(self.documents)
+
+    # --- Building ---
+    @classmethod
+    def build(cls, df, **params):
+        """Index a section-level frame (Course Name, Course Description, Semester, Department, School)."""
+        courses, occurrences = canonicalize(df)
+        return cls.from_canonical(courses, occurrences, **params)
+
+    @classmethod
+    def from_canonical(cls, courses, occurrences, **params):
+        """Index the output of canonical.canonicalize (or the saved courses / course_occurrences tables)."""
+        index = cls(**params)
+        index.documents = courses.reindex(columns=DOCUMENT_COLUMNS).reset_index(drop=True)
+        index.fingerprint = source_fingerprint(courses, occurrences)
+        vocabulary = index.vocabulary
+        texts = courses["full_text"] if "full_text" in courses.columns else (
+            courses["Course Name"].fillna("").astype(str) + " " + courses["Course Description"].fillna("").astype(str))
+        doc_terms = [
+            np.fromiter((vocabulary.setdefault(t, len(vocabulary)) for t in tokenize(text)), dtype=np.int32)
+            for text in texts
+        ]
+        index.doc_len = np.array([len(terms) for terms in doc_terms], dtype=np.int32)
+        starts = np.cumsum(index.doc_len) - index.doc_len
+        index._set_postings(
+            np.concatenate(doc_terms) if doc_terms else np.zeros(0, dtype=np.int32),
+            np.repeat(np.arange(len(doc_terms), dtype=np.int32), index.doc_len),
+            (np.arange(index.doc_len.sum()) - np.repeat(starts, index.doc_len)).astype(np.int32),
+        )
+        index._set_facets(occurrences)
+        return index
+
+    def _set_postings(self, term_ids, doc_ids, positions):
+        order = np.lexsort((positions, doc_ids, term_ids))
+        term_ids, doc_ids, self.positions = term_ids[order], doc_ids[order], positions[order]
+        starts = np.flatnonzero(np.r_[True, (term_ids[1:] != term_ids[:-1]) | (doc_ids[1:] != doc_ids[:-1])])
+        self.post_doc = doc_ids[starts]
+        self.pos_ptr = np.r_[starts, len(positions)].astype(np.int64)
+        self.post_tf = np.diff(self.pos_ptr).astype(np.int32)
+        self.post_ptr = np.searchsorted(term_ids[starts], np.arange(len(self.vocabulary) + 1)).astype(np.int64)
+
+    def _set_facets(self, occurrences):
+        rows = {doc_id: i for i, doc_id in enumerate(self.documents["course_id"])}
+        occ = pd.DataFrame({"doc": pd.Series(occurrences["course_id"].to_numpy()).map(rows).to_numpy()})
+        for field in FILTER_FIELDS:
+            occ[field] = occurrences[field].astype(object).to_numpy() if field in occurrences.columns else None
+        # A section listed under several departments ("['A', 'B']") matches a filter on either
+        codes, departments = pd.factorize(occ["Department"], use_na_sentinel=False)
+        parsed = np.empty(len(departments), dtype=object)
+        parsed[:] = [parse_list(v) or ("Unknown",) for v in departments]
+        occ["Department"] = parsed[codes]
+        occ = occ.explode("Department").dropna(subset=["doc"])
+        self.occ_doc = occ["doc"].to_numpy(dtype=np.int32)
+        for field in FILTER_FIELDS:
+            codes, values = pd.factorize(occ[field].fillna("Unknown").astype(str), sort=True)
+            self.facets[field] = list(values)
+            self.occ_codes[field] = codes.astype(np.int32)
+
+    # --- Queries ---
+    def _postings(self, token):
+        t = self.vocabulary.get(token)
+        if t is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.arange(self.post_ptr[t], self.post_ptr[t + 1])
+
+    def _token_keys(self, token, offset=0):
+        """(doc << 32) + position - offset for every occurrence of a token."""
+        p = self._postings(token)
+        if not len(p):
+            return np.zeros(0, dtype=np.int64)
+        # A term's postings are contiguous, and so are their positions
+        positions = self.positions[self.pos_ptr[p[0]]:self.pos_ptr[p[-1] + 1]]
+        docs = np.repeat(self.post_doc[p].astype(np.int64), self.post_tf[p])
+        return (docs << 32) + positions - offset
+
+    def _clause_docs(self, clause):
+        """Documents containing a token, or every token of a phrase in consecutive positions."""
+        if len(clause) == 1:
+            return self.post_doc[self._postings(clause[0])]
+        keys = self._token_keys(clause[0])
+        for offset, token in enumerate(clause[1:], start=1):
+            keys = np.intersect1d(keys, self._token_keys(token, offset), assume_unique=True)
+        return np.unique(keys >> 32).astype(np.int32)
+
+    def allowed(self, semesters=None, departments=None, schools=None):
+        """Boolean mask of the documents with at least one section matching every given filter."""
+        wanted = {"Semester": semesters, "Department": departments, "School": schools}
+        if all(not v for v in wanted.values()):
+            return np.ones(len(self), dtype=bool)
+        rows = np.ones(len(self.occ_doc), dtype=bool)
+        for field, values in wanted.items():
+            if values:
+                codes = [i for i, v in enumerate(self.facets[field]) if v in set(values)]
+                rows &= np.isin(self.occ_codes[field], codes)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.occ_doc[rows]] = True
+        return mask
+
+    def bm25(self, tokens):
+        """BM25 score of every document for a bag of query tokens."""
+        scores = np.zeros(len(self), dtype=np.float64)
+        if not len(self):
+            return scores
+        avg_len = max(self.doc_len.mean(), 1.0)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / avg_len)
+        for token in set(tokens):
+            p = self._postings(token)
+            if not len(p):
+                continue
+            idf = np.log(1 + (len(self) - len(p) + 0.5) / (len(p) + 0.5))
+            docs, tf = self.post_doc[p], self.post_tf[p]
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm[docs])
+        return scores
+
+    def search(self, query, k=20, semesters=None, departments=None, schools=None, match="all"):
+        """
+        Courses matching a query, best BM25 score first.
+        - k: number of results (None for all)
+        - semesters, departments, schools: lists of values to filter on (see .facets)
+        - match: "all" clauses must match, or "any" of them
+        Returns a DataFrame of documents with a score column.
+        """
+        clauses = parse_query(query)
+        if not clauses or not len(self):
+            return self.documents.iloc[:0].assign(score=pd.Series(dtype=float))
+        hits = [self._clause_docs(clause) for clause in clauses]
+        mask = np.zeros(len(self), dtype=bool)
+        if match == "any":
+            for docs in hits:
+                mask[docs] = True
+        else:
+            mask[:] = True
+            for docs in hits:
+                clause_mask = np.zeros(len(self), dtype=bool)
+                clause_mask[docs] = True
+                mask &= clause_mask
+        mask &= self.allowed(semesters, departments, schools)
+        docs = np.flatnonzero(mask)
+        scores = self.bm25([t for clause in clauses for t in clause])[docs]
+        order = np.argsort(-scores, kind="stable")
+        if k is not None:
+            order = order[:k]
+        return self.documents.iloc[docs[order]].assign(score=scores[order]).reset_index(drop=True)
+
+    # --- Persistence ---
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.savez(os.path.join(path, "postings.npz"), doc_len=self.doc_len, post_ptr=self.post_ptr,
+                 post_doc=self.post_doc, post_tf=self.post_tf, pos_ptr=self.pos_ptr, positions=self.positions,
+                 occ_doc=self.occ_doc, **{f"occ_{field}": codes for field, codes in self.occ_codes.items()})
+        self.documents.to_csv(os.path.join(path, "documents.csv"), index=False)
+        meta = {"vocabulary": sorted(self.vocabulary, key=self.vocabulary.get), "facets": self.facets,
+                "fingerprint": self.fingerprint, "k1": self.k1, "b": self.b}
+        with open(os.path.join(path, "meta.json.tmp"), "w") as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(path, "meta.json.tmp"), os.path.join(path, "meta.json"))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Open a saved index, or None if there is none in path."""
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        index = cls(meta["k1"], meta["b"])
+        index.vocabulary = {t: i for i, t in enumerate(meta["vocabulary"])}
+        index.facets = meta["facets"]
+        index.fingerprint = meta.get("fingerprint")
+        index.documents = pd.read_csv(os.path.join(path, "documents.csv"),
+                                      dtype={"course_id": str, "Course Name": str, "Course Description": str})
+        with np.load(os.path.join(path, "postings.npz")) as arrays:
+            for name in ("doc_len", "post_ptr", "post_doc", "post_tf", "pos_ptr", "positions", "occ_doc"):
+                setattr(index, name, arrays[name])
+            index.occ_codes = {field: arrays[f"occ_{field}"] for field in FILTER_FIELDS}
+        return index
+
+def load_or_build(data_dir, df=None, save=True):
+    """
+    The saved index in data_dir/search_index, checked against df: when it is missing or its
+    fingerprint differs from df's content, a new index is built from df (and saved, unless
+    save=False). Returns None without either.
+    - save: False to only build in memory (read-only callers such as the dashboard)
+    """
+    path = os.path.join(data_dir, INDEX_DIRNAME)
+    index = SearchIndex.load(path)
+    if df is None:
+        return index
+    courses, occurrences = canonicalize(df)
+    if index is None or index.fingerprint != source_fingerprint(courses, occurrences):
+        index = SearchIndex.from_canonical(courses, occurrences)
+        if save:
+            index.save(path)
+    return index
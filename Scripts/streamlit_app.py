@@ -3,6 +3,7 @@ import pandas as pd
 import os
 import sys
 import socket
+import glob
 
 # Ensure the Scripts directory is in sys.path for imports
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,10 +14,23 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from Scripts.classification import (
-    label_course, semantic_similarity_classify, zero_shot_classify, cluster_courses
+    label_series, semantic_similarity_classify, zero_shot_scores, cluster_courses,
+    cascade_classify, cascade_summary, similar_courses, warm_up, is_warm, warm_up_error,
+    DEFAULT_TAXONOMY, ENV_KEYWORDS, HEALTH_KEYWORDS
 )
-from Scripts.extract_all_terms import initial_extraction, incremental_scrape
-from Scripts.analysis import plot_yearly_trends, plot_departmental_breakdown
+from Scripts.model_registry import registry as model_registry
+from Scripts.embedding_backends import available_backends, embedding_model_name, set_backend_options
+from Scripts.extract_all_terms import concurrent_extraction, incremental_scrape, delta_refresh
+from Scripts.analysis import keyword_analysis, taxonomy_coverage, taxonomy_coverage_by
+from Scripts.charts import chart_cache
+from Scripts import course_store, cubes
+from Scripts.course_store import load_semester_data
+from Scripts.course_frame import export_frame, read_compact_csv, memory_report
+from Scripts.canonical import per_course
+from Scripts.coverage import CoverageMatrix
+from Scripts.search_index import INDEX_DIRNAME, load_or_build
+from Scripts.results_cache import ResultsCache, KeywordHitCache
+from Scripts.tracing import tracer, span
 
 def get_data_dir():
     # Prefer 'data', fallback to 'Data' if it exists
@@ -34,30 +48,70 @@ def get_available_semesters(data_dir):
     files = [f for f in os.listdir(data_dir) if f.endswith('.csv') and f != 'all_courses.csv']
     return sorted([f.replace('.csv', '').replace('_', ' ') for f in files])
 
-def load_semester_data(data_dir, selected):
-    dfs = []
-    for sem in selected:
-        fname = os.path.join(data_dir, sem.replace(' ', '_') + '.csv')
-        if os.path.exists(fname):
-            dfs.append(pd.read_csv(fname))
-    if dfs:
-        return pd.concat(dfs, ignore_index=True)
-    return pd.DataFrame()
-
-def keyword_analysis(df, env_keywords, health_keywords):
-    env_keywords = [k.lower() for k in env_keywords]
-    health_keywords = [k.lower() for k in health_keywords]
-    def label_row(row):
-        text = (str(row.get('Course Name', '')) + ' ' + str(row.get('Course Description', ''))).lower()
-        if 'planetary health' in text:
-            return 'Category 1: Explicitly Planetary Health'
-        if 'systems' in text and any(k in text for k in env_keywords) and any(k in text for k in health_keywords):
-            return 'Category 2: Planetary Health Concept'
-        if any(k in text for k in env_keywords) or any(k in text for k in health_keywords):
-            return 'Category 3: Related Concept'
-        return 'Not Related'
-    df['PH_Label'] = df.apply(label_row, axis=1)
-    return df
+def get_store_dir(data_dir):
+    return os.path.join(data_dir, 'course_store')
+
+@st.cache_resource
+def get_results_caches():
+    # Shared across reruns: labels per (term, text, settings) and keyword hits per text
+    return ResultsCache(), KeywordHitCache()
+
+@st.cache_resource
+def get_search_index(data_dir, catalog, version, _df):
+    # Reloaded when the catalog or the saved index changes (version). A missing or stale index is
+    # built in memory only: the index on disk is written by the extraction scripts, not while rendering
+    return load_or_build(data_dir, _df, save=False)
+
+def catalog_version(data_dir):
+    # Changes whenever a term CSV or partition is written or all_courses.csv is rebuilt
+    paths = glob.glob(os.path.join(data_dir, '*.csv'))
+    paths += glob.glob(os.path.join(get_store_dir(data_dir), "term=*", "part-0.parquet"))
+    return max((os.path.getmtime(p) for p in paths if os.path.exists(p)), default=None)
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_catalog(data_dir, version):
+    # Shared across reruns; callers take a shallow copy before adding result columns
+    if course_store.HAVE_PYARROW:
+        # Terms not migrated to the store yet are read from their CSVs
+        terms = sorted(set(get_available_semesters(data_dir)) | set(course_store.available_terms(get_store_dir(data_dir))))
+        return course_store.load_semester_data(data_dir, terms, compact=True)
+    return read_compact_csv(os.path.join(data_dir, 'all_courses.csv'))
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_rule_labels(data_dir, version, _df):
+    # Rule-based labels of the catalog, computed once per catalog version
+    results_cache, _ = get_results_caches()
+    return label_series(_df["full_text"], results_cache, _df.get("Semester")).to_numpy()
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_label_cube(method, data_key, cube_dir, _df):
+    # One cube per (method, classified data): reruns that do not change the labels reuse it.
+    # Rule-based labels are cubed at ingest time; other methods are cubed here.
+    if method == "Rule-based":
+        cube = cubes.load_cube("rule_based_labels", cube_dir)
+        if cubes.covers(cube, _df):
+            return cube
+    cube = cubes.build_label_cube(_df)
+    if method == "Rule-based":
+        cubes.save_cube(cube, "rule_based_labels", cube_dir)
+    return cube
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_taxonomy_cube(taxonomy_items, data_key, cube_dir, _df):
+    # The default taxonomy is cubed at ingest time; edited taxonomies are cubed here once
+    taxonomy = {name: list(kws) for name, kws in taxonomy_items}
+    if taxonomy == DEFAULT_TAXONOMY:
+        cube = cubes.load_cube("taxonomy_categories", cube_dir)
+        if cubes.covers(cube, _df):
+            return cube
+    if "full_text" in _df.columns:
+        return cubes.build_taxonomy_cube(_df, taxonomy)
+    return cubes.build_taxonomy_cube(_df.assign(full_text=_df["Course Name"].astype(str) + " " +
+                                                _df["Course Description"].astype(str)), taxonomy)
+
+def search_index_version(data_dir):
+    meta_path = os.path.join(data_dir, INDEX_DIRNAME, "meta.json")
+    return os.path.getmtime(meta_path) if os.path.exists(meta_path) else None
 
 def check_internet(host="8.8.8.8", port=53, timeout=3):
     try:
@@ -70,7 +124,26 @@ def check_internet(host="8.8.8.8", port=53, timeout=3):
 # --- UI Layout ---
 st.set_page_config(page_title="JHU Planetary Health Course Analysis", layout="wide")
 
-st.markdown("""
+profile_run = st.sidebar.checkbox("Profile this run (cProfile)", value=False,
+                                  help="Records every function call of this run; see Diagnostics at the bottom.")
+# The profiler is stopped however this run ends (st.stop(), an exception or the last line)
+with tracer.profile(enabled=profile_run) as profile_result:
+    preload_models = st.sidebar.checkbox(
+        "Load AI models in the background", value=True,
+        help="Start loading the model of a method as soon as it is picked, so the first run is faster."
+    )
+    embedding_backend = st.sidebar.selectbox(
+        "Embedding backend", available_backends(),
+        help="onnx and onnx-int8 (a quantized copy) run the model with ONNX Runtime. The export is "
+             "checked against the PyTorch embeddings when it is first made. Listed only when onnxruntime is installed."
+    )
+    embedding_threads = st.sidebar.number_input("Embedding threads (0 = automatic)", min_value=0,
+                                                max_value=os.cpu_count() or 1, value=0)
+    embedding_batch_size = st.sidebar.number_input("Embedding batch size", min_value=1, max_value=1024, value=64)
+    set_backend_options(embedding_threads, embedding_batch_size)
+    embedding_model = embedding_model_name("all-MiniLM-L6-v2", embedding_backend)
+
+    st.markdown("""
 # 🌎 JHU Planetary Health Course Analysis
 
 Welcome! This tool lets you fetch, analyze, and classify JHU course data for planetary health research—**no coding required**.
@@ -85,99 +158,114 @@ Welcome! This tool lets you fetch, analyze, and classify JHU course data for pla
 ---
 """)
 
-data_dir = get_data_dir()
+    data_dir = get_data_dir()
 
-# Warn if both 'data' and 'Data' exist (case-sensitive filesystem)
-if os.path.isdir(os.path.join(project_root, 'data')) and os.path.isdir(os.path.join(project_root, 'Data')):
-    st.warning("Both 'data' and 'Data' directories exist. Please use only one to avoid confusion.")
+    # Warn if both 'data' and 'Data' exist (case-sensitive filesystem)
+    if os.path.isdir(os.path.join(project_root, 'data')) and os.path.isdir(os.path.join(project_root, 'Data')):
+        st.warning("Both 'data' and 'Data' directories exist. Please use only one to avoid confusion.")
 
-col1, col2 = st.columns([1, 1])
-with col1:
-    initial_btn = st.button("🆕 Initial Extraction (Overwrite All Data)")
-with col2:
-    update_btn = st.button("🔄 Update Course Data (Add New Semesters)")
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        initial_btn = st.button("🆕 Initial Extraction (Overwrite All Data)")
+    with col2:
+        update_btn = st.button("🔄 Update Course Data (Add New Semesters)")
+    with col3:
+        refresh_btn = st.button("♻️ Refresh Changed Semesters")
 
-status_box = st.empty()
+    status_box = st.empty()
 
-if initial_btn:
-    if not check_internet():
-        status_box.error("No internet connection. Please check your network and try again.")
-    else:
-        with status_box, st.spinner("Performing initial extraction. This may take several minutes..."):
-            try:
-                added = initial_extraction()
-                if added:
-                    st.success(f"✅ Initial extraction complete. Semesters added: {', '.join(added)}")
-                else:
-                    st.warning("No semesters were added. Check your connection or try again later.")
-            except Exception as e:
-                st.error(f"❌ Error during initial extraction: {e}")
+    if initial_btn:
+        if not check_internet():
+            status_box.error("No internet connection. Please check your network and try again.")
+        else:
+            with status_box, st.spinner("Performing initial extraction. This may take several minutes..."):
+                try:
+                    # A full overwrite must not skip terms recorded by an earlier interrupted run
+                    added = concurrent_extraction(outdir=data_dir, resume=False)
+                    if added:
+                        st.success(f"✅ Initial extraction complete. Semesters added: {', '.join(added)}")
+                    else:
+                        st.warning("No semesters were added. Check your connection or try again later.")
+                except Exception as e:
+                    st.error(f"❌ Error during initial extraction: {e}")
+
+    if update_btn:
+        if not check_internet():
+            status_box.error("No internet connection. Please check your network and try again.")
+        else:
+            with status_box, st.spinner("Updating course data. This may take a few minutes..."):
+                try:
+                    new_terms = incremental_scrape(outdir=data_dir)
+                    if new_terms:
+                        st.success(f"✅ Added new semesters: {', '.join(new_terms)}")
+                    else:
+                        st.info("No new semesters found. All available data is up to date.")
+                except Exception as e:
+                    st.error(f"❌ Error updating course data: {e}")
+
+    if refresh_btn:
+        if not check_internet():
+            status_box.error("No internet connection. Please check your network and try again.")
+        else:
+            with status_box, st.spinner("Checking every semester for changes..."):
+                try:
+                    report = delta_refresh(outdir=data_dir)
+                    changed = report[report["status"].isin(["new", "changed"])]
+                    if changed.empty:
+                        st.info("No semester has changed since the last refresh.")
+                    else:
+                        st.success(f"✅ Refreshed semesters: {', '.join(changed['term'])}")
+                    st.dataframe(report, use_container_width=True)
+                except Exception as e:
+                    st.error(f"❌ Error refreshing course data: {e}")
+
+    semesters = get_available_semesters(data_dir)
+    if not semesters:
+        st.warning("No course data found. Use 'Initial Extraction' or 'Update Course Data' above to fetch the latest data.\n\nIf you just ran extraction, check for errors above or ensure the API is returning data.")
+        st.stop()
 
-if update_btn:
-    if not check_internet():
-        status_box.error("No internet connection. Please check your network and try again.")
-    else:
-        with status_box, st.spinner("Updating course data. This may take a few minutes..."):
-            try:
-                new_terms = incremental_scrape()
-                if new_terms:
-                    st.success(f"✅ Added new semesters: {', '.join(new_terms)}")
-                else:
-                    st.info("No new semesters found. All available data is up to date.")
-            except Exception as e:
-                st.error(f"❌ Error updating course data: {e}")
-
-semesters = get_available_semesters(data_dir)
-if not semesters:
-    st.warning("No course data found. Use 'Initial Extraction' or 'Update Course Data' above to fetch the latest data.\n\nIf you just ran extraction, check for errors above or ensure the API is returning data.")
-    st.stop()
-
-st.markdown("---")
-st.header("Analyze Courses by Semester and Keywords")
-
-selected_semesters = st.multiselect(
-    "Select semesters/academic years to analyze:",
-    semesters,
-    default=semesters[-1:]  # Default to most recent
-)
+    st.markdown("---")
+    st.header("Analyze Courses by Semester and Keywords")
 
-def_list_env = [
-    "environmental change", "air pollution", "biodiversity loss", "climate change", "resource scarcity",
-    "land use change", "nutrient cycling", "ocean degradation", "environment", "eco-systems"
-]
-def_list_health = [
-    "human health", "infectious diseases", "injuries", "reproductive health", "mental health",
-    "noncommunicable diseases", "nutritional diseases", "displacement", "conflict", "mortality"
-]
-
-with st.expander("Adjust Keyword Lists (optional)"):
-    env_keywords = st.text_area(
-        "Environmental change keywords (comma-separated)",
-        value=", ".join(def_list_env),
-        height=70
-    ).split(",")
-    health_keywords = st.text_area(
-        "Human health keywords (comma-separated)",
-        value=", ".join(def_list_health),
-        height=70
-    ).split(",")
-    env_keywords = [k.strip() for k in env_keywords if k.strip()]
-    health_keywords = [k.strip() for k in health_keywords if k.strip()]
-
-run_analysis = st.button("🚦 Run Keyword Analysis")
-
-if run_analysis:
-    df = load_semester_data(data_dir, selected_semesters)
-    if df.empty:
-        st.warning("No data found for selected semesters. Try updating the course data or selecting different semesters.")
-    else:
-        df = keyword_analysis(df, env_keywords, health_keywords)
-        st.success(f"Analysis complete! {len(df)} courses analyzed.")
-        st.write(df["PH_Label"].value_counts())
-        st.dataframe(df[["Course Name", "PH_Label", "Semester", "Academic Year"] + [c for c in df.columns if c not in ["Course Name", "PH_Label", "Semester", "Academic Year"]]].head(50))
-        st.download_button("⬇️ Download Results as CSV", df.to_csv(index=False), "keyword_analysis_results.csv")
+    selected_semesters = st.multiselect(
+        "Select semesters/academic years to analyze:",
+        semesters,
+        default=semesters[-1:]  # Default to most recent
+    )
 
-st.markdown("""
+    def_list_env = list(ENV_KEYWORDS)
+    def_list_health = list(HEALTH_KEYWORDS)
+
+    with st.expander("Adjust Keyword Lists (optional)"):
+        env_keywords = st.text_area(
+            "Environmental change keywords (comma-separated)",
+            value=", ".join(def_list_env),
+            height=70
+        ).split(",")
+        health_keywords = st.text_area(
+            "Human health keywords (comma-separated)",
+            value=", ".join(def_list_health),
+            height=70
+        ).split(",")
+        env_keywords = [k.strip() for k in env_keywords if k.strip()]
+        health_keywords = [k.strip() for k in health_keywords if k.strip()]
+
+    run_analysis = st.button("🚦 Run Keyword Analysis")
+
+    if run_analysis:
+        df = load_semester_data(data_dir, selected_semesters, compact=True)
+        if df.empty:
+            st.warning("No data found for selected semesters. Try updating the course data or selecting different semesters.")
+        else:
+            results_cache, hit_cache = get_results_caches()
+            df = keyword_analysis(df, env_keywords, health_keywords, results_cache, hit_cache)
+            st.success(f"Analysis complete! {len(df)} courses analyzed "
+                       f"({results_cache.last_reused} reused from earlier runs, {results_cache.last_computed} texts classified).")
+            st.write(df["PH_Label"].value_counts())
+            st.dataframe(df[["Course Name", "PH_Label", "Semester", "Academic Year"] + [c for c in df.columns if c not in ["Course Name", "PH_Label", "Semester", "Academic Year"]]].head(50))
+            st.download_button("⬇️ Download Results as CSV", export_frame(df).to_csv(index=False), "keyword_analysis_results.csv")
+
+    st.markdown("""
 ---
 ### Troubleshooting
 - If no data appears after scraping, check your internet connection and try again.
@@ -185,83 +273,232 @@ st.markdown("""
 - For persistent issues, contact your technical support team or check the API status.
 """)
 
-# Load the latest data if available
-all_courses_path = os.path.join(data_dir, 'all_courses.csv')
-if os.path.exists(all_courses_path):
-    df = pd.read_csv(all_courses_path)
-    st.write("Data Preview:", df.head())
-
-    method = st.selectbox(
-        "Choose classification method",
-        ["Rule-based", "Semantic Similarity", "Zero-shot", "Clustering"]
-    )
-
-    if method == "Rule-based":
-        st.markdown("Rule-based: Uses keyword matching to assign categories.")
-        if "full_text" in df.columns:
-            df["PH_Label"] = df["full_text"].apply(label_course)
-        elif "Course Name" in df.columns and "Course Description" in df.columns:
-            df["full_text"] = df["Course Name"].astype(str) + " " + df["Course Description"].astype(str)
-            df["PH_Label"] = df["full_text"].apply(label_course)
-        else:
-            st.error("Input data must have 'Course Name' and 'Course Description' columns or a 'full_text' column.")
-            st.stop()
-        st.write(df["PH_Label"].value_counts())
-    elif method == "Semantic Similarity":
-        st.markdown("Semantic Similarity: Compares your courses to known planetary health examples using AI.")
-        examples = st.text_area(
-            "Enter known planetary health course examples (one per line)",
-            height=150
+    # Load the latest data if available
+    all_courses_path = os.path.join(data_dir, 'all_courses.csv')
+    if os.path.exists(all_courses_path):
+        with span("dashboard.load_catalog") as load_span:
+            df = get_catalog(data_dir, catalog_version(data_dir)).copy(deep=False)
+            load_span["rows"] = len(df)
+        st.write("Data Preview:", df.head())
+        st.caption(f"Catalog in memory: {memory_report({'catalog': df}).loc['total', 'catalog']:.1f} MB")
+
+        with st.expander("🔎 Search Courses", expanded=False):
+            search_index = get_search_index(data_dir, catalog_version(data_dir), search_index_version(data_dir), df)
+            query = st.text_input('Search course titles and descriptions (put phrases in "quotes")')
+            f_col1, f_col2, f_col3 = st.columns(3)
+            with f_col1:
+                search_semesters = st.multiselect("Semesters", search_index.facets["Semester"])
+            with f_col2:
+                search_departments = st.multiselect("Departments", search_index.facets["Department"])
+            with f_col3:
+                search_schools = st.multiselect("Schools", search_index.facets["School"])
+            match_any = st.checkbox("Match any word instead of all")
+            if query:
+                with span("dashboard.search") as search_span:
+                    results = search_index.search(query, k=None, semesters=search_semesters,
+                                                  departments=search_departments, schools=search_schools,
+                                                  match="any" if match_any else "all")
+                    search_span["rows"] = len(results)
+                st.caption(f"{len(results)} courses found (showing the best 100).")
+                st.dataframe(results.head(100), use_container_width=True)
+            if st.checkbox("Show courses per keyword (keyword lists above)"):
+                st.dataframe(pd.DataFrame({
+                    "keyword": env_keywords + health_keywords,
+                    "n_courses": [len(search_index.search(f'"{kw}"', k=None, semesters=search_semesters,
+                                                          departments=search_departments, schools=search_schools))
+                                  for kw in env_keywords + health_keywords],
+                }).sort_values("n_courses", ascending=False), use_container_width=True)
+
+        method = st.selectbox(
+            "Choose classification method",
+            ["Rule-based", "Semantic Similarity", "Zero-shot", "Cascade", "Similar Courses", "Clustering"]
         )
-        known_examples = [e.strip() for e in examples.splitlines() if e.strip()]
-        if st.button("Run Semantic Similarity"):
-            if not known_examples:
-                st.error("Please provide at least one known example.")
+        # ML backends are only imported once a model-based method is picked
+        warm_method = {
+            "Semantic Similarity": "semantic", "Zero-shot": "zero-shot", "Cascade": "cascade",
+            "Similar Courses": "similar", "Clustering": "clustering",
+        }.get(method)
+        warm_model = embedding_model if warm_method in ("semantic", "similar", "clustering") else None
+        # The cascade only needs the zero-shot model when uncertain courses are sent to it
+        warm_use_model = warm_method != "cascade" or st.session_state.get("cascade_zero_shot", True)
+        if warm_method and preload_models:
+            warm_up(warm_method, warm_model, warm_use_model)
+            warm_error = warm_up_error(warm_method, warm_model, warm_use_model)
+            if warm_error:
+                st.caption(f"⚠️ Loading the AI model in the background failed ({warm_error}); retrying on the next run.")
+            elif not is_warm(warm_method, warm_model, warm_use_model):
+                st.caption("⏳ Loading the AI model in the background; it will be ready shortly.")
+
+        if method == "Rule-based":
+            st.markdown("Rule-based: Uses keyword matching to assign categories.")
+            results_cache, _ = get_results_caches()
+            if "full_text" in df.columns:
+                df["PH_Label"] = get_rule_labels(data_dir, catalog_version(data_dir), df)
+            elif "Course Name" in df.columns and "Course Description" in df.columns:
+                df["full_text"] = df["Course Name"].astype(str) + " " + df["Course Description"].astype(str)
+                df["PH_Label"] = label_series(df["full_text"], results_cache, df.get("Semester"))
             else:
-                with st.spinner("Running semantic similarity classification..."):
-                    df = semantic_similarity_classify(df, known_examples)
-                st.write(df.sort_values("semantic_score", ascending=False).head(10))
-                st.write(df["semantic_score"].describe())
-    elif method == "Zero-shot":
-        st.markdown("Zero-shot: Uses a language model to assign categories based on your label descriptions.")
-        candidate_labels = st.text_input(
-            "Enter candidate labels (comma-separated)",
-            value="About Planetary Health,Planetary Health Core Concept,Planetary Health Adjacent,Not Related"
-        )
-        if st.button("Run Zero-shot Classification"):
-            with st.spinner("Running zero-shot classification (this may take a while)..."):
-                labels = zero_shot_classify(df["full_text"].tolist(), [l.strip() for l in candidate_labels.split(",")])
-                df["PH_Label"] = labels
+                st.error("Input data must have 'Course Name' and 'Course Description' columns or a 'full_text' column.")
+                st.stop()
             st.write(df["PH_Label"].value_counts())
-    elif method == "Clustering":
-        st.markdown("Clustering: Groups courses into clusters using AI embeddings.")
-        n_clusters = st.number_input("Number of clusters", min_value=2, max_value=10, value=4)
-        if st.button("Run Clustering"):
-            with st.spinner("Running clustering (this may take a while)..."):
-                df = cluster_courses(df, n_clusters=int(n_clusters))
-            st.write(df["cluster_label"].value_counts())
-
-    st.markdown("---")
-    st.download_button("Download Results as CSV", df.to_csv(index=False), "classified_courses.csv")
-    st.write("Preview of classified data:", df.head())
-
-    # Visualizations
-    st.write("### Yearly Trends")
-    plot_yearly_trends(df)
-    st.write("### Departmental Breakdown")
-    plot_departmental_breakdown(df)
-else:
-    st.info("No course data found. Click the button above to fetch the latest data.")
-
-# --- New: List and preview data files ---
-with st.expander("📂 Browse Extracted Data Files", expanded=False):
-    data_files = [f for f in os.listdir(data_dir) if f.endswith('.csv') and f != 'all_courses.csv']
-    if data_files:
-        selected_file = st.selectbox("Select a data file to preview:", sorted(data_files))
-        if selected_file:
-            df_preview = pd.read_csv(os.path.join(data_dir, selected_file))
-            st.write(f"Preview of `{selected_file}`:")
-            st.dataframe(df_preview.head(100))
-            st.download_button("Download this file as CSV", df_preview.to_csv(index=False), selected_file)
+        elif method == "Semantic Similarity":
+            st.markdown("Semantic Similarity: Compares your courses to known planetary health examples using AI.")
+            examples = st.text_area(
+                "Enter known planetary health course examples (one per line)",
+                height=150
+            )
+            known_examples = [e.strip() for e in examples.splitlines() if e.strip()]
+            if st.button("Run Semantic Similarity"):
+                if not known_examples:
+                    st.error("Please provide at least one known example.")
+                else:
+                    with st.spinner("Running semantic similarity classification..."):
+                        df = per_course(df, lambda courses: semantic_similarity_classify(
+                            courses, known_examples, embedding_model, results_cache=get_results_caches()[0]))
+                    st.write(df.sort_values("semantic_score", ascending=False).head(10))
+                    st.write(df["semantic_score"].describe())
+        elif method == "Zero-shot":
+            st.markdown("Zero-shot: Uses a language model to assign categories based on your label descriptions.")
+            candidate_labels = st.text_input(
+                "Enter candidate labels (comma-separated)",
+                value="About Planetary Health,Planetary Health Core Concept,Planetary Health Adjacent,Not Related"
+            )
+            zs_batch_size = st.number_input("Batch size", min_value=1, max_value=256, value=16)
+            if st.button("Run Zero-shot Classification"):
+                progress = st.progress(0.0, text="Running zero-shot classification (this may take a while)...")
+                scores = zero_shot_scores(
+                    df["full_text"].tolist(), [l.strip() for l in candidate_labels.split(",")],
+                    batch_size=int(zs_batch_size),
+                    progress_callback=lambda done, total: progress.progress(done / total, text=f"Classified {done}/{total} courses"),
+                    results_cache=get_results_caches()[0], terms=df.get("Semester"),
+                )
+                progress.empty()
+                df["PH_Label"] = scores.idxmax(axis=1).to_numpy()
+                df["zero_shot_score"] = scores.max(axis=1).to_numpy()
+                st.write(df["PH_Label"].value_counts())
+                st.write("Label scores (first 50 courses):", scores.head(50))
+        elif method == "Cascade":
+            st.markdown("Cascade: Keyword rules and a quick text-similarity score handle the clear cases; "
+                        "only the uncertain courses are sent to the zero-shot language model.")
+            c_col1, c_col2 = st.columns(2)
+            with c_col1:
+                cascade_low = st.slider("Below this similarity, courses without keywords are Not Related", 0.0, 0.5, 0.05, 0.01)
+            with c_col2:
+                cascade_high = st.slider("Above this similarity, Adjacent keyword matches are accepted", 0.0, 0.5, 0.10, 0.01)
+            cascade_zero_shot = st.checkbox("Send uncertain courses to the zero-shot model", value=True,
+                                            key="cascade_zero_shot")
+            if st.button("Run Cascade Classification"):
+                if "full_text" not in df.columns:
+                    df["full_text"] = df["Course Name"].astype(str) + " " + df["Course Description"].astype(str)
+                with st.spinner("Running cascade classification..."):
+                    df = per_course(df, lambda courses: cascade_classify(
+                        courses, low=cascade_low, high=cascade_high, use_zero_shot=cascade_zero_shot))
+                st.write("Rows resolved by each stage:", cascade_summary(df))
+                st.write(df["PH_Label"].value_counts())
+        elif method == "Similar Courses":
+            st.markdown("Similar Courses: Finds the courses whose descriptions are closest to a course you pick, using AI embeddings.")
+            if "full_text" not in df.columns:
+                df["full_text"] = df["Course Name"].astype(str) + " " + df["Course Description"].astype(str)
+            course_names = sorted(df["Course Name"].dropna().astype(str).unique())
+            chosen = st.selectbox("Course", course_names)
+            n_similar = st.slider("Number of similar courses", 1, 50, 10)
+            if st.button("Find Similar Courses"):
+                query = df.loc[df["Course Name"].astype(str) == chosen, "full_text"].iloc[0]
+                with st.spinner("Searching (the first search embeds the catalog and may take a while)..."):
+                    similar = similar_courses(df, query, k=n_similar, model_name=embedding_model)
+                st.dataframe(similar[["Course Name", "similarity", "Semester", "Department", "Course Description"]])
+        elif method == "Clustering":
+            st.markdown("Clustering: Groups courses into clusters using AI embeddings.")
+            n_clusters = st.number_input("Number of clusters", min_value=2, max_value=10, value=4)
+            low_memory = st.checkbox("Low-memory mode (embed and cluster in chunks; recommended for the full catalog)", value=True)
+            if st.button("Run Clustering"):
+                with st.spinner("Running clustering (this may take a while)..."):
+                    df = per_course(df, lambda courses: cluster_courses(
+                        courses, embedding_model, n_clusters=int(n_clusters), streaming=low_memory))
+                st.write(df["cluster_label"].value_counts())
+
+        with st.expander("🧠 Loaded AI models", expanded=False):
+            budget_mb = st.number_input(
+                "Model memory budget (MB)", min_value=256,
+                value=int(model_registry.memory_budget_bytes / 1024 ** 2), step=256
+            )
+            model_registry.set_memory_budget(budget_mb)
+            st.dataframe(model_registry.stats())
+
+        st.markdown("---")
+        st.download_button("Download Results as CSV", export_frame(df).to_csv(index=False), "classified_courses.csv")
+        st.write("Preview of classified data:", df.head())
+
+        # Visualizations read from a count cube instead of regrouping the whole catalog.
+        # Cubes are memoized per data hash and charts per aggregate, so unrelated reruns redraw nothing.
+        cube_dir = os.path.join(data_dir, "cubes")
+        if "PH_Label" not in df.columns:
+            st.info("Run the classification above to see the yearly and departmental charts.")
+        else:
+            label_cube = get_label_cube(method, cubes.frame_key(df, cubes.SOURCE_COLUMNS + ["PH_Label"]), cube_dir, df)
+            st.write("### Yearly Trends")
+            st.image(chart_cache.render("yearly_trends", label_cube))
+            st.write("### Departmental Breakdown")
+            d_col1, d_col2 = st.columns(2)
+            with d_col1:
+                dept_top = st.selectbox("Departments per page", [10, 25, 50, 100], index=1)
+            _, dept_pages = chart_cache.data("department_breakdown", label_cube, top=dept_top)
+            with d_col2:
+                dept_page = st.number_input(f"Page (of {dept_pages}, largest departments first)",
+                                            min_value=1, max_value=dept_pages, value=1)
+            st.image(chart_cache.render("department_breakdown", label_cube, top=dept_top, page=int(dept_page) - 1))
+
+        with st.expander("🗂️ Taxonomy Coverage", expanded=False):
+            taxonomy_text = st.text_area(
+                "Taxonomy (one category per line, as `Category: keyword, keyword, ...`)",
+                value=f"Environmental change: {', '.join(def_list_env)}\nHuman health: {', '.join(def_list_health)}",
+                height=120
+            )
+            taxonomy = {}
+            for line in taxonomy_text.splitlines():
+                if ":" in line:
+                    name, kws = line.split(":", 1)
+                    taxonomy[name.strip()] = [k.strip() for k in kws.split(",") if k.strip()]
+            if taxonomy:
+                taxonomy_cube = get_taxonomy_cube(
+                    tuple((name, tuple(kws)) for name, kws in taxonomy.items()),
+                    cubes.frame_key(df, cubes.SOURCE_COLUMNS + ["Course Name", "Course Description"]), cube_dir, df)
+                st.write("Courses per category:", taxonomy_coverage(None, taxonomy, cube=taxonomy_cube))
+                if st.checkbox("Show courses covering both categories (scans the course texts)"):
+                    if "full_text" not in df.columns:
+                        df["full_text"] = df["Course Name"].astype(str) + " " + df["Course Description"].astype(str)
+                    st.write(CoverageMatrix.from_taxonomy(df["full_text"], taxonomy).cooccurrence(taxonomy))
+                breakdown = st.selectbox("Break down by", ["Department", "School", "Semester"])
+                st.dataframe(taxonomy_coverage_by(None, taxonomy, breakdown, cube=taxonomy_cube))
+    else:
+        st.info("No course data found. Click the button above to fetch the latest data.")
+
+    # --- New: List and preview data files ---
+    with st.expander("📂 Browse Extracted Data Files", expanded=False):
+        data_files = [f for f in os.listdir(data_dir) if f.endswith('.csv') and f != 'all_courses.csv']
+        if data_files:
+            selected_file = st.selectbox("Select a data file to preview:", sorted(data_files))
+            if selected_file:
+                file_path = os.path.join(data_dir, selected_file)
+                st.write(f"Preview of `{selected_file}`:")
+                st.dataframe(pd.read_csv(file_path, nrows=100))
+                with open(file_path, "rb") as f:
+                    st.download_button("Download this file as CSV", f.read(), selected_file, mime="text/csv")
+        else:
+            st.info("No data files found in the data directory.") 
+
+# --- Diagnostics: where the time goes ---
+with st.expander("⏱️ Diagnostics", expanded=False):
+    st.markdown("Time, rows, cache hits and memory change per stage, accumulated since the app started.")
+    summary = tracer.summary()
+    if summary.empty:
+        st.info("Nothing traced yet. Run an analysis or classification first.")
     else:
-        st.info("No data files found in the data directory.") 
\ No newline at end of file
+        st.dataframe(summary)
+        st.write("Most recent spans:", tracer.to_frame().tail(50).iloc[::-1])
+        st.download_button("Download trace (open in chrome://tracing or ui.perfetto.dev)",
+                           tracer.export(), "ph_trace.json", mime="application/json")
+        if st.button("Clear trace"):
+            tracer.clear()
+    if profile_run:
+        st.text(profile_result["report"])
@@ -0,0 +1,244 @@
+# tracing.py
+"""
+Lightweight tracing of pipeline stages.
+
+Each traced call records a span: wall time, rows processed, throughput,
+cache hits/misses and the change in resident memory (RSS). Spans nest per
+thread, are kept in a bounded in-memory buffer, and can be summarized as a
+DataFrame or exported as a Chrome trace file (open it in chrome://tracing or
+https://ui.perfetto.dev).
+
+Usage:
+    from Scripts.tracing import traced, span, annotate, tracer
+
+    @traced("classification.label_series")
+    def label_series(texts): ...          # rows = len(first argument)
+
+    with span("load_catalog") as s:
+        df = pd.read_csv(path)
+        s["rows"] = len(df)
+
+    annotate(cache_hits=10, cache_misses=2)  # inside a traced call
+    tracer.summary()
+    tracer.export("trace.json")
+
+An on-demand cProfile capture is available with `with tracer.profile() as p:`
+(p["report"] once the block exits) or tracer.start_profile() / tracer.stop_profile(). Set PH_TRACING=0 to turn span recording off.
+"""
+
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import psutil
+    _PROCESS = psutil.Process()
+except ImportError:
+    _PROCESS = None
+
+
+def current_rss_bytes():
+    """Resident memory of this process (psutil, /proc on Linux, else the peak from getrusage)."""
+    if _PROCESS is not None:
+        return _PROCESS.memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _sum_or_nan(values):
+    return values.sum(min_count=1)
+
+
+class Tracer:
+    """
+    Collects spans from every thread.
+    - max_spans: finished spans kept in memory (oldest are dropped first)
+    """
+
+    def __init__(self, max_spans=10000, enabled=True):
+        self.enabled = enabled
+        self.spans = deque(maxlen=max_spans)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._profiler = None
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, rows=None, **fields):
+        """Record the enclosed block as a span; the yielded dict can be updated with rows/cache_hits/..."""
+        if not self.enabled:
+            yield {}
+            return
+        stack = self._stack()
+        record = {"name": name, "rows": rows, **fields}
+        rss_start = current_rss_bytes()
+        start = time.perf_counter()
+        stack.append(record)
+        try:
+            yield record
+        finally:
+            stack.pop()
+            seconds = time.perf_counter() - start
+            record.update({
+                "start": start - self._origin,
+                "seconds": seconds,
+                "rss_delta_mb": (current_rss_bytes() - rss_start) / 1024 ** 2,
+                "depth": len(stack),
+                "parent": stack[-1]["name"] if stack else None,
+                "thread": threading.current_thread().name,
+            })
+            if record.get("rows") and seconds > 0:
+                record["rows_per_second"] = record["rows"] / seconds
+            with self._lock:
+                self.spans.append(record)
+
+    def traced(self, name=None, rows_arg=0):
+        """
+        Decorator recording every call as a span.
+        - name: span name (default: module.function)
+        - rows_arg: index of the positional argument whose len() is the row count (None to skip)
+        """
+        def decorate(fn):
+            span_name = name or f"{fn.__module__.split('.')[-1]}.{fn.__name__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                rows = None
+                if rows_arg is not None and len(args) > rows_arg:
+                    try:
+                        rows = len(args[rows_arg])
+                    except TypeError:
+                        pass
+                with self.span(span_name, rows=rows):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def annotate(self, **fields):
+        """Add fields (rows, cache_hits, cache_misses, ...) to the innermost open span of this thread."""
+        stack = self._stack() if self.enabled else None
+        if stack:
+            record = stack[-1]
+            for key, value in fields.items():
+                if key in ("cache_hits", "cache_misses") and record.get(key):
+                    value += record[key]
+                record[key] = value
+
+    # --- Reports ---
+    def to_frame(self):
+        """Every recorded span as a DataFrame (oldest first)."""
+        with self._lock:
+            return pd.DataFrame(list(self.spans))
+
+    def summary(self):
+        """Per span name: calls, total/mean/max seconds, rows, throughput, cache hits and RSS change."""
+        spans = self.to_frame()
+        if spans.empty:
+            return pd.DataFrame()
+        for col in ("rows", "cache_hits", "cache_misses"):
+            if col not in spans.columns:
+                spans[col] = None
+            spans[col] = pd.to_numeric(spans[col], errors="coerce")
+        summary = spans.groupby("name").agg(
+            calls=("seconds", "size"),
+            total_seconds=("seconds", "sum"),
+            mean_seconds=("seconds", "mean"),
+            max_seconds=("seconds", "max"),
+            rows=("rows", _sum_or_nan),
+            cache_hits=("cache_hits", _sum_or_nan),
+            cache_misses=("cache_misses", _sum_or_nan),
+            rss_delta_mb=("rss_delta_mb", "sum"),
+        )
+        summary["rows_per_second"] = summary["rows"] / summary["total_seconds"].where(summary["total_seconds"] > 0)
+        return summary.sort_values("total_seconds", ascending=False)
+
+    def chrome_trace(self):
+        """The spans in Chrome trace-event format (a dict ready for json.dump)."""
+        events = []
+        threads = {}
+        for record in self.to_frame().to_dict("records"):
+            tid = threads.setdefault(record["thread"], len(threads))
+            # Fields set through annotate() may hold lists or arrays; only scalars can be NaN
+            args = {k: v for k, v in record.items()
+                    if k not in ("name", "start", "seconds", "thread") and not (pd.api.types.is_scalar(v) and pd.isna(v))}
+            events.append({
+                "name": record["name"], "ph": "X", "pid": os.getpid(), "tid": tid,
+                "ts": record["start"] * 1e6, "dur": record["seconds"] * 1e6, "args": args,
+            })
+        events += [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                   for name, tid in threads.items()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path=None):
+        """Write the Chrome trace to path (if given) and return it as a JSON string."""
+        text = json.dumps(self.chrome_trace(), default=str)
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+    # --- cProfile on demand ---
+    def start_profile(self):
+        """Start a cProfile capture of the calling thread (no-op if one is already running)."""
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profile(self, sort="cumulative", limit=40, path=None):
+        """Stop the capture; returns the top functions as text and optionally saves the raw stats to path."""
+        if self._profiler is None:
+            return ""
+        profiler, self._profiler = self._profiler, None
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    @contextmanager
+    def profile(self, enabled=True, **report_options):
+        """
+        Profile the enclosed block with cProfile. The profiler is stopped however the block exits;
+        the yielded dict then holds the report text under "report" (see stop_profile).
+        """
+        result = {"report": ""}
+        if not enabled:
+            yield result
+            return
+        self.start_profile()
+        try:
+            yield result
+        finally:
+            result["report"] = self.stop_profile(**report_options)
+
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+
+tracer = Tracer(enabled=os.environ.get("PH_TRACING", "1") != "0")
+span = tracer.span
+traced = tracer.traced
+annotate = tracer.annotate
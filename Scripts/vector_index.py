@@ -0,0 +1,212 @@
+# vector_index.py
+"""
+Approximate nearest-neighbor index over course embeddings (numpy IVF).
+
+Vectors are L2-normalized and grouped around k-means centroids ("lists").
+A query only scores the vectors in its n_probe closest lists, so top-k
+lookups stay in the millisecond range as the catalog grows. Small indexes use
+a single list, which makes the search exact.
+
+The index is keyed by the embedding cache keys (text hash + model name) and is
+stored next to the cache: centroids.npy, vectors.f32 and lists.i32 (appended
+as new terms arrive) plus keys.json.
+"""
+
+import json
+import os
+
+import numpy as np
+
+try:
+    from Scripts.embedding_cache import DEFAULT_CACHE_DIR
+except ImportError:  # running from inside the Scripts folder
+    from embedding_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(DEFAULT_CACHE_DIR), "vector_index")
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def _kmeans(vectors, n_lists, n_iter=10, seed=0):
+    """A few rounds of spherical k-means (cosine), enough to partition the index."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = vectors[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+    return centroids
+
+
+class VectorIndex:
+    """
+    IVF index of normalized embeddings.
+    - path: folder the index is saved in (None for an in-memory index)
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.keys = []
+        self.centroids = None
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.list_of = np.empty(0, dtype=np.int32)  # list number of each vector
+        self._rows = {}
+        self._lists = None
+        self.built_size = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    # --- Building and updating ---
+    def build(self, keys, vectors, n_lists=None, seed=0):
+        """(Re)build the index from scratch. n_lists defaults to ~sqrt(n) (1 below 2,000 vectors)."""
+        vectors = _normalize(vectors)
+        n = len(vectors)
+        if n == 0:
+            return self
+        if n_lists is None:
+            n_lists = 1 if n < 2000 else int(np.sqrt(n))
+        n_lists = max(1, min(n_lists, n))
+        if n_lists == 1:
+            self.centroids = _normalize(vectors.mean(axis=0, keepdims=True))
+        else:
+            sample = vectors[np.random.default_rng(seed).choice(n, min(n, 50 * n_lists), replace=False)]
+            self.centroids = _kmeans(sample, n_lists, seed=seed)
+        self.keys = list(keys)
+        self._rows = {k: i for i, k in enumerate(self.keys)}
+        self.vectors = vectors
+        self.list_of = self._assign(vectors)
+        self._lists = None
+        self.built_size = n
+        if self.path:
+            self._write(rewrite=True)
+        return self
+
+    def add(self, keys, vectors):
+        """Add vectors for keys not yet in the index (existing keys are skipped)."""
+        new = [i for i, k in enumerate(keys) if k not in self._rows]
+        if not new:
+            return 0
+        if self.centroids is None:
+            self.build([keys[i] for i in new], np.asarray(vectors)[new])
+            return len(new)
+        vectors = _normalize(np.asarray(vectors)[new])
+        lists = self._assign(vectors)
+        for i in new:
+            self._rows[keys[i]] = len(self.keys)
+            self.keys.append(keys[i])
+        self.vectors = np.concatenate([self.vectors, vectors]) if len(self.vectors) else vectors
+        self.list_of = np.concatenate([self.list_of, lists])
+        self._lists = None
+        if self.path:
+            self._write(new_vectors=vectors, new_lists=lists)
+        return len(new)
+
+    def sync(self, cache):
+        """Add every vector of an EmbeddingCache that is not indexed yet; rebuild if the index outgrew its lists."""
+        missing = [k for k in cache.keys if k not in self._rows]
+        if missing:
+            self.add(missing, cache.matrix()[cache.rows(missing)])
+        if len(self) > 4 * max(self.built_size, 500):
+            self.build(self.keys, self.vectors)
+        return self
+
+    def _assign(self, vectors):
+        if self.centroids is None or len(vectors) == 0:
+            return np.zeros(len(vectors), dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _inverted_lists(self):
+        if self._lists is None:
+            order = np.argsort(self.list_of, kind="stable")
+            bounds = np.searchsorted(self.list_of[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[bounds[c]:bounds[c + 1]] for c in range(len(self.centroids))]
+        return self._lists
+
+    # --- Queries ---
+    def rows(self, keys):
+        return np.array([self._rows.get(k, -1) for k in keys], dtype=np.int64)
+
+    def search(self, queries, k=10, n_probe=8):
+        """
+        Top-k most similar indexed vectors for each query vector.
+        Returns (scores, keys): arrays of shape (n_queries, k) and lists of keys (best first).
+        """
+        queries = _normalize(np.atleast_2d(queries))
+        if len(self) == 0:
+            return np.empty((len(queries), 0), dtype=np.float32), [[] for _ in queries]
+        lists = self._inverted_lists()
+        n_probe = min(n_probe, len(lists))
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :n_probe]
+        all_scores, all_keys = [], []
+        for query, probe in zip(queries, probes):
+            candidates = np.concatenate([lists[c] for c in probe])
+            scores = self.vectors[candidates] @ query
+            top = np.argsort(-scores)[:k] if len(scores) <= k else np.argpartition(-scores, k)[:k]
+            top = top[np.argsort(-scores[top])]
+            all_scores.append(scores[top])
+            all_keys.append([self.keys[candidates[i]] for i in top])
+        width = max(len(s) for s in all_scores)
+        padded = np.full((len(queries), width), np.nan, dtype=np.float32)
+        for i, s in enumerate(all_scores):
+            padded[i, :len(s)] = s
+        return padded, all_keys
+
+    def max_similarity(self, queries, keys, chunk_size=8192):
+        """Exact max cosine similarity between each indexed key and any query (NaN if not indexed)."""
+        queries = _normalize(np.atleast_2d(queries))
+        rows = self.rows(keys)
+        out = np.full(len(rows), np.nan, dtype=np.float32)
+        found = np.flatnonzero(rows >= 0)
+        for start in range(0, len(found), chunk_size):
+            part = found[start:start + chunk_size]
+            out[part] = (self.vectors[rows[part]] @ queries.T).max(axis=1)
+        return out
+
+    # --- Persistence ---
+    def _write(self, rewrite=False, new_vectors=None, new_lists=None):
+        os.makedirs(self.path, exist_ok=True)
+        vectors_path = os.path.join(self.path, "vectors.f32")
+        lists_path = os.path.join(self.path, "lists.i32")
+        if rewrite:
+            np.save(os.path.join(self.path, "centroids.npy"), self.centroids)
+            self.vectors.tofile(vectors_path)
+            self.list_of.tofile(lists_path)
+        else:
+            # Drop anything left over from an interrupted write before appending
+            previous = len(self.keys) - len(new_vectors)
+            with open(vectors_path, "ab") as f:
+                f.truncate(previous * new_vectors.shape[1] * 4)
+                f.write(new_vectors.tobytes())
+            with open(lists_path, "ab") as f:
+                f.truncate(previous * 4)
+                f.write(new_lists.tobytes())
+        meta = {"keys": self.keys, "dim": int(self.vectors.shape[1]), "built_size": self.built_size}
+        with open(os.path.join(self.path, "keys.json.tmp"), "w") as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(self.path, "keys.json.tmp"), os.path.join(self.path, "keys.json"))
+
+    @classmethod
+    def load(cls, path):
+        """Open a saved index, or return an empty one bound to path if none exists yet."""
+        index = cls(path)
+        meta_path = os.path.join(path, "keys.json")
+        if not os.path.exists(meta_path):
+            return index
+        with open(meta_path) as f:
+            meta = json.load(f)
+        n = len(meta["keys"])
+        index.keys = meta["keys"]
+        index._rows = {k: i for i, k in enumerate(index.keys)}
+        index.built_size = meta["built_size"]
+        index.centroids = np.load(os.path.join(path, "centroids.npy"))
+        index.vectors = np.fromfile(os.path.join(path, "vectors.f32"), dtype=np.float32,
+                                    count=n * meta["dim"]).reshape(n, meta["dim"])
+        index.list_of = np.fromfile(os.path.join(path, "lists.i32"), dtype=np.int32, count=n)
+        return index
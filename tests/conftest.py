@@ -0,0 +1,36 @@
+# conftest.py
+"""Shared fixtures: the saved term CSVs in data/ and a scratch data directory built from them."""
+
+import glob
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from Scripts.course_frame import read_text_csv
+
+DATA_DIR = os.path.join(project_root, "data")
+TERM_PATHS = sorted(p for p in glob.glob(os.path.join(DATA_DIR, "*.csv")) if not p.endswith("all_courses.csv"))
+
+
+@pytest.fixture(scope="session")
+def catalog():
+    """Every section of the saved terms, read as text."""
+    if not TERM_PATHS:
+        pytest.skip("no term CSVs in data/")
+    return pd.concat([read_text_csv(p) for p in TERM_PATHS], ignore_index=True)
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A data directory holding copies of the first three saved terms."""
+    if not TERM_PATHS:
+        pytest.skip("no term CSVs in data/")
+    for path in TERM_PATHS[:3]:
+        shutil.copy(path, tmp_path)
+    return str(tmp_path)
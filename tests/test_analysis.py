@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from Scripts.analysis import keyword_analysis, taxonomy_cooccurrence, taxonomy_coverage, taxonomy_coverage_by
+from Scripts.charts import ChartCache
+from Scripts.classification import DEFAULT_TAXONOMY, ENV_KEYWORDS, HEALTH_KEYWORDS, label_series
+from Scripts.cubes import build_label_cube, build_taxonomy_cube, rollup
+from Scripts.extract_all_terms import get_academic_year
+
+
+@pytest.fixture(scope="module")
+def labeled(catalog):
+    text = catalog["Course Name"].fillna("").astype(str) + " " + catalog["Course Description"].fillna("").astype(str)
+    return catalog.assign(full_text=text, PH_Label=label_series(text))
+
+def mentions(texts, keywords):
+    """Rows whose lowercased text contains any of the keywords."""
+    lowered = texts.str.lower()
+    return pd.concat([lowered.str.contains(k.lower(), regex=False) for k in keywords], axis=1).any(axis=1)
+
+
+def test_cube_totals_match_a_groupby_on_the_raw_frame(labeled):
+    cube = build_label_cube(labeled)
+    assert cube["count"].sum() == len(labeled)
+    by = [labeled["Semester"], labeled["Department"].fillna("Unknown"), labeled["PH_Label"]]
+    expected = labeled.groupby(by).size()
+    assert rollup(cube, ["Semester", "Department", "PH_Label"]).to_dict() == expected.to_dict()
+    academic_years = labeled["Semester"].map(get_academic_year)
+    assert rollup(cube, "Academic Year").to_dict() == academic_years.value_counts().to_dict()
+
+def test_taxonomy_cube_totals_match_keyword_counts(labeled):
+    cube = build_taxonomy_cube(labeled, DEFAULT_TAXONOMY)
+    expected = {category: int(mentions(labeled["full_text"], keywords).sum())
+                for category, keywords in DEFAULT_TAXONOMY.items()}
+    assert rollup(cube, "category").to_dict() == expected
+
+def baseline_keyword_label(row, env_keywords, health_keywords):
+    """The dashboard's original row-by-row keyword analysis, kept here as the reference."""
+    text = (str(row.get('Course Name', '')) + ' ' + str(row.get('Course Description', ''))).lower()
+    if 'planetary health' in text:
+        return 'Category 1: Explicitly Planetary Health'
+    if 'systems' in text and any(k in text for k in env_keywords) and any(k in text for k in health_keywords):
+        return 'Category 2: Planetary Health Concept'
+    if any(k in text for k in env_keywords) or any(k in text for k in health_keywords):
+        return 'Category 3: Related Concept'
+    return 'Not Related'
+
+def test_sparse_coverage_matches_dense_scans(labeled):
+    dense = pd.DataFrame({category: mentions(labeled["full_text"], keywords)
+                          for category, keywords in DEFAULT_TAXONOMY.items()})
+    assert taxonomy_coverage(labeled, DEFAULT_TAXONOMY).to_dict() == dense.sum().to_dict()
+    by_semester = taxonomy_coverage_by(labeled, DEFAULT_TAXONOMY, by="Semester")
+    assert by_semester.to_dict() == dense.groupby(labeled["Semester"]).sum().to_dict()
+    both = (dense["Environmental change"] & dense["Human health"]).sum()
+    assert taxonomy_cooccurrence(labeled, DEFAULT_TAXONOMY).loc["Environmental change", "Human health"] == both
+
+def test_keyword_analysis_matches_the_row_by_row_labels(catalog):
+    env, health = [k.lower() for k in ENV_KEYWORDS], [k.lower() for k in HEALTH_KEYWORDS]
+    expected = catalog.apply(baseline_keyword_label, axis=1, args=(env, health))
+    labeled = keyword_analysis(catalog.copy(), ENV_KEYWORDS, HEALTH_KEYWORDS)
+    assert labeled["PH_Label"].tolist() == expected.tolist()
+
+def test_chart_cache_redraws_only_when_the_data_changes(labeled):
+    cache = ChartCache()
+    cube = build_label_cube(labeled)
+    first = cache.render("yearly_trends", cube)
+    assert first.startswith(b"\x89PNG") and (cache.hits, cache.misses) == (0, 1)
+    assert cache.render("yearly_trends", cube.sample(frac=1, random_state=0)) is first  # same totals
+    assert (cache.hits, cache.misses) == (1, 1)
+    changed = cube.assign(count=cube["count"] * 2)
+    assert cache.render("yearly_trends", changed) != first and (cache.hits, cache.misses) == (1, 2)
+    cache.render("department_breakdown", cube, top=10, page=1)
+    cache.render("department_breakdown", cube, top=10, page=2)
+    assert (cache.hits, cache.misses) == (1, 4) and len(cache) == 4
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from Scripts.embedding_cache import EmbeddingCache
+from Scripts.keyword_matcher import KeywordMatcher
+from Scripts.results_cache import KeywordHitCache, ResultsCache
+
+
+def count_calls(fn):
+    def wrapped(texts):
+        wrapped.seen.extend(list(texts))
+        return fn(texts)
+    wrapped.seen = []
+    return wrapped
+
+def fake_encode(texts):
+    return np.array([[len(t), t.count("a") + 1.0] for t in texts], dtype=np.float32)
+
+
+def test_results_cache_computes_only_new_or_changed_rows():
+    cache = ResultsCache()
+    compute = count_calls(lambda texts: [t.upper() for t in texts])
+    texts = pd.Series(["a", "b", "a"])
+    assert cache.get_or_compute(texts, {"v": 1}, compute).tolist() == ["A", "B", "A"]
+    assert compute.seen == ["a", "b"]
+    result = cache.get_or_compute(pd.Series(["a", "c"]), {"v": 1}, compute)
+    assert result.tolist() == ["A", "C"] and compute.seen[2:] == ["c"]
+    assert (cache.last_reused, cache.last_computed) == (1, 1)
+
+def test_results_cache_separates_configs_and_terms():
+    cache = ResultsCache(max_configs=1)
+    compute = count_calls(lambda texts: list(texts))
+    cache.get_or_compute(pd.Series(["x"]), {"v": 1}, compute, terms=["Summer 2020"])
+    cache.get_or_compute(pd.Series(["x"]), {"v": 1}, compute, terms=["Summer 2021"])
+    cache.get_or_compute(pd.Series(["x"]), {"v": 2}, compute, terms=["Summer 2020"])
+    cache.get_or_compute(pd.Series(["x"]), {"v": 1}, compute, terms=["Summer 2020"])  # evicted by v=2
+    assert len(compute.seen) == 4
+
+def test_keyword_hit_cache_matches_matcher_and_scans_only_new_keywords():
+    texts = pd.Series(["climate change and health", "public health", "accounting", None])
+    groups = {"env": ["climate change"], "health": ["health"]}
+    cache = KeywordHitCache()
+    assert cache.hit_matrix(texts, groups).equals(KeywordMatcher(groups).hit_matrix(texts))
+    groups["env"].append("accounting")
+    assert cache.hit_matrix(texts, groups).equals(KeywordMatcher(groups).hit_matrix(texts))
+    cache.hit_matrix(texts, groups)
+    assert cache.last_scanned == 0
+
+def test_embedding_cache_lookup_does_not_store(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "fake-model")
+    cache.get_or_encode(["course a", "course b"], fake_encode)
+    encode = count_calls(fake_encode)
+    vectors = cache.lookup(["course a", "a query"], encode)
+    assert encode.seen == ["a query"]
+    assert np.array_equal(vectors, fake_encode(["course a", "a query"]))
+    assert len(cache) == 2
+    assert len(EmbeddingCache(str(tmp_path), "fake-model")) == 2  # nothing new on disk either
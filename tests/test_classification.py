@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Scripts import classification
+from Scripts.classification import CATEGORY_LABELS, label_course, label_series, tier1, tier2, tier3
+from Scripts.keyword_matcher import KeywordMatcher
+from Scripts.results_cache import ResultsCache
+
+
+def baseline_label_course(text):
+    """The original any(kw in text) implementation, kept here as the reference."""
+    text = text.lower() if isinstance(text, str) else ""
+    if any(kw in text for kw in tier1):
+        return CATEGORY_LABELS[0]
+    elif any(kw in text for kw in tier2):
+        return CATEGORY_LABELS[1]
+    elif any(kw in text for kw in tier3):
+        return CATEGORY_LABELS[2]
+    return CATEGORY_LABELS[3]
+
+def full_text(df):
+    return df["Course Name"].fillna("").astype(str) + " " + df["Course Description"].fillna("").astype(str)
+
+
+def test_label_series_matches_baseline_on_every_row(catalog):
+    texts = full_text(catalog)
+    expected = [baseline_label_course(t) for t in texts]
+    assert label_series(texts).tolist() == expected
+    assert [label_course(t) for t in texts] == expected
+
+def test_label_series_with_results_cache_matches_baseline(catalog):
+    texts = full_text(catalog)
+    cache = ResultsCache()
+    first = label_series(texts, cache, catalog["Semester"])
+    assert cache.last_computed == texts.nunique()
+    again = label_series(texts, cache, catalog["Semester"])
+    assert cache.last_computed == 0 and cache.last_reused == len(texts)
+    assert first.tolist() == again.tolist() == [baseline_label_course(t) for t in texts]
+
+def test_label_series_handles_missing_text():
+    texts = pd.Series(["Planetary Health seminar", None, np.nan, "", "climate change"])
+    assert label_series(texts).tolist() == [baseline_label_course(t) for t in texts]
+
+def test_label_course_follows_tier_list_edits(monkeypatch):
+    assert label_course("Accounting basics") == CATEGORY_LABELS[3]
+    monkeypatch.setattr(classification, "tier2", tier2 + ["Accounting"])
+    assert label_course("Accounting basics") == CATEGORY_LABELS[1]
+    classification.tier2.remove("Accounting")  # edited in place
+    assert label_course("Accounting basics") == CATEGORY_LABELS[3]
+
+@pytest.mark.parametrize("text, expected", [
+    ("intro to c++ programming", True),
+    ("c++11 features", False),
+    ("the u.s. economy", True),
+    ("climate and health", True),
+    ("healthcare systems", False),
+    ("ecohealth", False),
+])
+def test_word_boundaries_allow_non_word_keyword_edges(text, expected):
+    matcher = KeywordMatcher({"kw": ["c++", "u.s.", "health"]}, word_boundaries=True)
+    assert (matcher.match(text) == {"kw"}) is expected
+
+def test_word_boundary_prefix_keywords():
+    # "health" is a prefix of "healthcare" but only matches when a word boundary follows it
+    matcher = KeywordMatcher({"short": ["health"], "long": ["healthcare"]}, word_boundaries=True)
+    assert matcher.match("healthcare access") == {"long"}
+    assert matcher.match("health care access") == {"short"}
+    assert KeywordMatcher({"short": ["health"], "long": ["healthcare"]}).match("healthcare") == {"short", "long"}
+
+def test_semantic_scores_match_brute_force_cosine(catalog, tmp_path):
+    from Scripts.benchmark import HashingEmbedder, use_stub_embedder
+    model = use_stub_embedder()
+    df = pd.DataFrame({"full_text": full_text(catalog).iloc[:3000]})
+    examples = ["climate change and human health", "air pollution exposure", "biodiversity loss"]
+    embed = HashingEmbedder().encode
+    vectors, example_vectors = embed(df["full_text"]), embed(examples)
+    unit = lambda v: v / np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-12)
+    expected = (unit(vectors) @ unit(example_vectors).T).max(axis=1)
+    for cache_dir in (str(tmp_path), None):
+        scored = classification.semantic_similarity_classify(df.copy(), examples, model_name=model,
+                                                             cache_dir=cache_dir, chunk_size=1000)
+        assert not scored["semantic_score"].isna().any()
+        np.testing.assert_allclose(scored["semantic_score"], expected, atol=1e-5)
@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+import pytest
+
+from Scripts import course_store, extract_all_terms
+from Scripts.course_frame import export_frame, read_compact_csv, read_text_csv
+
+pytest.importorskip("pyarrow")
+
+
+def test_store_and_csv_loaders_return_the_same_frame(data_dir):
+    course_store.migrate_csvs(data_dir, os.path.join(data_dir, "course_store"))
+    terms = extract_all_terms.existing_terms(data_dir)
+    from_store = course_store.load_semester_data(data_dir, terms, use_store=True)
+    from_csv = course_store.load_semester_data(data_dir, terms, use_store=False)
+    assert from_store.dtypes.to_dict() == from_csv.dtypes.to_dict()
+    pd.testing.assert_frame_equal(from_store, from_csv, check_categorical=False)  # category order may differ
+
+def test_missing_terms_give_an_empty_frame(data_dir):
+    for use_store in (True, False):
+        df = course_store.load_semester_data(data_dir, ["Fall 1999"], use_store=use_store)
+        assert df.empty and list(df.columns) == course_store.COURSE_COLUMNS
+
+def test_export_frame_keeps_the_file_columns(data_dir):
+    path = os.path.join(data_dir, sorted(os.listdir(data_dir))[0])
+    exported = export_frame(read_compact_csv(path))
+    raw = read_text_csv(path)
+    assert list(exported.columns) == list(raw.columns) + ["full_text"]
+    assert exported.drop(columns="full_text").to_csv(index=False) == raw.to_csv(index=False)
+
+def test_stream_term_leaves_no_partial_files_on_errors(tmp_path, monkeypatch):
+    records = [{"Course Name": f"Course {i}", "Course Description": "d", "Semester": "Summer 2020"}
+               for i in range(20)]
+    monkeypatch.setattr(extract_all_terms, "get_all_courses", lambda term, page=1, **kwargs: {"page": page})
+
+    def section_records(res, term, academic_year):
+        if res["page"] == 2:
+            raise KeyError("malformed page")
+        return records
+
+    monkeypatch.setattr(extract_all_terms, "section_records", section_records)
+    with pytest.raises(KeyError):
+        extract_all_terms.stream_term("Summer 2020", str(tmp_path))
+    leftovers = [f for _, _, files in os.walk(tmp_path) for f in files]
+    assert leftovers == []
+
+def test_store_loader_reads_unmigrated_terms_from_their_csv(data_dir):
+    terms = extract_all_terms.existing_terms(data_dir)
+    root = os.path.join(data_dir, "course_store")
+    course_store.write_term(read_text_csv(os.path.join(data_dir, f"{terms[1].replace(' ', '_')}.csv")), terms[1], root)
+    from_store = course_store.load_semester_data(data_dir, terms, use_store=True)
+    from_csv = course_store.load_semester_data(data_dir, terms, use_store=False)
+    pd.testing.assert_frame_equal(from_store, from_csv, check_categorical=False)
+    assert course_store.available_terms(root) == [terms[1]]  # the loader writes nothing
@@ -0,0 +1,20 @@
+import os
+
+from Scripts import embedding_backends
+from Scripts.course_frame import read_compact_csv
+
+
+def test_only_torch_is_offered_without_onnxruntime(monkeypatch):
+    monkeypatch.setattr(embedding_backends, "HAVE_ONNXRUNTIME", False)
+    assert embedding_backends.available_backends() == ["torch"]
+    monkeypatch.setattr(embedding_backends, "HAVE_ONNXRUNTIME", True)
+    assert embedding_backends.available_backends() == ["torch", "onnx", "onnx-int8"]
+
+def test_parity_texts_sample_the_saved_catalog(data_dir, tmp_path):
+    texts = embedding_backends.parity_texts(data_dir, n=200)
+    assert texts[:len(embedding_backends.PARITY_TEXTS)] == embedding_backends.PARITY_TEXTS
+    sample = texts[len(embedding_backends.PARITY_TEXTS):]
+    catalog = set(read_compact_csv([os.path.join(data_dir, f) for f in os.listdir(data_dir)])["full_text"])
+    assert len(sample) == len(set(sample)) == 200 and set(sample) <= catalog
+    assert embedding_backends.parity_texts(data_dir, n=200) == texts
+    assert embedding_backends.parity_texts(str(tmp_path / "empty")) == embedding_backends.PARITY_TEXTS
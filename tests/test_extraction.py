@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+import pytest
+import requests
+
+from Scripts import extract_all_terms
+from Scripts.benchmark import StubCatalogServer
+from Scripts.course_frame import read_text_csv
+
+YEAR = 2021
+
+
+@pytest.fixture(scope="module")
+def served(catalog):
+    """Two terms of the saved catalog: one spread over many pages, one small."""
+    intersession = catalog[catalog["Semester"] == f"Intersession {YEAR}"]
+    summer = catalog[catalog["Semester"] == f"Summer {YEAR}"].head(100)
+    return pd.concat([intersession, summer], ignore_index=True)
+
+def saved_term(outdir, term):
+    return read_text_csv(os.path.join(outdir, f"{term.replace(' ', '_')}.csv"))
+
+def scrape(server, outdir, **kwargs):
+    return extract_all_terms.concurrent_extraction(YEAR, YEAR, outdir=str(outdir), url=server.url,
+                                                   term_workers=2, page_workers=3, **kwargs)
+
+
+def test_concurrent_extraction_matches_serial(served, tmp_path):
+    with StubCatalogServer(served) as server:
+        added = scrape(server, tmp_path / "concurrent")
+        serial = extract_all_terms.initial_extraction(YEAR, YEAR, outdir=str(tmp_path / "serial"), url=server.url)
+    assert added == serial == [f"Intersession {YEAR}", f"Summer {YEAR}"]
+    for term in added:
+        pd.testing.assert_frame_equal(saved_term(tmp_path / "concurrent", term), saved_term(tmp_path / "serial", term))
+    assert not os.path.exists(tmp_path / "concurrent" / extract_all_terms.CHECKPOINT_FILE)
+
+def test_resume_skips_terms_finished_before_an_interruption(served, tmp_path):
+    finished = f"Intersession {YEAR}"
+    with StubCatalogServer(served) as server:
+        scrape(server, tmp_path)
+    os.remove(tmp_path / f"Summer_{YEAR}.csv")
+    extract_all_terms.save_checkpoint(str(tmp_path), {"completed": {finished: len(saved_term(tmp_path, finished))}})
+    with StubCatalogServer(served) as server:
+        scrape(server, tmp_path)
+    assert {term for term, _ in server.requests} == set(extract_all_terms.generate_terms(YEAR, YEAR)) - {finished}
+    assert len(saved_term(tmp_path, f"Summer {YEAR}")) == 100
+    with StubCatalogServer(served) as server:
+        scrape(server, tmp_path, resume=False)
+    assert finished in {term for term, _ in server.requests}
+
+def test_server_errors_are_retried(served, tmp_path):
+    with StubCatalogServer(served, failures={2: 1}) as server:
+        scrape(server, tmp_path)
+    assert server.requests.count((f"Intersession {YEAR}", 2)) == 2
+    assert len(saved_term(tmp_path, f"Intersession {YEAR}")) == (served["Semester"] == f"Intersession {YEAR}").sum()
+
+def test_failed_page_raises_when_the_total_is_unknown(served):
+    with StubCatalogServer(served, failures={3: 1}, report_found=False) as server:
+        with pytest.raises(requests.HTTPError):
+            extract_all_terms.scrape_term_concurrent(f"Intersession {YEAR}", requests.Session(), url=server.url)
+    with StubCatalogServer(served, report_found=False) as server:
+        df = extract_all_terms.scrape_term_concurrent(f"Intersession {YEAR}", requests.Session(), url=server.url)
+    assert len(df) == (served["Semester"] == f"Intersession {YEAR}").sum()
+
+def refresh(server, outdir):
+    report = extract_all_terms.delta_refresh(YEAR, YEAR, outdir=str(outdir), url=server.url, page_workers=3)
+    return dict(zip(report["term"], report["status"]))
+
+def test_delta_refresh_fetches_only_changed_terms(served, tmp_path):
+    short = served.head(5).assign(Semester=f"Spring {YEAR}")  # too few sections to be saved
+    with StubCatalogServer(pd.concat([served, short], ignore_index=True)) as server:
+        assert refresh(server, tmp_path) == {f"Intersession {YEAR}": "new", f"Spring {YEAR}": "skipped",
+                                             f"Summer {YEAR}": "new", f"Fall {YEAR}": "skipped"}
+        server.requests.clear()
+        assert set(refresh(server, tmp_path).values()) == {"unchanged"}
+    assert all(page == 1 for _, page in server.requests) and len(server.requests) == 4
+
+def test_delta_refresh_refetches_a_term_whose_count_changed(served, catalog, tmp_path):
+    with StubCatalogServer(served) as server:
+        refresh(server, tmp_path)
+    grown = pd.concat([served, catalog[catalog["Semester"] == f"Summer {YEAR}"].iloc[100:130]], ignore_index=True)
+    with StubCatalogServer(grown) as server:
+        statuses = refresh(server, tmp_path)
+    assert statuses[f"Summer {YEAR}"] == "changed" and statuses[f"Intersession {YEAR}"] == "unchanged"
+    assert len(saved_term(tmp_path, f"Summer {YEAR}")) == 130
@@ -0,0 +1,67 @@
+import functools
+import os
+
+import pandas as pd
+import pytest
+
+from Scripts import extract_all_terms, pipeline
+from Scripts.benchmark import StubCatalogServer, use_stub_embedder
+
+
+@pytest.fixture
+def config(data_dir):
+    return {"data_dir": data_dir, "semantic_model": use_stub_embedder(), "embedding_cache": False,
+            "examples": ["climate change and human health"], "workers": 2}
+
+def statuses(report):
+    return dict(zip(report["stage"], report["status"]))
+
+def label_columns(data_dir):
+    columns = pd.read_csv(os.path.join(data_dir, "pipeline", "course_labels.csv"), nrows=0).columns
+    return [c for c in columns if c.endswith("_label")]
+
+
+def test_rerun_only_recomputes_what_changed(config):
+    report, _ = pipeline.run_pipeline({**config, "classifiers": ["rule"]})
+    assert statuses(report) == {"scrape": "ran", "normalize": "ran", "classify_rule": "ran", "aggregate": "ran"}
+    report, _ = pipeline.run_pipeline({**config, "classifiers": ["rule", "semantic"]})
+    assert statuses(report) == {"scrape": "ran", "normalize": "cached", "classify_rule": "cached",
+                                "classify_semantic": "ran", "aggregate": "ran"}
+
+def test_cached_aggregate_republishes_its_files(config):
+    pipeline.run_pipeline({**config, "classifiers": ["rule"]})
+    pipeline.run_pipeline({**config, "classifiers": ["rule", "semantic"]})
+    assert label_columns(config["data_dir"]) == ["rule_label", "semantic_label"]
+    report, _ = pipeline.run_pipeline({**config, "classifiers": ["rule"]})
+    assert statuses(report)["aggregate"] == "cached"
+    assert label_columns(config["data_dir"]) == ["rule_label"]
+
+def test_failed_classifier_does_not_skip_aggregate(config):
+    report, _ = pipeline.run_pipeline({**config, "classifiers": ["rule", "semantic"], "examples": []})
+    assert statuses(report)["classify_semantic"] == "failed"
+    assert statuses(report)["aggregate"] == "ran"
+    assert label_columns(config["data_dir"]) == ["rule_label"]
+    report, _ = pipeline.run_pipeline({**config, "classifiers": ["semantic"], "examples": []})
+    assert statuses(report)["aggregate"] == "skipped"
+
+def test_force_reruns_a_stage_and_rejects_unknown_names(config):
+    pipeline.run_pipeline({**config, "classifiers": ["rule"]})
+    report, _ = pipeline.run_pipeline({**config, "classifiers": ["rule"]}, force=["classify_rule"])
+    assert statuses(report)["classify_rule"] == "ran"
+    with pytest.raises(ValueError, match="classify_bogus"):
+        pipeline.run_pipeline({**config, "classifiers": ["rule"]}, force=["classify_bogus"])
+    with pytest.raises(SystemExit):
+        pipeline.main(["--data-dir", config["data_dir"], "--force", "classify_bogus"])
+
+def test_incremental_scrape_writes_to_the_configured_data_dir(config, catalog, monkeypatch):
+    served = catalog[catalog["Semester"] == "Summer 2020"]
+    repo_files = sorted(os.listdir(extract_all_terms.DATA_DIR))
+    with StubCatalogServer(served) as server:
+        monkeypatch.setattr(extract_all_terms, "incremental_scrape",
+                            functools.partial(extract_all_terms.incremental_scrape, url=server.url))
+        report, _ = pipeline.run_pipeline({**config, "classifiers": ["rule"], "scrape": "incremental",
+                                           "start_year": 2020, "end_year": 2020})
+    assert statuses(report)["scrape"] == "ran"
+    saved = pd.read_csv(os.path.join(config["data_dir"], "Summer_2020.csv"))
+    assert len(saved) == len(served)
+    assert sorted(os.listdir(extract_all_terms.DATA_DIR)) == repo_files
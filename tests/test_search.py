@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Scripts import canonical, extract_all_terms
+from Scripts.search_index import SearchIndex, load_or_build, tokenize
+from Scripts.vector_index import VectorIndex
+
+
+def brute_force(courses, occurrences, clauses, semesters=None):
+    """Course ids whose text contains every clause (tokens in a row), optionally in the given semesters."""
+    allowed = set(occurrences.loc[occurrences["Semester"].isin(semesters), "course_id"]) if semesters else None
+    found = set()
+    for course_id, text in zip(courses["course_id"], courses["full_text"]):
+        tokens = " " + " ".join(tokenize(text)) + " "
+        if all(f" {' '.join(c)} " in tokens for c in clauses) and (allowed is None or course_id in allowed):
+            found.add(course_id)
+    return found
+
+
+@pytest.fixture(scope="module")
+def index_and_tables(catalog):
+    courses, occurrences = canonical.canonicalize(catalog)
+    return SearchIndex.from_canonical(courses, occurrences), courses, occurrences
+
+@pytest.mark.parametrize("query, clauses", [
+    ("climate", [["climate"]]),
+    ("health policy", [["health"], ["policy"]]),
+    ('"public health"', [["public", "health"]]),
+    ('"climate change" health', [["climate", "change"], ["health"]]),
+])
+def test_search_matches_brute_force(index_and_tables, query, clauses):
+    index, courses, occurrences = index_and_tables
+    assert set(index.search(query, k=None)["course_id"]) == brute_force(courses, occurrences, clauses)
+    semester = index.facets["Semester"][0]
+    filtered = index.search(query, k=None, semesters=[semester])
+    assert set(filtered["course_id"]) == brute_force(courses, occurrences, clauses, [semester])
+
+def test_results_are_ranked(index_and_tables):
+    scores = index_and_tables[0].search("environmental health", k=None, match="any")["score"]
+    assert scores.is_monotonic_decreasing and len(scores)
+
+def test_catalog_from_term_files_matches_whole_frame(data_dir, tmp_path):
+    paths = [os.path.join(data_dir, f"{t.replace(' ', '_')}.csv") for t in extract_all_terms.existing_terms(data_dir)]
+    frame = pd.concat([pd.read_csv(p, dtype=str, keep_default_na=False, na_values=[""]) for p in paths],
+                      ignore_index=True)
+    courses, occurrences = canonical.write_canonical_catalog(frame, str(tmp_path / "whole"))
+    streamed, facets, n_sections = canonical.write_canonical_catalog_from_files(paths, str(tmp_path / "files"))
+    pd.testing.assert_frame_equal(courses, streamed)
+    assert n_sections == len(frame)
+    for name in ("courses.csv", "course_occurrences.csv"):
+        assert (tmp_path / "whole" / name).read_bytes() == (tmp_path / "files" / name).read_bytes()
+    whole, from_files = SearchIndex.from_canonical(courses, occurrences), SearchIndex.from_canonical(streamed, facets)
+    assert whole.fingerprint == from_files.fingerprint
+    assert whole.search("health", k=None).equals(from_files.search("health", k=None))
+
+def test_load_or_build_detects_changed_text(data_dir):
+    extract_all_terms.update_canonical_catalog(data_dir)
+    meta_path = os.path.join(data_dir, "search_index", "meta.json")
+    saved_at = os.path.getmtime(meta_path)
+    frame = pd.concat([pd.read_csv(os.path.join(data_dir, f)) for f in sorted(os.listdir(data_dir)) if f.endswith(".csv")],
+                      ignore_index=True)
+    assert load_or_build(data_dir, frame, save=False).fingerprint == SearchIndex.load(
+        os.path.join(data_dir, "search_index")).fingerprint
+    frame.loc[0, "Course Description"] = "zyxwv a description nobody wrote"
+    rebuilt = load_or_build(data_dir, frame, save=False)
+    assert len(rebuilt.search("zyxwv")) == 1
+    assert os.path.getmtime(meta_path) == saved_at  # save=False never writes
+    load_or_build(data_dir, frame)
+    assert SearchIndex.load(os.path.join(data_dir, "search_index")).fingerprint == rebuilt.fingerprint
+
+def test_vector_index_search_matches_brute_force():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 16)).astype(np.float32)
+    index = VectorIndex().build([f"k{i}" for i in range(500)], vectors, n_lists=8)
+    queries = rng.normal(size=(5, 16)).astype(np.float32)
+    scores, keys = index.search(queries, k=10, n_probe=8)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    exact = normalized @ (queries / np.linalg.norm(queries, axis=1, keepdims=True)).T
+    for i in range(len(queries)):
+        assert keys[i] == [f"k{j}" for j in np.argsort(-exact[:, i])[:10]]
+        assert np.allclose(scores[i], np.sort(exact[:, i])[::-1][:10], atol=1e-5)